@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+BM25 index memory footprint.
+
+Builds a synthetic corpus, then prints BM25Index.memory_report() next to
+the heap growth measured with tracemalloc while building. The
+``legacy_postings`` row estimates the previous layout (dicts of
+(slot, tf) tuple lists) for the same postings.
+Run from packages/local-rag with:
+
+PYTHONPATH=. python _dev/benchmarks/bench_bm25_memory.py --docs 100000
+"""
+import argparse
+import tracemalloc
+
+from bench_bm25_scoring import build_corpus
+
+from local_rag.search.hybrid import BM25Index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report BM25 index memory")
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--vocab", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--no-texts", action="store_true", help="Build a statistics-only index")
+    args = parser.parse_args()
+
+    print(f"Building corpus: {args.docs} docs, vocab {args.vocab}...", flush=True)
+    _, texts = build_corpus(args.docs, args.vocab, args.seed)
+    doc_ids = [f"doc{i}" for i in range(args.docs)]
+
+    tracemalloc.start()
+    index = BM25Index(store_texts=not args.no_texts)
+    index.add_documents(doc_ids, texts)
+    measured, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = index.memory_report()
+    postings = report["postings"] + report["vocabulary"]
+
+    print(f"\n{'component':<20}{'MiB':>10}")
+    for name, size in report.items():
+        print(f"{name:<20}{size / 2**20:>10.1f}")
+    print(f"{'measured (heap)':<20}{measured / 2**20:>10.1f}")
+    print(f"\nPostings + vocabulary vs legacy layout: "
+          f"{postings / 2**20:.1f} MiB vs {report['legacy_postings'] / 2**20:.1f} MiB "
+          f"({report['legacy_postings'] / max(postings, 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
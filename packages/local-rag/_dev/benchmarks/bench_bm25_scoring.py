@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: scalar vs vectorized BM25 scoring.
+
+Builds a synthetic Zipf-distributed corpus, then times
+BM25Index.search_reference (pure-Python loop + full sort) against
+BM25Index.search (NumPy term-score vectors + argpartition top-k) and
+BM25Index.search(prune=True) (MaxScore dynamic pruning).
+Run from packages/local-rag with:
+
+PYTHONPATH=. python _dev/benchmarks/bench_bm25_scoring.py --docs 100000
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from local_rag.search.hybrid import BM25Index
+
+
+def build_corpus(num_docs: int, vocab_size: int, seed: int):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    weights = [1.0 / (i + 1) for i in range(vocab_size)]
+    texts = [" ".join(rng.choices(vocab, weights, k=rng.randint(50, 400))) for _ in range(num_docs)]
+    return vocab, texts
+
+
+def time_queries(fn, queries, k, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            fn(query, k=k)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 scoring")
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--vocab", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    print(f"Building corpus: {args.docs} docs, vocab {args.vocab}...", flush=True)
+    vocab, texts = build_corpus(args.docs, args.vocab, args.seed)
+    index = BM25Index()
+    index.add_documents([f"doc{i}" for i in range(args.docs)], texts)
+
+    rng = random.Random(args.seed + 1)
+    # Mix of common (long postings) and rare terms, like natural-language queries
+    queries = [
+        " ".join(rng.choice(vocab[: args.vocab // (10 ** rng.randint(0, 2))]) for _ in range(rng.randint(2, 8)))
+        for _ in range(args.queries)
+    ]
+
+    mismatches = sum(index.search(q, k=args.k) != index.search_reference(q, k=args.k) for q in queries)
+    pruned_mismatches = sum(index.search(q, k=args.k, prune=True) != index.search(q, k=args.k) for q in queries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index.save(tmp)
+        mapped = BM25Index.load(tmp)
+
+        rows = [
+            ("reference (in-memory)", time_queries(index.search_reference, queries, args.k, args.repeat)),
+            ("vectorized (in-memory)", time_queries(index.search, queries, args.k, args.repeat)),
+            ("reference (mmap)", time_queries(mapped.search_reference, queries, args.k, args.repeat)),
+            ("vectorized (mmap)", time_queries(mapped.search, queries, args.k, args.repeat)),
+            ("pruned (mmap)", time_queries(
+                lambda q, k: mapped.search(q, k=k, prune=True), queries, args.k, args.repeat
+            )),
+        ]
+
+    print(f"\n{'scorer':<26}{'ms/query':>12}")
+    for name, seconds in rows:
+        print(f"{name:<26}{seconds * 1000:>12.2f}")
+    print(f"\nSpeedup in-memory: {rows[0][1] / rows[1][1]:.1f}x")
+    print(f"Speedup reference in-memory -> vectorized mmap: {rows[0][1] / rows[3][1]:.1f}x")
+    print(f"Speedup vectorized -> pruned (mmap): {rows[3][1] / rows[4][1]:.1f}x")
+    print(f"Result mismatches: {mismatches}/{len(queries)} (pruned: {pruned_mismatches})")
+
+
+if __name__ == "__main__":
+    main()
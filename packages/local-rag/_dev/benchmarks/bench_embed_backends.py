@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput per model backend (torch, onnx, onnx-int8).
+
+For each backend, measures batched chunk encoding (the indexing path) and
+single-query encoding latency (the search path), and reports cosine
+parity of every backend against torch on the same chunks. ONNX exports
+are written to --cache-dir and reused by later runs; the first run of an
+ONNX backend includes a one-time export that is not timed.
+Run from packages/local-rag with:
+
+PYTHONPATH=. python _dev/benchmarks/bench_embed_backends.py --chunks 512 --queries 200
+"""
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+
+from local_rag.adapters.embeddings import EMBED_BACKENDS, ModelBackend
+
+WORDS = (
+    "index search vector query document chunk embedding model token python "
+    "latency throughput cache memory disk segment merge rank score fusion "
+    "keyword semantic hybrid rerank batch thread process file path metadata"
+).split()
+
+
+def synthetic_texts(count: int, words: int, seed: int):
+    """Random word salads of roughly ``words`` tokens."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(words)) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="+", choices=EMBED_BACKENDS, default=list(EMBED_BACKENDS))
+    parser.add_argument("--chunks", type=int, default=512, help="Chunks encoded for the indexing test")
+    parser.add_argument("--chunk-words", type=int, default=400, help="Words per chunk (~3000 chars)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--quantization", default="avx512_vnni")
+    parser.add_argument("--cache-dir", default=str(Path.home() / ".cache" / "local-rag-bench-models"))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    chunks = synthetic_texts(args.chunks, args.chunk_words, args.seed)
+    queries = synthetic_texts(args.queries, 6, args.seed + 1)
+
+    reference = None
+    rows = []
+    for name in args.backends:
+        backend = ModelBackend(name, cache_dir=Path(args.cache_dir), quantization=args.quantization)
+        print(f"Loading {args.model} ({name})...", flush=True)
+        model = backend.load_sentence_transformer(args.model)
+        model.encode(queries[:4], normalize_embeddings=True)  # warm-up
+
+        start = time.perf_counter()
+        embeddings = np.asarray(
+            model.encode(chunks, normalize_embeddings=True, batch_size=args.batch_size)
+        )
+        index_seconds = time.perf_counter() - start
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            model.encode([query], normalize_embeddings=True)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        if reference is None and name == "torch":
+            reference = embeddings
+        parity = None
+        if reference is not None:
+            parity = float(np.min(np.sum(reference * embeddings, axis=1)))
+
+        rows.append((
+            name,
+            args.chunks / index_seconds,
+            statistics.median(latencies),
+            sorted(latencies)[int(len(latencies) * 0.95) - 1],
+            parity,
+        ))
+
+    print(f"\n{'backend':<12}{'chunks/s':>10}{'query p50 ms':>14}{'query p95 ms':>14}{'min cos vs torch':>18}")
+    for name, throughput, p50, p95, parity in rows:
+        parity_text = f"{parity:.4f}" if parity is not None else "n/a"
+        print(f"{name:<12}{throughput:>10.1f}{p50:>14.2f}{p95:>14.2f}{parity_text:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Chunk embedding cache: cold index vs rebuild with a warm cache.
+
+Builds a synthetic corpus where a fraction of the files are copies of
+others (vendored docs, duplicated notes), indexes it into an empty data
+dir, then indexes it again into a second data dir that starts with only a
+copy of the first one's ``state/embedding_cache``. Reports encode calls
+avoided and wall time for both runs. Uses the configured embedding model
+and vector store in a temporary data dir.
+Run from packages/local-rag with:
+
+PYTHONPATH=. python _dev/benchmarks/bench_embedding_cache.py --files 200 --duplicate-fraction 0.3
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from local_rag.services.index_service import DocumentIndexer
+
+WORDS = (
+    "index search vector query document chunk embedding model token python "
+    "latency throughput cache memory disk segment merge rank score fusion "
+    "keyword semantic hybrid rerank batch thread process file path metadata"
+).split()
+
+
+def write_corpus(root: Path, files: int, sections: int, duplicate_fraction: float, rng: random.Random):
+    root.mkdir(parents=True, exist_ok=True)
+    originals = []
+    for f in range(files):
+        if originals and rng.random() < duplicate_fraction:
+            body = rng.choice(originals)
+        else:
+            body = "\n\n".join(
+                f"# Section {s}\n\n" + " ".join(rng.choice(WORDS) for _ in range(120)) + "."
+                for s in range(sections)
+            )
+            originals.append(body)
+        (root / f"doc_{f:05d}.md").write_text(body)
+
+
+def run(data_dir: Path, source: Path, chunk_size: int):
+    indexer = DocumentIndexer(
+        user_data_dir=str(data_dir),
+        chunk_size=chunk_size,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+    start = time.perf_counter()
+    stats = indexer.index_directory(source)
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chunk embedding cache")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--duplicate-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="local-rag-bench-") as tmp:
+        tmp = Path(tmp)
+        source = tmp / "corpus"
+        write_corpus(source, args.files, args.sections, args.duplicate_fraction, rng)
+
+        print(f"{'run':<8}{'chunks':>8}{'hits':>8}{'misses':>8}{'seconds':>10}")
+        for label in ("cold", "warm"):
+            data = tmp / label
+            if label == "warm":
+                shutil.copytree(tmp / "cold" / "state" / "embedding_cache", data / "state" / "embedding_cache")
+            seconds, stats = run(data, source, args.chunk_size)
+            print(f"{label:<8}{stats['chunks_created']:>8}{stats.get('embedding_cache_hits', 0):>8}"
+                  f"{stats.get('embedding_cache_misses', 0):>8}{seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
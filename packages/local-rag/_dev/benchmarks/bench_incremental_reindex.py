@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Chunk-level incremental re-index vs full re-index.
+
+Builds a synthetic corpus of multi-section markdown files, indexes it once,
+then applies edit rounds (a paragraph rewritten in place, a section inserted
+near the top) to a fraction of the files. Each round is re-indexed twice
+from identical copies of the index: once with the chunk diff and once
+without the stored chunk hashes, which is the previous behaviour (every
+chunk of a changed file is deleted and re-embedded). The chunk embedding
+cache is disabled so both modes pay for every encode they ask for. Uses the
+configured embedding model and vector store in a temporary data dir.
+Run from packages/local-rag with:
+
+PYTHONPATH=. python _dev/benchmarks/bench_incremental_reindex.py --files 200 --sections 40
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from local_rag.services.index_service import DocumentIndexer
+from local_rag.settings import get_settings
+
+WORDS = (
+    "index search vector query document chunk embedding model token python "
+    "latency throughput cache memory disk segment merge rank score fusion "
+    "keyword semantic hybrid rerank batch thread process file path metadata"
+).split()
+
+
+def paragraph(rng: random.Random, words: int = 120) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def write_corpus(root: Path, files: int, sections: int, rng: random.Random):
+    root.mkdir(parents=True, exist_ok=True)
+    for f in range(files):
+        body = "\n\n".join(f"# Section {s}\n\n{paragraph(rng)}" for s in range(sections))
+        (root / f"doc_{f:05d}.md").write_text(body)
+
+
+def edit_corpus(root: Path, fraction: float, rng: random.Random) -> int:
+    """Rewrite one paragraph per picked file and insert a section in half of them."""
+    files = sorted(root.glob("*.md"))
+    picked = rng.sample(files, max(1, int(len(files) * fraction)))
+    for n, path in enumerate(picked):
+        parts = path.read_text().split("\n\n")
+        target = rng.randrange(1, len(parts), 2)  # a paragraph, not a header
+        parts[target] = paragraph(rng)
+        if n % 2 == 0:
+            parts[2:2] = ["# Inserted", paragraph(rng)]
+        path.write_text("\n\n".join(parts))
+    return len(picked)
+
+
+def reindex(data_dir: Path, source: Path, args, diff: bool = True):
+    indexer = DocumentIndexer(settings=get_settings(
+        user_data_dir=str(data_dir),
+        chunk_size=args.chunk_size,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+        embedding_cache_size=0,
+    ))
+    if not diff:
+        for entry in indexer.state.values():
+            entry.pop("chunk_hashes", None)
+    start = time.perf_counter()
+    stats = indexer.index_directory(source)
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunk-level incremental re-indexing")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=30)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--edit-fraction", type=float, default=0.3)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="local-rag-bench-") as tmp:
+        tmp = Path(tmp)
+        source = tmp / "corpus"
+        data = tmp / "data"
+        write_corpus(source, args.files, args.sections, rng)
+
+        print(f"Initial index: {args.files} files x {args.sections} sections...", flush=True)
+        seconds, stats = reindex(data, source, args)
+        print(f"  {stats['chunks_created']} chunks in {seconds:.1f}s\n")
+
+        print(f"{'round':<7}{'files':>7}{'mode':>8}{'embedded':>10}{'re-keyed':>10}{'seconds':>10}")
+        for round_no in range(1, args.rounds + 1):
+            edited = edit_corpus(source, args.edit_fraction, rng)
+
+            full_data = tmp / f"full_{round_no}"
+            shutil.copytree(data, full_data)
+            full_seconds, full_stats = reindex(full_data, source, args, diff=False)
+            shutil.rmtree(full_data)
+
+            diff_seconds, diff_stats = reindex(data, source, args)
+
+            print(f"{round_no:<7}{edited:>7}{'full':>8}{full_stats['chunks_embedded']:>10}"
+                  f"{0:>10}{full_seconds:>10.2f}")
+            print(f"{'':<7}{edited:>7}{'diff':>8}{diff_stats['chunks_embedded']:>10}"
+                  f"{diff_stats['chunks_reused']:>10}{diff_seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Peak memory of the embedding hand-off in a bulk index run.
+
+Feeds synthetic float32 embeddings for ``--chunks`` chunks, in files of
+``--chunks-per-file``, through the vector store write path into a store that
+keeps what a client would receive until the next call. ``lists`` replays the
+previous hand-off (``tolist()`` after encoding, Python float lists buffered,
+one more list per row in the store); ``ndarray`` is the current path through
+VectorStoreRepository, which hands the store one float32 matrix per call.
+Run from packages/local-rag with:
+
+PYTHONPATH=. python _dev/benchmarks/bench_index_memory.py --chunks 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from local_rag.adapters.vectorstore import BaseVectorStore, as_embedding_matrix
+from local_rag.storage.repository import VectorStoreRepository
+
+
+class HandOffStore(BaseVectorStore):
+    """Keeps the last payload a client would be handed; stores nothing else."""
+
+    def __init__(self, as_lists: bool):
+        super().__init__("bench")
+        self.as_lists = as_lists
+        self.payload = None
+        self.written = 0
+
+    def add_documents(self, ids, texts, embeddings, metadatas=None):
+        self.upsert_documents(ids, texts, embeddings, metadatas)
+
+    def upsert_documents(self, ids, texts, embeddings, metadatas=None):
+        self.payload = None
+        if self.as_lists:
+            self.payload = [e.tolist() if hasattr(e, "tolist") else list(e) for e in embeddings]
+        else:
+            self.payload = as_embedding_matrix(embeddings)
+        self.written += len(ids)
+
+    def delete_documents(self, ids=None, where=None):
+        pass
+
+    def search(self, query_embedding, k=10, where=None):
+        return []
+
+    def get_documents(self, ids):
+        return []
+
+    def count(self):
+        return self.written
+
+    def clear(self):
+        self.written = 0
+
+
+def files(args):
+    rng = np.random.default_rng(args.seed)
+    for start in range(0, args.chunks, args.chunks_per_file):
+        n = min(args.chunks_per_file, args.chunks - start)
+        ids = [f"/docs/{start}.md:{i}" for i in range(n)]
+        yield ids, rng.standard_normal((n, args.dim), dtype=np.float32)
+
+
+def run_lists(args) -> HandOffStore:
+    store = HandOffStore(as_lists=True)
+    buffered = {}
+    for ids, vectors in files(args):
+        for doc_id, vector in zip(ids, vectors.tolist()):
+            buffered[doc_id] = vector
+        if len(buffered) >= max(1, args.write_batch):
+            store.upsert_documents(list(buffered), [""] * len(buffered), list(buffered.values()))
+            buffered = {}
+    if buffered:
+        store.upsert_documents(list(buffered), [""] * len(buffered), list(buffered.values()))
+    return store
+
+
+def run_ndarray(args) -> HandOffStore:
+    store = HandOffStore(as_lists=False)
+    repo = VectorStoreRepository(store, write_batch=args.write_batch, write_max_seconds=3600)
+    for ids, vectors in files(args):
+        repo.upsert_documents(ids, [""] * len(ids), vectors, [{"path": ids[0]} for _ in ids])
+    repo.flush()
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report peak memory of the embedding hand-off")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--chunks-per-file", type=int, default=20)
+    parser.add_argument("--write-batch", type=int, default=2048, help="Group commit size (VECTOR_WRITE_BATCH)")
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    print(f"{args.chunks} chunks x {args.dim} dims, {args.chunks_per_file} per file, "
+          f"write batch {args.write_batch}", flush=True)
+    print(f"\n{'hand-off':<10}{'peak MiB':>10}{'seconds':>10}")
+    results = {}
+    for name, run in (("lists", run_lists), ("ndarray", run_ndarray)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        store = run(args)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert store.written == args.chunks
+        results[name] = peak
+        print(f"{name:<10}{peak / 2**20:>10.1f}{elapsed:>10.2f}")
+    print(f"\nndarray hand-off peaks {results['lists'] / max(results['ndarray'], 1):.1f}x lower")
+
+
+if __name__ == "__main__":
+    main()
@@ -141,10 +141,13 @@ fake_surya = types.ModuleType("surya")
 fake_surya.ocr = types.SimpleNamespace(run_ocr=lambda arr: [[{"text_blocks": []}]])
 sys.modules["surya"] = fake_surya
 
-# numpy stub (only minimal use in OCR paths)
-fake_np = types.ModuleType("numpy")
-fake_np.array = lambda x: x
-sys.modules["numpy"] = fake_np
+# numpy stub (only minimal use in OCR paths); BM25 storage needs the real thing
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    fake_np = types.ModuleType("numpy")
+    fake_np.array = lambda x: x
+    sys.modules["numpy"] = fake_np
 
 # -------------------------
 # Stub mcp_server module (missing in repo)
@@ -289,7 +292,7 @@ class InMemoryVectorStore(vectorstore.BaseVectorStore):
         scored.sort(key=lambda r: r.score, reverse=True)
         return scored[:k]
 
-    def get_documents(self, ids):
+    def get_documents(self, ids, include_embeddings=True):
         docs = []
         for doc_id in ids:
             if doc_id in self._docs:
@@ -298,6 +301,7 @@ class InMemoryVectorStore(vectorstore.BaseVectorStore):
                     vectorstore.Document(
                         id=doc_id,
                         text=data["text"],
+                        embedding=data["embedding"] if include_embeddings else None,
                         metadata=data["metadata"]
                     )
                 )
@@ -311,14 +315,12 @@ class InMemoryVectorStore(vectorstore.BaseVectorStore):
 
     # Chroma-like query interface used by HybridSearcher
     def query(self, query_embeddings, n_results, include, where=None):
-        query_embedding = query_embeddings[0]
-        results = self.search(query_embedding, k=n_results, where=where)
-        distances = [[max(0.0, 1 - r.score) for r in results]]
+        rows = [self.search(emb, k=n_results, where=where) for emb in query_embeddings]
         return {
-            "ids": [[r.id for r in results]],
-            "documents": [[r.text for r in results]],
-            "metadatas": [[r.metadata for r in results]],
-            "distances": distances
+            "ids": [[r.id for r in results] for results in rows],
+            "documents": [[r.text for r in results] for results in rows],
+            "metadatas": [[r.metadata for r in results] for results in rows],
+            "distances": [[max(0.0, 1 - r.score) for r in results] for results in rows]
         }
 
 
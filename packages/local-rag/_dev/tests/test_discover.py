@@ -0,0 +1,89 @@
+"""Tests for file discovery."""
+
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+
+import pytest
+
+from local_rag.ingestion import discover
+from local_rag.ingestion.discover import discover_files
+
+EXTS = {".md", ".py", ".txt"}
+EXCLUDE_DIRS = {".git", "node_modules", ".venv"}
+
+
+def _rglob_reference(root, include_globs=(), exclude_globs=()):
+    """The previous rglob-based behaviour."""
+    found = []
+    for path in root.rglob("*"):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(root)
+        if any(part in EXCLUDE_DIRS for part in rel.parent.parts):
+            continue
+        if path.suffix.lower() not in EXTS:
+            continue
+        if include_globs and not any(fnmatch(str(rel), g) for g in include_globs):
+            continue
+        if any(fnmatch(str(rel), g) for g in exclude_globs):
+            continue
+        found.append(path)
+    return sorted(found)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "home"
+    files = [
+        "README.md", "notes.txt", "image.png",
+        "src/app.py", "src/pkg/mod.py", "src/pkg/data.bin",
+        "src/node_modules/lib/index.md",
+        ".git/HEAD.txt",
+        "project/.venv/lib/site.py",
+        "build/out.md", "build/deep/more.md",
+        "docs/guide.md", "docs/private/secret.md", "docs/private/inner/x.md",
+        "UPPER.MD",
+    ]
+    for rel in files:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+    os.symlink(root / "src", root / "docs" / "src-link")
+    return root
+
+
+class TestDiscoverFiles:
+    """Tests for discover_files against the previous rglob behaviour."""
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    @pytest.mark.parametrize("include,exclude", [
+        ((), ()),
+        ((), ("build/*", "docs/private/**")),
+        (("*.md",), ("*/pkg/*",)),
+        (("src/*",), ()),
+    ])
+    def test_matches_rglob(self, tree, include, exclude, workers):
+        """Same files as the rglob walk, for every glob combination."""
+        found = discover_files(tree, EXTS, EXCLUDE_DIRS, list(include), list(exclude), workers=workers)
+        assert sorted(found) == _rglob_reference(tree, include, exclude)
+
+    def test_excluded_dirs_are_not_entered(self, tree, monkeypatch):
+        """node_modules, .git and glob-covered directories are never scanned."""
+        scanned = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(discover.os, "scandir", lambda p: scanned.append(Path(p)) or real_scandir(p))
+
+        list(discover_files(tree, EXTS, EXCLUDE_DIRS, exclude_globs=["build/*"]))
+        names = {p.name for p in scanned}
+        assert "node_modules" not in names
+        assert ".git" not in names
+        assert ".venv" not in names
+        assert "build" not in names
+        assert "deep" not in names
+        assert "pkg" in names
+
+    def test_symlinked_dirs_not_followed(self, tree):
+        """A symlinked directory is not walked twice."""
+        found = list(discover_files(tree, EXTS, EXCLUDE_DIRS))
+        assert not any("src-link" in str(p) for p in found)
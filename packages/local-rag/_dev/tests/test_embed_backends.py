@@ -0,0 +1,126 @@
+"""Tests for embedding/reranker model backends (torch, onnx, onnx-int8)."""
+
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from local_rag.adapters.embeddings import ModelBackend
+
+
+class _FakeOnnxModel:
+    """Records how it was constructed; save_pretrained writes the ONNX file."""
+
+    created = []
+
+    def __init__(self, name_or_path, backend=None, model_kwargs=None):
+        self.name_or_path = name_or_path
+        self.backend = backend
+        self.model_kwargs = model_kwargs
+        _FakeOnnxModel.created.append(self)
+
+    def save_pretrained(self, path):
+        onnx_dir = Path(path) / "onnx"
+        onnx_dir.mkdir(parents=True, exist_ok=True)
+        (onnx_dir / "model.onnx").write_bytes(b"fp32")
+
+
+@pytest.fixture
+def fake_onnx_export(monkeypatch):
+    """Patch the sentence_transformers stub with exporting fakes."""
+    exports = []
+
+    def export_dynamic_quantized_onnx_model(model, quantization, path):
+        exports.append((model.name_or_path, quantization))
+        (Path(path) / "onnx" / f"model_qint8_{quantization}.onnx").write_bytes(b"int8")
+
+    st = sys.modules["sentence_transformers"]
+    monkeypatch.setattr(st, "SentenceTransformer", _FakeOnnxModel)
+    monkeypatch.setattr(st, "CrossEncoder", _FakeOnnxModel)
+    monkeypatch.setattr(
+        st, "export_dynamic_quantized_onnx_model", export_dynamic_quantized_onnx_model, raising=False
+    )
+    _FakeOnnxModel.created = []
+    return exports
+
+
+class TestModelBackend:
+    """Tests for ModelBackend configuration and export caching."""
+
+    def test_rejects_unknown_backend(self, tmp_path):
+        """Only torch, onnx and onnx-int8 are accepted."""
+        with pytest.raises(ValueError, match="Unknown embed backend"):
+            ModelBackend("tensorrt", cache_dir=tmp_path)
+
+    def test_onnx_requires_cache_dir(self):
+        """Exported models need somewhere to live."""
+        with pytest.raises(ValueError, match="cache_dir"):
+            ModelBackend("onnx")
+
+    def test_cache_key_includes_backend(self, tmp_path):
+        """Query-embedding cache entries are not shared across backends."""
+        model = "sentence-transformers/all-MiniLM-L6-v2"
+        assert ModelBackend().cache_key(model) == model
+        assert ModelBackend("onnx-int8", cache_dir=tmp_path).cache_key(model) != model
+
+    def test_int8_export_is_cached(self, tmp_path, fake_onnx_export):
+        """The first load exports and quantizes; later loads reuse the files."""
+        backend = ModelBackend("onnx-int8", cache_dir=tmp_path, quantization="avx2")
+        model = backend.load_sentence_transformer("org/model")
+
+        export_dir = tmp_path / "org--model"
+        assert (export_dir / "onnx" / "model_qint8_avx2.onnx").exists()
+        assert fake_onnx_export == [(str(export_dir), "avx2")]
+        assert model.name_or_path == str(export_dir)
+        assert model.model_kwargs == {"file_name": "onnx/model_qint8_avx2.onnx"}
+
+        _FakeOnnxModel.created = []
+        backend.load_sentence_transformer("org/model")
+        assert len(fake_onnx_export) == 1
+        assert [m.name_or_path for m in _FakeOnnxModel.created] == [str(export_dir)]
+
+    def test_fp32_onnx_reranker(self, tmp_path, fake_onnx_export):
+        """Cross-encoders go through the same export path without quantizing."""
+        model = ModelBackend("onnx", cache_dir=tmp_path).load_cross_encoder("org/reranker")
+        assert model.backend == "onnx"
+        assert model.model_kwargs == {"file_name": "onnx/model.onnx"}
+        assert fake_onnx_export == []
+
+
+def _real_sentence_transformers():
+    """Import the real package behind the conftest stub, or skip."""
+    pytest.importorskip("onnxruntime")
+    stub = sys.modules.pop("sentence_transformers")
+    try:
+        return importlib.import_module("sentence_transformers")
+    except ImportError:
+        pytest.skip("sentence-transformers is not installed")
+    finally:
+        sys.modules["sentence_transformers"] = stub
+
+
+@pytest.mark.requires_models
+@pytest.mark.slow
+def test_int8_cosine_parity(tmp_path, monkeypatch):
+    """Quantized ONNX embeddings stay within cosine 0.98 of the torch model."""
+    real_st = _real_sentence_transformers()
+    monkeypatch.setitem(sys.modules, "sentence_transformers", real_st)
+
+    model_name = "sentence-transformers/all-MiniLM-L6-v2"
+    texts = [
+        "How do I configure hybrid search weights?",
+        "Dogs are loyal pets that love to fetch balls and run.",
+        "def fhash(p): return hashlib.sha1(p.read_bytes()).hexdigest()",
+        "Quarterly revenue grew 12% year over year.",
+    ]
+
+    reference = ModelBackend().load_sentence_transformer(model_name)
+    quantized = ModelBackend("onnx-int8", cache_dir=tmp_path).load_sentence_transformer(model_name)
+
+    expected = np.asarray(reference.encode(texts, normalize_embeddings=True))
+    actual = np.asarray(quantized.encode(texts, normalize_embeddings=True))
+    cosine = np.sum(expected * actual, axis=1)
+
+    assert cosine.min() >= 0.98, cosine
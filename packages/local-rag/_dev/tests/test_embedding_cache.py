@@ -0,0 +1,112 @@
+"""Tests for the persistent chunk embedding cache."""
+
+import json
+
+import numpy as np
+
+from local_rag.storage.embedding_cache import EmbeddingCache, text_key
+
+
+def _vectors(count, dim=4, start=0):
+    return np.arange(start, start + count * dim, dtype=np.float32).reshape(count, dim)
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache lookups, persistence and eviction."""
+
+    def test_key_ignores_whitespace_layout(self):
+        """Re-wrapped text maps to the same entry; different text does not."""
+        assert text_key("alpha  beta\n gamma") == text_key(" alpha beta gamma ")
+        assert text_key("alpha beta") != text_key("alpha gamma")
+
+    def test_hits_and_misses(self, tmp_path):
+        """Stored vectors come back unchanged and lookups are counted."""
+        cache = EmbeddingCache(tmp_path / "cache")
+        cache.put_many(["a", "b"], _vectors(2))
+
+        found = cache.get_many(["a", "c", "b"])
+        assert found[1] is None
+        np.testing.assert_array_equal(found[0], _vectors(2)[0])
+        np.testing.assert_array_equal(found[2], _vectors(2)[1])
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_flush_persists(self, tmp_path):
+        """A new instance reads vectors and the index written by flush()."""
+        cache = EmbeddingCache(tmp_path / "cache")
+        cache.put_many(["a", "b"], _vectors(2))
+        cache.flush()
+
+        reopened = EmbeddingCache(tmp_path / "cache")
+        assert len(reopened) == 2
+        np.testing.assert_array_equal(reopened.get_many(["b"])[0], _vectors(2)[1])
+
+    def test_hits_do_not_rewrite_index(self, tmp_path):
+        """Flushing after only hits (or re-puts of cached text) leaves meta.json alone."""
+        cache = EmbeddingCache(tmp_path / "cache")
+        cache.put_many(["a", "b"], _vectors(2))
+        cache.flush()
+        meta = tmp_path / "cache" / "meta.json"
+        before = meta.stat().st_ino, meta.read_text()
+
+        cache.get_many(["b", "a"])
+        cache.put_many(["a"], _vectors(1))
+        cache.flush()
+        assert (meta.stat().st_ino, meta.read_text()) == before
+
+        cache.put_many(["c"], _vectors(1, start=8))
+        cache.flush()
+        # Recency from the hits is saved with the next real change
+        assert list(json.loads(meta.read_text())["entries"]) == [text_key(t) for t in ("b", "a", "c")]
+
+    def test_unflushed_entries_are_not_visible(self, tmp_path):
+        """Only flushed entries survive a restart."""
+        cache = EmbeddingCache(tmp_path / "cache")
+        cache.put_many(["a"], _vectors(1))
+        cache.flush()
+        cache.put_many(["b"], _vectors(1, start=100))
+
+        reopened = EmbeddingCache(tmp_path / "cache")
+        assert reopened.get_many(["a", "b"])[1] is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Past max_entries, the least recently used entries are dropped."""
+        cache = EmbeddingCache(tmp_path / "cache", max_entries=3)
+        cache.put_many(["a", "b", "c"], _vectors(3))
+        cache.get_many(["a"])
+        cache.put_many(["d"], _vectors(1, start=50))
+
+        assert len(cache) <= 3
+        assert cache.get_many(["b"])[0] is None
+        np.testing.assert_array_equal(cache.get_many(["a"])[0], _vectors(3)[0])
+        np.testing.assert_array_equal(cache.get_many(["d"])[0], _vectors(1, start=50)[0])
+        assert cache.stats()["evictions"] >= 1
+
+    def test_evicted_rows_not_reused_before_flush(self, tmp_path):
+        """A crash before flush cannot map an old key to a newer vector."""
+        cache = EmbeddingCache(tmp_path / "cache", max_entries=2)
+        cache.put_many(["a", "b"], _vectors(2))
+        cache.flush()
+        cache.put_many(["c", "d"], _vectors(2, start=100))
+
+        reopened = EmbeddingCache(tmp_path / "cache", max_entries=2)
+        for key, expected in zip(["a", "b", "c", "d"], np.vstack([_vectors(2), _vectors(2, start=100)])):
+            found = reopened.get_many([key])[0]
+            if found is not None:
+                np.testing.assert_array_equal(found, expected)
+
+    def test_dimension_change_resets(self, tmp_path):
+        """Vectors of another size replace the cache instead of corrupting it."""
+        cache = EmbeddingCache(tmp_path / "cache")
+        cache.put_many(["a"], _vectors(1))
+        cache.put_many(["b"], _vectors(1, dim=8))
+
+        assert cache.dim == 8
+        assert cache.get_many(["a"])[0] is None
+        assert cache.get_many(["b"])[0].shape == (8,)
+
+    def test_disabled(self, tmp_path):
+        """max_entries=0 stores nothing."""
+        cache = EmbeddingCache(tmp_path / "cache", max_entries=0)
+        cache.put_many(["a"], _vectors(1))
+        assert cache.get_many(["a"]) == [None]
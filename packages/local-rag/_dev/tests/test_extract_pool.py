@@ -0,0 +1,80 @@
+"""Tests for process-pool document extraction."""
+
+import importlib.machinery
+import os
+from pathlib import Path
+
+import pytest
+
+from local_rag.ingestion.extract_pool import ExtractorPool, open_extractor_pool
+from local_rag.settings import get_settings
+
+
+def _extraction_deps_installed() -> bool:
+    """The default worker target imports the real extraction dependencies, not the conftest stubs."""
+    return all(importlib.machinery.PathFinder.find_spec(name) for name in ("pdf2image", "pypdf", "PIL"))
+
+
+requires_extraction_deps = pytest.mark.skipif(
+    not _extraction_deps_installed(), reason="read_text_with_ocr needs pdf2image, pypdf and Pillow"
+)
+
+
+def read_with_pid(path: str) -> str:
+    """Worker target: the file text tagged with the worker's pid."""
+    return f"{os.getpid()}:{Path(path).read_text()}"
+
+
+def crash_on_boom(path: str) -> str:
+    """Worker target that kills its process for one file."""
+    if Path(path).name == "boom.txt":
+        os._exit(1)
+    return Path(path).read_text()
+
+
+class TestExtractorPool:
+    """Tests for ExtractorPool workers, recycling and crash recovery."""
+
+    def test_disabled_by_default(self, tmp_path):
+        """EXTRACT_WORKERS=0 keeps extraction on the indexer's threads."""
+        assert open_extractor_pool(get_settings(user_data_dir=str(tmp_path))) is None
+
+    def test_extracts_in_other_processes(self, tmp_path):
+        """Text comes back from a worker process."""
+        doc = tmp_path / "a.txt"
+        doc.write_text("hello")
+        with ExtractorPool(get_settings(user_data_dir=str(tmp_path)), workers=1, target=read_with_pid) as pool:
+            pid, text = pool.read_text(doc).split(":", 1)
+        assert text == "hello"
+        assert int(pid) != os.getpid()
+
+    @requires_extraction_deps
+    def test_default_target_runs_extractors(self, tmp_path):
+        """Without a custom target, workers extract with read_text_with_ocr."""
+        doc = tmp_path / "a.md"
+        doc.write_text("# Title\n\nbody")
+        with ExtractorPool(get_settings(user_data_dir=str(tmp_path)), workers=1) as pool:
+            assert pool.read_text(doc) == "# Title\n\nbody"
+
+    def test_workers_recycled_after_n_files(self, tmp_path):
+        """A worker is replaced after max_files_per_worker files."""
+        docs = []
+        for n in range(6):
+            docs.append(tmp_path / f"{n}.txt")
+            docs[-1].write_text(str(n))
+
+        settings = get_settings(user_data_dir=str(tmp_path))
+        with ExtractorPool(settings, workers=1, max_files_per_worker=2, target=read_with_pid) as pool:
+            pids = [pool.read_text(doc).split(":", 1)[0] for doc in docs]
+        assert len(set(pids)) == 3
+
+    def test_crashed_worker_fails_only_its_file(self, tmp_path):
+        """A dying worker fails the file it was reading; the pool recovers."""
+        from concurrent.futures.process import BrokenProcessPool
+
+        (tmp_path / "boom.txt").write_text("x")
+        (tmp_path / "ok.txt").write_text("fine")
+        with ExtractorPool(get_settings(user_data_dir=str(tmp_path)), workers=1, target=crash_on_boom) as pool:
+            with pytest.raises(BrokenProcessPool):
+                pool.read_text(tmp_path / "boom.txt")
+            assert pool.read_text(tmp_path / "ok.txt") == "fine"
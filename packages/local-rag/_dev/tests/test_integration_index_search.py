@@ -1,7 +1,10 @@
 """Integration-style index + search round-trip tests."""
 
+import json
 import math
+import os
 import sys
+import threading
 import types
 from pathlib import Path
 
@@ -151,7 +154,7 @@ class InMemoryChroma(vectorstore.BaseVectorStore):
         scored.sort(key=lambda r: r.score, reverse=True)
         return scored[:k]
 
-    def get_documents(self, ids):
+    def get_documents(self, ids, include_embeddings=True):
         docs = []
         for doc_id in ids:
             if doc_id in self._docs:
@@ -160,6 +163,7 @@ class InMemoryChroma(vectorstore.BaseVectorStore):
                     vectorstore.Document(
                         id=doc_id,
                         text=data["text"],
+                        embedding=data["embedding"] if include_embeddings else None,
                         metadata=data["metadata"]
                     )
                 )
@@ -173,14 +177,12 @@ class InMemoryChroma(vectorstore.BaseVectorStore):
 
     # Chroma-like query interface used by HybridSearcher
     def query(self, query_embeddings, n_results, include, where=None):
-        query_embedding = query_embeddings[0]
-        results = self.search(query_embedding, k=n_results, where=where)
-        distances = [[max(0.0, 1 - r.score) for r in results]]
+        rows = [self.search(emb, k=n_results, where=where) for emb in query_embeddings]
         return {
-            "ids": [[r.id for r in results]],
-            "documents": [[r.text for r in results]],
-            "metadatas": [[r.metadata for r in results]],
-            "distances": distances
+            "ids": [[r.id for r in results] for results in rows],
+            "documents": [[r.text for r in results] for results in rows],
+            "metadatas": [[r.metadata for r in results] for results in rows],
+            "distances": [[max(0.0, 1 - r.score) for r in results] for results in rows]
         }
 
 
@@ -259,3 +261,604 @@ def test_index_and_search_round_trip(tmp_path, patched_vector_store, patched_emb
     cat_filtered = [item for item in cat_filtered if Path(item["path"]).name == "cats.md"]
     assert cat_filtered, "Expected filtered result for cats"
     assert searcher.hybrid_searcher.bm25_index.doc_count >= 3
+
+
+@pytest.mark.integration
+def test_query_cache_invalidated_by_commit(tmp_path, patched_vector_store, patched_embeddings):
+    """Repeated queries hit the cache until the indexer commits again."""
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    user_data_dir = tmp_path / "user-data"
+    (source_dir / "dogs.md").write_text("Dogs are loyal pets that love to fetch balls and run.")
+
+    indexer = DocumentIndexer(
+        user_data_dir=str(user_data_dir),
+        chunk_size=256,
+        chunk_overlap=32,
+        chunking_strategy="fixed",
+        parallel_workers=1,
+    )
+    indexer.index_directory(source_dir)
+
+    searcher = DocumentSearcher(user_data_dir=str(user_data_dir), search_method="hybrid")
+    first = searcher.search("loyal dogs", k=3)
+    second = searcher.search("  loyal   dogs ", k=3)
+    assert second == first
+    assert searcher.get_stats()["query_cache"]["hits"] == 1
+    # Case is significant to the models, so a different casing is a miss
+    searcher.search("Loyal dogs", k=3)
+    assert searcher.get_stats()["query_cache"]["hits"] == 1
+
+    # Mutating a returned result must not leak into the cache
+    second[0]["score"] = -1.0
+    assert searcher.search("loyal dogs", k=3) == first
+
+    (source_dir / "wolves.md").write_text("Wolves are wild relatives of loyal dogs and hunt in packs.")
+    indexer.index_directory(source_dir)
+
+    refreshed = searcher.search("loyal dogs", k=3)
+    names = {Path(item["path"]).name for item in refreshed}
+    assert "wolves.md" in names
+    stats = searcher.get_stats()
+    assert stats["index_generation"] == 2
+    assert stats["query_cache"]["size"] == 1
+
+
+@pytest.mark.integration
+def test_search_many_matches_single_search(tmp_path, patched_vector_store, patched_embeddings, capsys):
+    """Batched searches return the same results as one-by-one searches."""
+    from local_rag.services.search_service import run_queries_file
+
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    user_data_dir = tmp_path / "user-data"
+    (source_dir / "dogs.md").write_text("Dogs are loyal pets that love to fetch balls and run.")
+    (source_dir / "cats.md").write_text("Cats prefer quiet naps on sunny windowsills and purr softly.")
+
+    DocumentIndexer(
+        user_data_dir=str(user_data_dir),
+        chunk_size=256,
+        chunk_overlap=32,
+        chunking_strategy="fixed",
+        parallel_workers=1,
+    ).index_directory(source_dir)
+
+    queries = ["loyal dogs", "quiet cats", "loyal dogs"]
+    batch = DocumentSearcher(user_data_dir=str(user_data_dir)).search_many(queries, k=2)
+    fresh = DocumentSearcher(user_data_dir=str(user_data_dir))
+    assert batch == [fresh.search(q, k=2) for q in queries]
+
+    queries_file = tmp_path / "queries.jsonl"
+    queries_file.write_text(
+        '{"id": 1, "query": "loyal dogs"}\n'
+        '"quiet cats"\n'
+        '{"id": 3, "query": "quiet cats", "k": 1}\n'
+    )
+    run_queries_file(fresh, str(queries_file), k=2, metadata_filter=None, method="hybrid")
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert [line.get("id") for line in lines] == [1, None, 3]
+    assert lines[0]["results"] == batch[0]
+    assert len(lines[2]["results"]) == 1
+
+
+def _sections(count, prefix="Section"):
+    return [
+        f"# {prefix} {i}\n\n" + f"Paragraph about topic {i} with some distinct words. " * 5
+        for i in range(count)
+    ]
+
+
+@pytest.mark.integration
+def test_reindex_embeds_only_changed_chunks(tmp_path, patched_vector_store, patched_embeddings):
+    """Editing one section re-embeds one chunk; shifted chunks reuse embeddings."""
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    doc = source_dir / "guide.md"
+    sections = _sections(6)
+    doc.write_text("\n\n".join(sections))
+
+    indexer = DocumentIndexer(
+        user_data_dir=str(tmp_path / "user-data"),
+        chunk_size=300,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+    first = indexer.index_directory(source_dir)
+    assert first["chunks_embedded"] == 6
+    state = indexer.state[str(doc)]
+    assert len(state["chunk_hashes"]) == 6
+
+    # Same-length edit inside section 3: offsets stay, one chunk changes
+    sections[3] = sections[3].replace("topic 3", "TOPIC 3")
+    doc.write_text("\n\n".join(sections))
+    edited = indexer.index_directory(source_dir)
+    assert edited["chunks_embedded"] == 1
+    assert edited["chunks_unchanged"] == 5
+
+    # Insert a section at the top: later chunks move but keep their text
+    doc.write_text("# Intro\n\nA brand new introduction paragraph.\n\n" + "\n\n".join(sections))
+    shifted = indexer.index_directory(source_dir)
+    assert shifted["chunks_reused"] >= 4
+    assert shifted["chunks_embedded"] <= 2
+
+    # The store and BM25 hold exactly the current chunk set
+    current_ids = set(indexer.state[str(doc)]["chunk_hashes"])
+    assert set(indexer.vector_store._docs) == current_ids
+    assert set(indexer.bm25_index.doc_ids_with_prefix(f"{doc}:")) == current_ids
+    assert all(
+        data["metadata"]["chunk_hash"] == indexer.state[str(doc)]["chunk_hashes"][doc_id]
+        for doc_id, data in indexer.vector_store._docs.items()
+    )
+
+
+@pytest.mark.integration
+def test_reindex_refreshes_metadata_of_unchanged_chunks(tmp_path, patched_vector_store, patched_embeddings):
+    """Chunks kept as-is still get the file's new mtime and their new chunk_index."""
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    doc = source_dir / "guide.md"
+    sections = _sections(4)
+    doc.write_text("\n\n".join(sections))
+
+    indexer = DocumentIndexer(
+        user_data_dir=str(tmp_path / "user-data"),
+        chunk_size=300,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+    indexer.index_directory(source_dir)
+
+    # Same-length filler the quality filter drops: later chunks keep their ids
+    sections[0] = "\x01" * len(sections[0])
+    doc.write_text("\n\n".join(sections))
+    st = doc.stat()
+    os.utime(doc, ns=(st.st_atime_ns, st.st_mtime_ns + 100 * 10**9))
+    stats = indexer.index_directory(source_dir)
+    assert stats["chunks_unchanged"] == 3
+    assert stats["chunks_embedded"] == 0
+
+    entry = indexer.state[str(doc)]
+    positions = {doc_id: i for i, doc_id in enumerate(entry["chunk_hashes"])}
+    assert set(indexer.vector_store._docs) == set(positions)
+    for doc_id, data in indexer.vector_store._docs.items():
+        assert data["metadata"]["chunk_index"] == positions[doc_id]
+        assert data["metadata"]["mtime"] == entry["mtime"]
+
+
+@pytest.mark.integration
+def test_force_reindex_embeds_everything(tmp_path, patched_vector_store, patched_embeddings):
+    """force=True bypasses the chunk diff."""
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    (source_dir / "guide.md").write_text("\n\n".join(_sections(3)))
+
+    indexer = DocumentIndexer(
+        user_data_dir=str(tmp_path / "user-data"),
+        chunk_size=300,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+    indexer.index_directory(source_dir)
+    again = indexer.index_directory(source_dir, force=True)
+    assert again["chunks_embedded"] == 3
+    assert again["chunks_unchanged"] == 0
+    # ...but the vectors come from the embedding cache, not the model
+    assert again["embedding_cache_hits"] == 3
+    assert again["embedding_cache_misses"] == 0
+
+
+@pytest.mark.integration
+def test_unchanged_files_are_not_hashed(tmp_path, patched_vector_store, patched_embeddings, monkeypatch):
+    """Matching size + mtime_ns skips hashing; touching a file hashes it once."""
+    import os
+
+    from local_rag.services import index_service
+
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    doc = source_dir / "guide.md"
+    doc.write_text("\n\n".join(_sections(3)))
+
+    hashed = []
+    real_digest = index_service.file_digest
+    monkeypatch.setattr(
+        index_service, "file_digest", lambda p, algo="sha1": hashed.append(p) or real_digest(p, algo)
+    )
+
+    indexer = DocumentIndexer(
+        user_data_dir=str(tmp_path / "user-data"),
+        chunk_size=300,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+    indexer.index_directory(source_dir)
+    assert hashed == [doc]
+    entry = indexer.state[str(doc)]
+    assert entry["hash_algo"] == "blake2b"
+    assert entry["mtime_ns"] == doc.stat().st_mtime_ns
+
+    hashed.clear()
+    assert indexer.index_directory(source_dir)["skipped_unchanged"] == 1
+    assert hashed == []
+
+    # Touched but identical: hashed once, stat refreshed, still unchanged
+    os.utime(doc, ns=(entry["mtime_ns"] + 10**9, entry["mtime_ns"] + 10**9))
+    assert indexer.index_directory(source_dir)["skipped_unchanged"] == 1
+    assert hashed == [doc]
+    hashed.clear()
+    assert indexer.index_directory(source_dir)["skipped_unchanged"] == 1
+    assert hashed == []
+
+    # --verify-hashes reads every file
+    assert indexer.index_directory(source_dir, verify_hashes=True)["skipped_unchanged"] == 1
+    assert hashed == [doc]
+
+    # An edit is hashed once and the digest reused for the new state
+    hashed.clear()
+    doc.write_text(doc.read_text() + "\n\n# Extra\n\nMore text about something else entirely.")
+    stats = indexer.index_directory(source_dir)
+    assert stats["files_processed"] == 1
+    assert hashed == [doc]
+    assert indexer.state[str(doc)]["hash"] == real_digest(doc, "blake2b")
+
+
+@pytest.mark.integration
+def test_legacy_sha1_state_not_reindexed(tmp_path, patched_vector_store, patched_embeddings):
+    """State written before size/mtime_ns were recorded is compared with sha1."""
+    from local_rag.services.index_service import fhash
+
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    doc = source_dir / "guide.md"
+    doc.write_text("\n\n".join(_sections(2)))
+
+    indexer = DocumentIndexer(
+        user_data_dir=str(tmp_path / "user-data"),
+        chunk_size=300,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+    indexer.index_directory(source_dir)
+    entry = indexer.state[str(doc)]
+    for key in ("hash_algo", "size", "mtime_ns"):
+        entry.pop(key)
+    entry["hash"] = fhash(doc)
+
+    stats = indexer.index_directory(source_dir)
+    assert stats["skipped_unchanged"] == 1
+    assert entry["mtime_ns"] == doc.stat().st_mtime_ns
+
+
+@pytest.mark.integration
+def test_interrupted_run_resumes_from_checkpoint(tmp_path, patched_vector_store, patched_embeddings, monkeypatch):
+    """Files checkpointed before a crash are not indexed again."""
+    from local_rag.health import get_health
+    from local_rag.settings import get_settings
+
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    for n in range(5):
+        (source_dir / f"doc{n}.md").write_text("\n\n".join(_sections(2, prefix=f"Doc {n}")))
+
+    def make_indexer():
+        return DocumentIndexer(settings=get_settings(
+            user_data_dir=str(tmp_path / "user-data"),
+            chunk_size=300,
+            chunk_overlap=0,
+            chunking_strategy="template",
+            parallel_workers=1,
+            index_checkpoint_files=1,
+        ))
+
+    def crash(self):
+        raise RuntimeError("killed")
+
+    # Crash before the final commit: only the checkpoints made it to disk
+    with monkeypatch.context() as patch:
+        patch.setattr(DocumentIndexer, "commit", crash)
+        with pytest.raises(RuntimeError):
+            make_indexer().index_directory(source_dir)
+
+    health = get_health(get_settings(user_data_dir=str(tmp_path / "user-data")))
+    assert health["indexed_files"] == 5
+    assert health["indexed_chunks"] == 10
+    assert health["last_run_interrupted"] is True
+    # Checkpoints flush buffered vector writes before the state commit
+    assert make_indexer().vector_store.count() == 10
+
+    resumed = make_indexer().index_directory(source_dir)
+    assert resumed["skipped_unchanged"] == 5
+    assert resumed["files_processed"] == 0
+    assert get_health(get_settings(user_data_dir=str(tmp_path / "user-data")))["last_run_interrupted"] is False
+
+
+@pytest.mark.integration
+def test_parallel_pipeline_matches_serial(tmp_path, patched_vector_store, patched_embeddings):
+    """Parallel extraction with cross-file batches indexes the same chunks."""
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    for n in range(8):
+        (source_dir / f"doc{n}.md").write_text("\n\n".join(_sections(3, prefix=f"Doc {n}")))
+
+    results = {}
+    for workers in (1, 4):
+        indexer = DocumentIndexer(
+            user_data_dir=str(tmp_path / f"user-data-{workers}"),
+            chunk_size=300,
+            chunk_overlap=0,
+            chunking_strategy="template",
+            parallel_workers=workers,
+        )
+        stats = indexer.index_directory(source_dir)
+        results[workers] = (stats, indexer)
+
+    serial, parallel = results[1][0], results[4][0]
+    assert parallel["files_processed"] == serial["files_processed"] == 8
+    assert parallel["chunks_created"] == serial["chunks_created"] == 24
+    assert set(results[4][1].state) == set(results[1][1].state)
+
+    pipeline = parallel["pipeline"]
+    assert list(pipeline) == ["extract", "chunk", "embed", "write"]
+    assert pipeline["extract"]["items"] == 8
+    assert pipeline["embed"]["chunks"] == 24
+    assert pipeline["write"]["chunks"] == 24
+    assert pipeline["embed"]["batches"] <= 8
+
+
+@pytest.mark.integration
+def test_embedding_cache_shared_across_files_and_runs(tmp_path, patched_vector_store, patched_embeddings):
+    """Duplicate chunk text is encoded once, also by a later indexer process."""
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    text = "\n\n".join(_sections(3))
+    (source_dir / "a.md").write_text(text)
+    (source_dir / "b.md").write_text(text)
+
+    def make_indexer():
+        return DocumentIndexer(
+            user_data_dir=str(tmp_path / "user-data"),
+            chunk_size=300,
+            chunk_overlap=0,
+            chunking_strategy="template",
+            parallel_workers=1,
+        )
+
+    first = make_indexer().index_directory(source_dir)
+    assert first["chunks_embedded"] == 6
+    assert first["embedding_cache_misses"] == 3
+
+    (source_dir / "c.md").write_text(text.replace("\n\n", "\n\n\n"))
+    indexer = make_indexer()
+    second = indexer.index_directory(source_dir)
+    assert second["embedding_cache_hits"] == 3
+    assert second["embedding_cache_misses"] == 0
+    assert indexer.get_stats()["embedding_cache"]["entries"] == 3
+
+
+@pytest.mark.integration
+def test_watch_service_applies_changes(tmp_path, patched_vector_store, patched_embeddings, monkeypatch):
+    """Watched edits, new files and deletions reach the store, BM25 and state."""
+    from local_rag.ingestion.watch import CHANGED, DELETED, FsEvent
+    from local_rag.services import index_service
+    from local_rag.services.watch_service import WatchService
+
+    class NoEvents:
+        def read(self, timeout):
+            return []
+
+        def close(self):
+            pass
+
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    keep, edit, gone = (source_dir / name for name in ("keep.md", "edit.md", "gone.md"))
+    for n, path in enumerate((keep, edit, gone)):
+        path.write_text("\n\n".join(_sections(2, prefix=f"Doc {n}")))
+
+    indexer = DocumentIndexer(
+        user_data_dir=str(tmp_path / "user-data"),
+        chunk_size=300,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+    service = WatchService(indexer, source_dir, watcher=NoEvents())
+    service.rescan()
+    assert indexer.repository.count() == 6
+
+    edit.write_text("\n\n".join(_sections(3, prefix="Doc 1")))
+    gone.unlink()
+    new = source_dir / "new.md"
+    new.write_text("\n\n".join(_sections(1, prefix="Doc 3")))
+    hashed = []
+    file_digest = index_service.file_digest
+
+    def counting_digest(path, algo):
+        hashed.append(str(path))
+        return file_digest(path, algo)
+
+    monkeypatch.setattr(index_service, "file_digest", counting_digest)
+    service.add_events([
+        FsEvent(CHANGED, str(keep)),
+        FsEvent(CHANGED, str(edit)),
+        FsEvent(DELETED, str(gone)),
+        FsEvent(CHANGED, str(new)),
+    ])
+    service.flush()
+    assert service.maybe_commit(force=True)
+    # Changed files are hashed once: change detection's digest is reused
+    assert sorted(hashed) == sorted([str(edit), str(new)])
+
+    assert service.stats["indexed"] == 2
+    assert service.stats["unchanged"] == 1
+    assert service.stats["removed"] == 1
+    assert sorted(indexer.indexed_paths()) == sorted(str(p) for p in (keep, edit, new))
+    assert indexer.repository.count() == 6
+    assert not indexer.bm25_index.doc_ids_with_prefix(f"{gone}:")
+
+
+def _reconcile_indexer(tmp_path):
+    return DocumentIndexer(
+        user_data_dir=str(tmp_path / "user-data"),
+        chunk_size=300,
+        chunk_overlap=0,
+        chunking_strategy="template",
+        parallel_workers=1,
+    )
+
+
+@pytest.mark.integration
+def test_reindex_purges_deleted_and_rekeys_moved_files(tmp_path, patched_vector_store, patched_embeddings):
+    """Deleted files lose their chunks; moved files keep their embeddings under new ids."""
+    source_dir = tmp_path / "docs"
+    (source_dir / "archive").mkdir(parents=True)
+    for name in ("keep", "gone", "moved"):
+        (source_dir / f"{name}.md").write_text("\n\n".join(_sections(2, prefix=name.title())))
+    _reconcile_indexer(tmp_path).index_directory(source_dir)
+
+    (source_dir / "gone.md").unlink()
+    (source_dir / "moved.md").rename(source_dir / "archive" / "moved.md")
+    indexer = _reconcile_indexer(tmp_path)
+    stats = indexer.index_directory(source_dir)
+
+    new_path = str(source_dir / "archive" / "moved.md")
+    assert stats["files_removed"] == 1 and stats["chunks_removed"] == 2
+    assert stats["files_moved"] == 1 and stats["chunks_rekeyed"] == 2
+    assert stats["chunks_embedded"] == 0
+    assert stats["skipped_unchanged"] == 2
+    assert sorted(indexer.indexed_paths()) == sorted([str(source_dir / "keep.md"), new_path])
+    assert indexer.repository.count() == 4
+    assert not indexer.bm25_index.doc_ids_with_prefix(str(source_dir / "gone.md"))
+    assert not indexer.bm25_index.doc_ids_with_prefix(f"{source_dir / 'moved.md'}:")
+    moved_ids = indexer.bm25_index.doc_ids_with_prefix(f"{new_path}:")
+    assert len(moved_ids) == 2
+    docs = indexer.vector_store.get_documents(moved_ids)
+    assert {doc.metadata["path"] for doc in docs} == {new_path}
+    assert set(indexer.state[new_path]["chunk_hashes"]) == set(moved_ids)
+
+
+@pytest.mark.integration
+def test_remove_orphans_drops_bm25_chunks_by_id(tmp_path, patched_vector_store, patched_embeddings, monkeypatch):
+    """BM25 removal uses the stored chunk ids; only legacy entries fall back to a prefix scan."""
+    from local_rag.search import SegmentedBM25Index
+
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    for name in ("keep", "gone", "legacy"):
+        (source_dir / f"{name}.md").write_text("\n\n".join(_sections(2, prefix=name.title())))
+    indexer = _reconcile_indexer(tmp_path)
+    indexer.index_directory(source_dir)
+    legacy = str(source_dir / "legacy.md")
+    entry = indexer.state[legacy]
+    del entry["chunk_hashes"]
+    indexer.state[legacy] = entry
+
+    scanned = []
+    prefix_scan = SegmentedBM25Index.doc_ids_with_prefix
+
+    def recording_scan(self, prefix):
+        scanned.append(prefix)
+        return prefix_scan(self, prefix)
+
+    monkeypatch.setattr(SegmentedBM25Index, "doc_ids_with_prefix", recording_scan)
+    stats = indexer.remove_orphans([str(source_dir / "gone.md"), legacy])
+
+    assert stats["files_removed"] == 2
+    assert scanned == [f"{legacy}:"]
+    remaining = indexer.bm25_index.doc_ids
+    assert len(remaining) == 2
+    assert all(doc_id.startswith(f"{source_dir / 'keep.md'}:") for doc_id in remaining)
+
+
+@pytest.mark.integration
+def test_reconcile_keeps_index_of_empty_source(tmp_path, patched_vector_store, patched_embeddings):
+    """A source folder that suddenly looks empty (unmounted) does not wipe its entries."""
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    (source_dir / "a.md").write_text("\n\n".join(_sections(2)))
+    _reconcile_indexer(tmp_path).index_directory(source_dir)
+
+    (source_dir / "a.md").unlink()
+    indexer = _reconcile_indexer(tmp_path)
+    stats = indexer.index_directory(source_dir)
+    assert "files_removed" not in stats
+    assert indexer.indexed_paths() == [str(source_dir / "a.md")]
+
+
+@pytest.mark.integration
+def test_gc_dry_run_and_missing_files(tmp_path, patched_vector_store, patched_embeddings):
+    """gc reports without changing anything on a dry run, then drops missing files."""
+    from local_rag.services.gc_service import collect_garbage
+
+    source_dir = tmp_path / "docs"
+    source_dir.mkdir()
+    for name in ("a", "b", "c"):
+        (source_dir / f"{name}.md").write_text("\n\n".join(_sections(2, prefix=name)))
+    indexer = _reconcile_indexer(tmp_path)
+    indexer.index_directory(source_dir)
+    (source_dir / "b.md").unlink()
+
+    preview = collect_garbage(indexer, dry_run=True)
+    assert preview["files_removed"] == 1 and preview["chunks_removed"] == 2
+    assert indexer.repository.count() == 6
+
+    result = collect_garbage(indexer)
+    assert result == preview
+    assert indexer.repository.count() == 4
+    indexer.close()
+    assert str(source_dir / "b.md") not in _reconcile_indexer(tmp_path).indexed_paths()
+
+
+@pytest.mark.integration
+def test_second_writer_is_refused(tmp_path, patched_vector_store, patched_embeddings):
+    """One writer per user data directory; the next one fails fast or waits its turn."""
+    from local_rag.storage.writer_lock import IndexLockedError
+
+    first = _reconcile_indexer(tmp_path)
+    with pytest.raises(IndexLockedError, match=r"pid \d+"):
+        _reconcile_indexer(tmp_path)
+
+    release = threading.Timer(0.2, first.close)
+    release.start()
+    second = DocumentIndexer(user_data_dir=str(tmp_path / "user-data"), lock_timeout=5)
+    release.join()
+    assert second.writer_lock.held
+    second.close()
+
+
+@pytest.mark.integration
+def test_embeddings_reach_store_as_float32_matrix(tmp_path, patched_vector_store, patched_embeddings, monkeypatch):
+    """Indexing, chunk reuse and moves write one contiguous float32 matrix per call."""
+    import numpy as np
+
+    received = []
+    add_documents = InMemoryChroma.add_documents
+
+    def recording_add(self, ids, texts, embeddings, metadatas=None):
+        received.append(embeddings)
+        return add_documents(self, ids, texts, embeddings, metadatas)
+
+    monkeypatch.setattr(InMemoryChroma, "add_documents", recording_add)
+    source_dir = tmp_path / "docs"
+    (source_dir / "archive").mkdir(parents=True)
+    sections = _sections(3)
+    (source_dir / "guide.md").write_text("\n\n".join(sections))
+    (source_dir / "moved.md").write_text("\n\n".join(_sections(2, prefix="Moved")))
+    _reconcile_indexer(tmp_path).index_directory(source_dir)
+
+    (source_dir / "guide.md").write_text("\n\n".join(["# Intro\n\nNew opening section."] + sections))
+    (source_dir / "moved.md").rename(source_dir / "archive" / "moved.md")
+    stats = _reconcile_indexer(tmp_path).index_directory(source_dir)
+    assert stats["files_moved"] == 1 and stats["chunks_embedded"] == 1
+
+    assert received
+    for matrix in received:
+        assert isinstance(matrix, np.ndarray)
+        assert matrix.dtype == np.float32 and matrix.flags.c_contiguous
+        assert matrix.shape == (len(matrix), 4)
@@ -0,0 +1,98 @@
+"""Tests for the staged indexing pipeline."""
+
+import threading
+
+from local_rag.ingestion.pipeline import CLOSED, Pipeline
+
+
+def _drain(q):
+    items = []
+    while True:
+        item = q.get()
+        if item is CLOSED:
+            return items
+        items.append(item)
+
+
+class TestPipeline:
+    """Tests for Pipeline stages, batching and counters."""
+
+    def test_stages_pass_items_downstream(self):
+        """Every item goes through every stage; counters track them."""
+        pipeline = Pipeline(queue_size=4)
+        inbox, middle, outbox = pipeline.queue(), pipeline.queue(), pipeline.queue(100)
+        pipeline.stage("double", lambda x, emit: emit(x * 2), inbox, middle, workers=3)
+        pipeline.stage("inc", lambda x, emit: emit(x + 1), middle, outbox)
+
+        feeder = threading.Thread(target=lambda: [inbox.put(i) for i in range(20)] + [inbox.put(CLOSED)])
+        feeder.start()
+        results = _drain(outbox)
+        feeder.join()
+        pipeline.join()
+
+        assert sorted(results) == [i * 2 + 1 for i in range(20)]
+        stats = pipeline.stats_dict()
+        assert list(stats) == ["double", "inc"]
+        assert stats["double"]["items"] == 20
+        assert stats["inc"]["items"] == 20
+
+    def test_batch_stage_drains_queued_items(self):
+        """Queued items are grouped up to the batch size."""
+        pipeline = Pipeline(queue_size=10)
+        inbox, outbox = pipeline.queue(), pipeline.queue()
+        for i in range(5):
+            inbox.put(i)
+        inbox.put(CLOSED)
+
+        pipeline.batch_stage("batch", lambda batch, emit: emit(list(batch)), inbox, outbox, batch_size=3)
+        batches = _drain(outbox)
+        pipeline.join()
+
+        assert batches == [[0, 1, 2], [3, 4]]
+        assert pipeline.stats["batch"].batches == 2
+        assert pipeline.stats["batch"].items == 5
+
+    def test_batch_size_uses_item_size(self):
+        """Large items close a batch early."""
+        pipeline = Pipeline(queue_size=10)
+        inbox, outbox = pipeline.queue(), pipeline.queue()
+        for item in ([1] * 4, [1], [1], [1] * 4):
+            inbox.put(item)
+        inbox.put(CLOSED)
+
+        pipeline.batch_stage("batch", lambda batch, emit: emit(len(batch)), inbox, outbox,
+                             batch_size=5, size=len)
+        assert _drain(outbox) == [2, 2]
+
+    def test_errors_do_not_stop_the_stage(self):
+        """A failing item is reported and the rest still flow through."""
+        failures = []
+
+        def fn(x, emit):
+            if x == 2:
+                raise ValueError("boom")
+            emit(x)
+
+        pipeline = Pipeline(queue_size=10)
+        inbox, outbox = pipeline.queue(), pipeline.queue()
+        pipeline.stage("flaky", fn, inbox, outbox, on_error=lambda item, e: failures.append((item, str(e))))
+        for i in range(4):
+            inbox.put(i)
+        inbox.put(CLOSED)
+
+        assert _drain(outbox) == [0, 1, 3]
+        pipeline.join()
+        assert failures == [(2, "boom")]
+        assert pipeline.stats["flaky"].errors == 1
+
+    def test_counts_returned_by_stage(self):
+        """Stages report chunk counts alongside items."""
+        pipeline = Pipeline()
+        inbox = pipeline.queue()
+        pipeline.stage("count", lambda text, emit: (1, len(text.split())), inbox)
+        inbox.put("a b c")
+        inbox.put("d e")
+        inbox.put(CLOSED)
+        pipeline.join()
+
+        assert pipeline.stats["count"].chunks == 5
@@ -0,0 +1,181 @@
+"""Tests for the vector store repository and its batched writer."""
+
+import numpy as np
+import pytest
+
+from local_rag.adapters.vectorstore import BaseVectorStore, Document, as_embedding_matrix
+from local_rag.storage.repository import BatchedWriter, VectorStoreRepository
+
+
+class RecordingStore(BaseVectorStore):
+    """In-memory store that records every call reaching it."""
+
+    def __init__(self):
+        super().__init__("docs")
+        self.docs = {}
+        self.calls = []
+
+    def add_documents(self, ids, texts, embeddings, metadatas=None):
+        self.upsert_documents(ids, texts, embeddings, metadatas)
+
+    def upsert_documents(self, ids, texts, embeddings, metadatas=None):
+        self.calls.append(("upsert", len(ids)))
+        self.last_embeddings = embeddings
+        for doc_id, text, embedding, metadata in zip(ids, texts, embeddings, metadatas or [{}] * len(ids)):
+            self.docs[doc_id] = Document(id=doc_id, text=text, embedding=embedding, metadata=metadata)
+
+    def delete_documents(self, ids=None, where=None):
+        self.calls.append(("delete", len(ids) if ids else where))
+        if ids:
+            for doc_id in ids:
+                self.docs.pop(doc_id, None)
+        elif where:
+            for doc_id in [i for i, d in self.docs.items() if all(d.metadata.get(k) == v for k, v in where.items())]:
+                del self.docs[doc_id]
+
+    def delete_by_field(self, key, values):
+        self.calls.append(("delete_by_field", len(values)))
+        for doc_id in [i for i, d in self.docs.items() if d.metadata.get(key) in values]:
+            del self.docs[doc_id]
+
+    def search(self, query_embedding, k=10, where=None):
+        return []
+
+    def get_documents(self, ids):
+        return [self.docs[i] for i in ids if i in self.docs]
+
+    def count(self):
+        return len(self.docs)
+
+    def clear(self):
+        self.docs.clear()
+
+
+def _write_file(repo, path, n, version="v1"):
+    repo.delete_documents(where={"path": path})
+    ids = [f"{path}:{i}" for i in range(n)]
+    repo.upsert_documents(
+        ids=ids,
+        texts=[f"{version} {i}" for i in ids],
+        embeddings=[[float(i)] for i in range(n)],
+        metadatas=[{"path": path} for _ in ids],
+    )
+    return ids
+
+
+class TestBatchedWriter:
+    """Tests for grouped vector store writes."""
+
+    def test_groups_writes_from_many_files(self):
+        """Per-file delete+upsert pairs reach the store as one delete and one upsert."""
+        store = RecordingStore()
+        repo = VectorStoreRepository(store, write_batch=1000, write_max_seconds=60)
+        for n in range(20):
+            _write_file(repo, f"/docs/{n}.md", 3)
+        assert store.calls == []
+
+        assert repo.flush() == 60
+        assert store.calls == [("delete_by_field", 20), ("upsert", 60)]
+        assert store.count() == 60
+
+    def test_matches_write_through_results(self):
+        """Buffered and immediate writes leave the store in the same state."""
+        def scenario(repo):
+            _write_file(repo, "/a.md", 3)
+            _write_file(repo, "/b.md", 2)
+            _write_file(repo, "/a.md", 2, version="v2")  # re-index drops a.md:2
+            repo.delete_documents(ids=["/b.md:1"])
+            repo.upsert_documents(ids=["/b.md:1"], texts=["back"], embeddings=[[9.0]], metadatas=[{"path": "/b.md"}])
+            repo.delete_documents(ids=["/b.md:0"])
+            repo.flush()
+
+        direct, batched = RecordingStore(), RecordingStore()
+        scenario(VectorStoreRepository(direct))
+        scenario(VectorStoreRepository(batched, write_batch=1000, write_max_seconds=60))
+        assert {i: d.text for i, d in batched.docs.items()} == {i: d.text for i, d in direct.docs.items()}
+        assert set(batched.docs) == {"/a.md:0", "/a.md:1", "/b.md:1"}
+
+    def test_reads_see_buffered_writes(self):
+        """get_documents serves buffered upserts and hides buffered deletes."""
+        store = RecordingStore()
+        repo = VectorStoreRepository(store, write_batch=1000, write_max_seconds=60)
+        _write_file(repo, "/a.md", 2)
+        repo.flush()
+
+        repo.delete_documents(where={"path": "/a.md"})
+        assert repo.get_documents(["/a.md:0"]) == []
+        _write_file(repo, "/b.md", 1)
+        assert [d.text for d in repo.get_documents(["/b.md:0", "/a.md:1"])] == ["v1 /b.md:0"]
+
+    def test_size_threshold_flushes(self):
+        """Reaching max_docs buffered upserts flushes without being asked."""
+        store = RecordingStore()
+        writer = BatchedWriter(store, max_docs=5, max_seconds=60)
+        writer.upsert([f"d{i}" for i in range(4)], ["t"] * 4, [[0.0]] * 4)
+        assert store.count() == 0
+        writer.upsert(["d4"], ["t"], [[0.0]])
+        assert store.count() == 5
+        assert writer.pending == 0
+
+    def test_time_threshold_flushes(self, monkeypatch):
+        """A write finding the buffer older than max_seconds flushes it."""
+        clock = [100.0]
+        monkeypatch.setattr("local_rag.storage.repository.time.monotonic", lambda: clock[0])
+        store = RecordingStore()
+        writer = BatchedWriter(store, max_docs=1000, max_seconds=5)
+        writer.upsert(["a"], ["t"], [[0.0]])
+        clock[0] += 4
+        writer.upsert(["b"], ["t"], [[0.0]])
+        assert store.count() == 0
+        clock[0] += 2
+        writer.delete(ids=["c"])
+        assert store.count() == 2
+
+    def test_other_filters_are_barriers(self):
+        """A delete by a non-path filter flushes first so ordering is preserved."""
+        store = RecordingStore()
+        repo = VectorStoreRepository(store, write_batch=1000, write_max_seconds=60)
+        repo.upsert_documents(ids=["x"], texts=["t"], embeddings=[[0.0]], metadatas=[{"path": "/x", "tag": "old"}])
+        repo.delete_documents(where={"tag": "old"})
+        assert store.count() == 0
+        assert repo.writer.pending == 0
+
+    def test_flush_hands_store_one_float32_matrix(self):
+        """Rows buffered from several upserts reach the store stacked, in id order."""
+        store = RecordingStore()
+        writer = BatchedWriter(store, max_docs=1000, max_seconds=60)
+        writer.upsert(["a", "b"], ["t"] * 2, np.array([[1, 2], [3, 4]], dtype=np.float64))
+        writer.upsert(["c"], ["t"], [[5.0, 6.0]])
+        writer.flush()
+        matrix = store.last_embeddings
+        assert matrix.dtype == np.float32 and matrix.flags.c_contiguous
+        assert matrix.tolist() == [[1, 2], [3, 4], [5, 6]]
+
+
+class TestEmbeddingMatrix:
+    """Tests for the float32 hand-off format."""
+
+    def test_float32_matrix_is_not_copied(self):
+        """A C-contiguous float32 matrix is passed through as is."""
+        matrix = np.ones((3, 4), dtype=np.float32)
+        assert as_embedding_matrix(matrix) is matrix
+
+    def test_other_inputs_are_converted_once(self):
+        """Lists, row lists and float64 or strided arrays become contiguous float32."""
+        strided = np.ones((4, 4), dtype=np.float32)[:, ::2]
+        for embeddings in ([[0.5, 1.0]], [np.array([0.5, 1.0])], np.ones((2, 2)), strided):
+            matrix = as_embedding_matrix(embeddings)
+            assert matrix.dtype == np.float32 and matrix.flags.c_contiguous
+            assert matrix.shape == np.shape(embeddings)
+
+
+@pytest.mark.parametrize("write_batch", [0, 10])
+def test_count_and_close_flush(write_batch):
+    """count() and close() include buffered writes."""
+    store = RecordingStore()
+    repo = VectorStoreRepository(store, write_batch=write_batch)
+    _write_file(repo, "/a.md", 3)
+    assert repo.count() == 3
+    _write_file(repo, "/b.md", 1)
+    repo.close()
+    assert store.count() == 4
@@ -1,14 +1,29 @@
 """Tests for hybrid search and BM25."""
 
+import json
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
 from local_rag.search import (
     BM25Index,
     FusionMethod,
     HybridSearcher,
+    LRUCache,
+    QueryEmbeddingCache,
     SearchConfig,
     SearchMethod,
     SearchResult,
+    SegmentedBM25Index,
     create_hybrid_searcher,
+    load_bm25_index,
+    normalize_query,
+    upgrade_bm25_index,
 )
+from local_rag.search.cache import bump_generation, read_generation
 
 
 class TestBM25Index:
@@ -204,6 +219,814 @@ class TestBM25Index:
         assert results == []
 
 
+class TestBM25Tombstones:
+    """Tests for tombstoned removal and compaction."""
+
+    def _index(self):
+        index = BM25Index()
+        index.add_documents(
+            ["doc1", "doc2", "doc3"],
+            ["python snakes", "python programming", "java programming"]
+        )
+        return index
+
+    def test_remove_skips_document_in_search(self):
+        """Removed documents never appear in results."""
+        index = self._index()
+        index.remove_document("doc2")
+
+        assert index.tombstone_count == 1
+        assert "doc2" not in index
+        ids = [doc_id for doc_id, _ in index.search("python programming", k=3)]
+        assert "doc2" not in ids
+        assert set(ids) == {"doc1", "doc3"}
+
+    def test_remove_missing_document_is_noop(self):
+        """Removing an unknown ID changes nothing."""
+        index = self._index()
+        index.remove_document("nonexistent")
+
+        assert index.doc_count == 3
+        assert index.tombstone_count == 0
+
+    def test_readd_replaces_previous_version(self):
+        """Adding an existing ID tombstones the old slot."""
+        index = self._index()
+        index.add_documents(["doc1"], ["ruby gems"])
+
+        assert index.doc_count == 3
+        assert index.get_document("doc1") == "ruby gems"
+        assert index.search("snakes", k=3) == []
+
+    def test_compact_matches_fresh_index(self):
+        """Compaction yields the same scores as rebuilding from scratch."""
+        index = self._index()
+        index.remove_document("doc1")
+        reclaimed = index.compact()
+
+        fresh = BM25Index()
+        fresh.add_documents(["doc2", "doc3"], ["python programming", "java programming"])
+
+        assert reclaimed == 1
+        assert index.tombstone_count == 0
+        assert index.doc_ids == ["doc2", "doc3"]
+        assert index.search("python programming", k=3) == fresh.search("python programming", k=3)
+        assert "snakes" not in index.inverted_index
+
+    def test_updates_score_like_fresh_index(self, tmp_path):
+        """Before any compaction, N, doc freqs and avgdl cover live documents only."""
+        ids, texts = TestSegmentedBM25Index._batch(0, 120)
+        index = BM25Index(compaction_threshold=1.0)
+        index.add_documents(ids, texts)
+        index.save(str(tmp_path / "bm25"))
+        mapped = BM25Index.load(str(tmp_path / "bm25"))
+
+        live = dict(zip(ids, texts))
+        for doc_id in ("doc3", "doc40", "doc41", "doc99"):
+            index.remove_document(doc_id)
+            mapped.remove_document(doc_id)
+            del live[doc_id]
+        new_ids, new_texts = TestSegmentedBM25Index._batch(10, 5, seed=11)
+        index.add_documents(new_ids, new_texts)
+        for doc_id, text in zip(new_ids, new_texts):
+            del live[doc_id]
+            live[doc_id] = text
+
+        fresh = BM25Index()
+        fresh.add_documents(list(live), list(live.values()))
+        assert index.tombstone_count == 9
+        assert index.avg_doc_length == fresh.avg_doc_length
+        for query in TestSegmentedBM25Index.QUERIES:
+            expected = fresh.search(query, k=7)
+            assert index.search(query, k=7) == expected
+            assert index.search(query, k=7, prune=True) == expected
+            assert index.search_reference(query, k=7) == pytest.approx(expected)
+
+        # The memory-mapped copy only saw the removals
+        original = dict(zip(ids, texts))
+        rebuilt = BM25Index()
+        rebuilt.add_documents(mapped.doc_ids, [original[doc_id] for doc_id in mapped.doc_ids])
+        for query in TestSegmentedBM25Index.QUERIES:
+            expected = rebuilt.search(query, k=7)
+            assert mapped.search(query, k=7) == expected
+            assert mapped.search(query, k=7, prune=True) == expected
+
+    def test_maybe_compact_respects_threshold(self):
+        """Compaction only runs once the tombstone ratio passes the threshold."""
+        index = BM25Index(compaction_threshold=0.5)
+        index.add_documents(["a", "b", "c", "d"], ["one", "two", "three", "four"])
+
+        index.remove_document("a")
+        assert index.maybe_compact() is False
+        assert index.tombstone_count == 1
+
+        index.remove_document("b")
+        assert index.maybe_compact() is True
+        assert index.tombstone_count == 0
+        assert index.doc_ids == ["c", "d"]
+
+    def test_tombstones_survive_save_and_load(self, tmp_path):
+        """Tombstones below the threshold are persisted as-is."""
+        index = BM25Index(compaction_threshold=0.9)
+        index.add_documents(["doc1", "doc2"], ["first document", "second document"])
+        index.remove_document("doc1")
+
+        save_path = tmp_path / "bm25_index.json"
+        index.save(str(save_path))
+        loaded = BM25Index.load(str(save_path))
+
+        assert loaded.doc_count == 1
+        assert loaded.tombstone_count == 1
+        assert loaded.get_document("doc1") is None
+        assert [d for d, _ in loaded.search("document", k=5)] == ["doc2"]
+
+    def test_doc_ids_with_prefix(self):
+        """Prefix lookup only returns live IDs."""
+        index = BM25Index()
+        index.add_documents(
+            ["/a.md:0-10", "/a.md:10-20", "/a.md.bak:0-10"],
+            ["alpha", "beta", "gamma"]
+        )
+        index.remove_document("/a.md:10-20")
+
+        assert index.doc_ids_with_prefix("/a.md:") == ["/a.md:0-10"]
+
+
+class TestBM25BinaryFormat:
+    """Tests for the memory-mapped binary index format."""
+
+    def _index(self):
+        index = BM25Index()
+        index.add_documents(
+            ["doc1", "doc2", "doc3"],
+            ["Python programming language", "Java programming language", "Café über naïve"]
+        )
+        return index
+
+    def test_round_trip_matches_in_memory(self, tmp_path):
+        """A loaded binary index scores exactly like the original."""
+        index = self._index()
+        index.save(str(tmp_path / "bm25"))
+        loaded = BM25Index.load(str(tmp_path / "bm25"))
+
+        assert isinstance(loaded.doc_lengths.base, np.memmap)
+        assert loaded.doc_count == 3
+        assert loaded.doc_ids == ["doc1", "doc2", "doc3"]
+        assert loaded.get_document("doc3") == "Café über naïve"
+        for query in ("python programming", "language", "café", "missing"):
+            assert loaded.search(query, k=3) == index.search(query, k=3)
+
+    def test_removal_on_mapped_index_only_rewrites_tombstones(self, tmp_path):
+        """Saving a mapped index after removals keeps the posting files."""
+        index_dir = tmp_path / "bm25"
+        self._index().save(str(index_dir))
+        postings_mtime = (index_dir / "postings_docs.bin").stat().st_mtime_ns
+
+        loaded = BM25Index.load(str(index_dir))
+        loaded.compaction_threshold = 0.9
+        loaded.remove_document("doc1")
+        loaded.save(str(index_dir))
+
+        assert (index_dir / "postings_docs.bin").stat().st_mtime_ns == postings_mtime
+        reloaded = BM25Index.load(str(index_dir))
+        assert reloaded.doc_count == 2
+        assert [d for d, _ in reloaded.search("programming", k=3)] == ["doc2"]
+
+    def test_add_after_load_materializes(self, tmp_path):
+        """Adding to a mapped index switches to mutable structures."""
+        self._index().save(str(tmp_path / "bm25"))
+        loaded = BM25Index.load(str(tmp_path / "bm25"))
+        loaded.add_documents(["doc4"], ["Rust programming language"])
+
+        assert loaded.doc_count == 4
+        assert "rust" in loaded.inverted_index
+        assert loaded.search("rust", k=1)[0][0] == "doc4"
+
+    def test_empty_index(self, tmp_path):
+        """Empty indexes can be written and loaded."""
+        BM25Index().save(str(tmp_path / "bm25"))
+        loaded = BM25Index.load(str(tmp_path / "bm25"))
+
+        assert loaded.doc_count == 0
+        assert loaded.search("anything", k=5) == []
+
+    def test_rejects_newer_format_version(self, tmp_path):
+        """Unknown future versions fail loudly instead of misreading data."""
+        index_dir = tmp_path / "bm25"
+        self._index().save(str(index_dir))
+        meta = json.loads((index_dir / "meta.json").read_text())
+        meta["version"] = 99
+        (index_dir / "meta.json").write_text(json.dumps(meta))
+
+        with pytest.raises(ValueError):
+            BM25Index.load(str(index_dir))
+
+    def test_migrates_legacy_json(self, tmp_path):
+        """upgrade_bm25_index converts a JSON index once and removes it."""
+        json_path = tmp_path / "bm25_index.json"
+        index_dir = tmp_path / "bm25"
+        self._index().save(str(json_path))
+
+        migrated = upgrade_bm25_index(index_dir, json_path)
+
+        assert not json_path.exists()
+        assert (index_dir / "segments.json").exists()
+        assert migrated.doc_count == 3
+        assert upgrade_bm25_index(index_dir, json_path).doc_count == 3
+        assert isinstance(load_bm25_index(index_dir, json_path), SegmentedBM25Index)
+
+    def test_search_load_leaves_legacy_json(self, tmp_path):
+        """load_bm25_index reads a JSON index in place without migrating it."""
+        json_path = tmp_path / "bm25_index.json"
+        self._index().save(str(json_path))
+
+        loaded = load_bm25_index(tmp_path / "bm25", json_path)
+
+        assert json_path.exists()
+        assert not (tmp_path / "bm25").exists()
+        assert loaded.search("alpha", k=1) == self._index().search("alpha", k=1)
+
+    def test_missing_index_returns_none(self, tmp_path):
+        """No index on disk yields None."""
+        assert load_bm25_index(tmp_path / "bm25", tmp_path / "bm25_index.json") is None
+
+
+class TestBM25IncrementalStats:
+    """Running corpus statistics and the one-pass batch path."""
+
+    def test_running_totals_match_recomputed(self, tmp_path):
+        """avg_doc_length tracks the live documents' lengths across updates."""
+        index = BM25Index()
+        index.add_documents(["doc1", "doc2"], ["alpha beta gamma", "beta"])
+        index.add_documents(["doc3"], ["gamma delta epsilon zeta"])
+        index.add_documents(["doc1"], ["alpha"])  # replace: old slot stays until compaction
+
+        assert index.total_length == sum(index.doc_lengths) == 9
+        assert index.live_length == 6
+        assert index.avg_doc_length == 6 / 3
+
+        index.save(str(tmp_path / "bm25"))
+        loaded = BM25Index.load(str(tmp_path / "bm25"))
+        loaded.add_documents(["doc4"], ["eta theta"])
+        assert loaded.total_length == sum(loaded.doc_lengths)
+        assert loaded.avg_doc_length == loaded.live_length / loaded.doc_count
+
+    def test_batch_equals_one_at_a_time(self):
+        """Adding a batch builds the same index as adding each document."""
+        rng = random.Random(5)
+        ids = [f"doc{i}" for i in range(50)] + ["doc3", "doc7"]
+        texts = [" ".join(f"t{rng.randrange(40)}" for _ in range(rng.randint(1, 20))) for _ in ids]
+
+        batched = BM25Index()
+        batched.add_documents(ids, texts)
+        single = BM25Index()
+        for doc_id, text in zip(ids, texts):
+            single.add_documents([doc_id], [text])
+
+        assert batched.inverted_index == single.inverted_index
+        assert batched.doc_freqs == single.doc_freqs
+        assert batched.slots == single.slots
+        assert batched.avg_doc_length == single.avg_doc_length
+        assert batched.tombstone_count == 2
+        assert batched.search("t1 t2 t3", k=10) == single.search("t1 t2 t3", k=10)
+
+
+class TestBM25CompactPostings:
+    """Interned vocabulary and array-backed postings."""
+
+    def test_postings_are_interned_arrays(self):
+        """Each term gets an id; postings are interleaved (slot, tf) uint arrays."""
+        index = BM25Index()
+        index.add_documents(["doc1", "doc2"], ["alpha beta alpha", "beta gamma"])
+
+        assert index.terms == ["alpha", "beta", "gamma"]
+        assert index.term_ids == {"alpha": 0, "beta": 1, "gamma": 2}
+        assert index._postings[1].typecode == "I"
+        assert list(index._postings[1]) == [0, 1, 1, 1]
+        assert index.doc_freq("beta") == 2
+        assert index.doc_freq("missing") == 0
+        assert index.inverted_index["alpha"] == [(0, 2)]
+
+    def test_add_after_search(self):
+        """Searching does not pin posting buffers against later appends."""
+        index = BM25Index()
+        index.add_documents(["doc1"], ["alpha beta"])
+        results = index.search("alpha", k=1)
+        index.add_documents(["doc2"], ["alpha gamma"])
+
+        assert results[0][0] == "doc1"
+        assert index.doc_freq("alpha") == 2
+
+    def test_memory_report(self):
+        """memory_report covers the structures and beats the tuple layout."""
+        index = BM25Index()
+        index.add_documents(
+            [f"doc{i}" for i in range(200)],
+            [" ".join(f"term{(i * j) % 97}" for j in range(30)) for i in range(200)],
+        )
+        report = index.memory_report()
+
+        assert report["postings"] > 0
+        assert report["total"] >= report["postings"] + report["vocabulary"]
+        assert report["postings"] + report["vocabulary"] < report["legacy_postings"]
+
+
+class TestBM25VectorizedScoring:
+    """The NumPy scorer must reproduce the scalar reference scorer."""
+
+    @staticmethod
+    def _random_index(num_docs=300, seed=7):
+        rng = random.Random(seed)
+        vocab = [f"term{i}" for i in range(200)]
+        # Skewed sampling so some terms have long posting lists
+        weights = [1.0 / (i + 1) for i in range(len(vocab))]
+        index = BM25Index()
+        index.add_documents(
+            [f"doc{i}" for i in range(num_docs)],
+            [" ".join(rng.choices(vocab, weights, k=rng.randint(5, 60))) for _ in range(num_docs)]
+        )
+        return index, vocab
+
+    def test_matches_reference(self):
+        """Same documents, order and scores as the scalar scorer."""
+        index, vocab = self._random_index()
+        rng = random.Random(1)
+        for _ in range(25):
+            query = " ".join(rng.sample(vocab, rng.randint(1, 6)))
+            for k in (1, 5, 50):
+                assert index.search(query, k=k) == index.search_reference(query, k=k)
+
+    def test_matches_reference_with_tombstones_and_mapping(self, tmp_path):
+        """Equivalence holds for tombstoned and memory-mapped indexes."""
+        index, vocab = self._random_index()
+        index.compaction_threshold = 1.0
+        for i in range(0, 300, 3):
+            index.remove_document(f"doc{i}")
+        index.save(str(tmp_path / "bm25"))
+        mapped = BM25Index.load(str(tmp_path / "bm25"))
+
+        for query in ("term0 term1", "term5 term50 term150", "term199", "term3 term3"):
+            expected = index.search_reference(query, k=20)
+            assert index.search(query, k=20) == expected
+            assert mapped.search(query, k=20) == expected
+
+    def test_ties_are_broken_by_insertion_order(self):
+        """Identical documents keep insertion order at the k boundary."""
+        index = BM25Index()
+        index.add_documents([f"doc{i}" for i in range(10)], ["same text here"] * 10)
+
+        assert [d for d, _ in index.search("same text", k=3)] == ["doc0", "doc1", "doc2"]
+
+
+class TestBM25Pruning:
+    """MaxScore-pruned retrieval must return the exhaustive top k."""
+
+    @pytest.fixture(autouse=True)
+    def always_prune(self, monkeypatch):
+        """The test corpora are small; prune whenever any list could be skipped."""
+        monkeypatch.setattr("local_rag.search.hybrid.PRUNE_MIN_SKIP_RATIO", 10**9)
+
+    def test_pruned_matches_exhaustive(self):
+        """Same results for short and long queries across k."""
+        index, vocab = TestBM25VectorizedScoring._random_index(num_docs=500, seed=3)
+        rng = random.Random(5)
+        for _ in range(30):
+            # Long natural-language style queries: mostly common terms plus a rare one
+            query = " ".join(rng.choices(vocab[:20], k=rng.randint(2, 10)) + [rng.choice(vocab)])
+            for k in (1, 3, 10, 40):
+                assert index.search(query, k=k, prune=True) == index.search(query, k=k)
+
+    def test_pruned_with_tombstones_and_mapping(self, tmp_path):
+        """Pruning uses stored upper bounds and skips removed documents."""
+        index, vocab = TestBM25VectorizedScoring._random_index(num_docs=400, seed=11)
+        index.compaction_threshold = 1.0
+        for i in range(0, 400, 4):
+            index.remove_document(f"doc{i}")
+        index.save(str(tmp_path / "bm25"))
+        mapped = BM25Index.load(str(tmp_path / "bm25"))
+
+        assert mapped._mapped.term_max_scores is not None
+        for query in ("term0 term1 term2 term77", "term3 term3 term150", "term1 term199"):
+            expected = index.search(query, k=5)
+            assert index.search(query, k=5, prune=True) == expected
+            assert mapped.search(query, k=5, prune=True) == expected
+
+    def test_fewer_matches_than_k(self):
+        """Pruning with k above the match count returns every match."""
+        index = BM25Index()
+        index.add_documents(["doc1", "doc2", "doc3"], ["alpha beta", "beta gamma", "delta"])
+
+        assert index.search("alpha beta", k=10, prune=True) == index.search("alpha beta", k=10)
+
+    def test_short_skippable_lists_score_exhaustively(self, monkeypatch):
+        """Pruning falls back to the plain scatter when it could skip little."""
+        monkeypatch.setattr("local_rag.search.hybrid.PRUNE_MIN_SKIP_RATIO", 16)
+        index, _ = TestBM25VectorizedScoring._random_index(num_docs=500, seed=3)
+        calls = []
+        score_terms = index._score_terms
+        monkeypatch.setattr(index, "_score_terms", lambda *args: calls.append(args) or score_terms(*args))
+
+        # Only one term: nothing can be skipped
+        assert index.search("term0", k=5, prune=True) == index.search("term0", k=5)
+        assert len(calls) == 2
+
+    def test_hybrid_searcher_prunes_small_fetches(self, monkeypatch):
+        """_bm25_search requests pruning only when fetch_k is small."""
+        searcher = HybridSearcher(config=SearchConfig(bm25_prune_max_k=10))
+        searcher.build_bm25_index(["doc1"], ["alpha beta"])
+        calls = []
+        original = searcher.bm25_index.search
+
+        def spy(query, k=10, prune=False):
+            calls.append(prune)
+            return original(query, k=k, prune=prune)
+
+        monkeypatch.setattr(searcher.bm25_index, "search", spy)
+        searcher._bm25_search("alpha", 10)
+        searcher._bm25_search("alpha", 30)
+
+        assert calls == [True, False]
+
+
+class TestBM25TextlessMode:
+    """Tests for the statistics-only (store_texts=False) index."""
+
+    def test_scores_match_text_index(self):
+        """Dropping texts does not change scoring."""
+        ids = ["doc1", "doc2", "doc3"]
+        texts = ["python programming", "java programming language", "python snakes"]
+        full = BM25Index()
+        full.add_documents(ids, texts)
+        textless = BM25Index(store_texts=False)
+        textless.add_documents(ids, texts)
+
+        assert textless.search("python programming", k=3) == full.search("python programming", k=3)
+        assert textless.doc_texts == []
+        assert textless.get_document("doc1") is None
+
+    def test_mode_survives_save_and_load(self, tmp_path):
+        """store_texts is persisted in both on-disk formats."""
+        index = BM25Index(store_texts=False)
+        index.add_documents(["doc1", "doc2"], ["alpha beta", "beta gamma"])
+        index.remove_document("doc2")
+
+        for path in (tmp_path / "bm25", tmp_path / "bm25.json"):
+            index.save(str(path))
+            loaded = BM25Index.load(str(path))
+            assert loaded.store_texts is False
+            assert loaded.search("beta", k=5) == index.search("beta", k=5)
+            assert loaded.get_document("doc1") is None
+
+    def test_drop_texts_rewrites_mapped_index(self, tmp_path):
+        """drop_texts on a mapped index is persisted by the next save."""
+        index = BM25Index()
+        index.add_documents(["doc1", "doc2"], ["alpha beta", "beta gamma"])
+        index.save(str(tmp_path / "bm25"))
+
+        loaded = BM25Index.load(str(tmp_path / "bm25"))
+        loaded.drop_texts()
+        loaded.save(str(tmp_path / "bm25"))
+
+        reloaded = BM25Index.load(str(tmp_path / "bm25"))
+        assert reloaded.store_texts is False
+        assert (tmp_path / "bm25" / "texts.bin").stat().st_size == 0
+        assert reloaded.search("alpha", k=1)[0][0] == "doc1"
+
+    def test_hybrid_search_hydrates_from_store(self):
+        """BM25-only hits get text and metadata from one get_documents call."""
+        from local_rag.adapters.vectorstore import Document
+
+        class FakeStore:
+            def __init__(self):
+                self.calls = []
+
+            def get_documents(self, ids, include_embeddings=True):
+                self.calls.append(list(ids))
+                return [
+                    Document(id=doc_id, text=f"text of {doc_id}", metadata={"path": doc_id})
+                    for doc_id in ids
+                ]
+
+        searcher = HybridSearcher(config=SearchConfig(method=SearchMethod.BM25))
+        searcher.bm25_index = BM25Index(store_texts=False)
+        searcher.bm25_index.add_documents(
+            ["doc1", "doc2", "doc3"], ["alpha beta", "alpha gamma", "delta"]
+        )
+        store = FakeStore()
+
+        results = searcher.search("alpha", collection=None, k=1, store=store)
+
+        assert len(results) == 1
+        assert store.calls == [[results[0].doc_id]]
+        assert results[0].text == f"text of {results[0].doc_id}"
+        assert results[0].metadata == {"path": results[0].doc_id}
+
+    def test_hybrid_search_hydrates_through_chroma_store(self):
+        """Chroma hydration skips embeddings and copes with array-valued results."""
+        import importlib.util
+
+        from local_rag.adapters import vectorstore
+
+        # conftest swaps vectorstore.ChromaVectorStore for an in-memory store;
+        # load the adapter module again to get the real class
+        spec = importlib.util.spec_from_file_location("_chroma_adapter", vectorstore.__file__)
+        adapter = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(adapter)
+
+        class FakeCollection:
+            def __init__(self):
+                self.includes = []
+
+            def get(self, ids, include):
+                self.includes.append(list(include))
+                return {
+                    "ids": list(ids),
+                    "documents": [f"text of {doc_id}" for doc_id in ids],
+                    "metadatas": [{"path": doc_id} for doc_id in ids],
+                    # Recent chromadb returns a NumPy array here
+                    "embeddings": np.ones((len(ids), 4)) if "embeddings" in include else None,
+                }
+
+        store = adapter.ChromaVectorStore.__new__(adapter.ChromaVectorStore)
+        store._collection = collection = FakeCollection()
+
+        searcher = HybridSearcher(config=SearchConfig(method=SearchMethod.BM25))
+        searcher.bm25_index = BM25Index(store_texts=False)
+        searcher.bm25_index.add_documents(["doc1", "doc2"], ["alpha beta", "gamma"])
+
+        results = searcher.search("alpha", collection=None, k=1, store=store)
+
+        assert collection.includes == [["documents", "metadatas"]]
+        assert results[0].text == "text of doc1"
+        assert results[0].metadata == {"path": "doc1"}
+
+        docs = store.get_documents(["doc1"])
+        assert collection.includes[-1] == ["documents", "metadatas", "embeddings"]
+        assert docs[0].embedding.tolist() == [1.0] * 4
+
+
+class TestSegmentedBM25Index:
+    """Tests for the segmented (LSM-style) BM25 index."""
+
+    QUERIES = ("term0 term1", "term3 term3 term150", "term1 term199 term42", "term7")
+
+    @staticmethod
+    def _batch(start, count, seed=3):
+        rng = random.Random(seed + start)
+        ids = [f"doc{i}" for i in range(start, start + count)]
+        texts = [" ".join(f"term{rng.randrange(200)}" for _ in range(rng.randint(3, 30))) for _ in ids]
+        return ids, texts
+
+    def test_matches_single_index(self, tmp_path, monkeypatch):
+        """Fan-out search over segments equals one index with the same history."""
+        monkeypatch.setattr("local_rag.search.hybrid.PRUNE_MIN_SKIP_RATIO", 10**9)
+        single = BM25Index()
+        segmented = SegmentedBM25Index(tmp_path / "bm25", merge_factor=10, compaction_threshold=1.0)
+        for start in (0, 60, 120):
+            ids, texts = self._batch(start, 60)
+            single.add_documents(ids, texts)
+            segmented.add_documents(ids, texts)
+            segmented.save()
+        for doc_id in ("doc5", "doc70", "doc71"):
+            single.remove_document(doc_id)
+            segmented.remove_document(doc_id)
+        ids, texts = self._batch(180, 20)
+        single.add_documents(ids, texts)
+        segmented.add_documents(ids, texts)
+
+        fresh = BM25Index()
+        fresh.add_documents(single.doc_ids, [single.get_document(doc_id) for doc_id in single.doc_ids])
+
+        assert len(segmented.segments) == 3
+        assert segmented.doc_count == single.doc_count
+        for query in self.QUERIES:
+            expected = single.search(query, k=7)
+            assert fresh.search(query, k=7) == expected
+            assert segmented.search(query, k=7) == expected
+            assert segmented.search(query, k=7, prune=True) == expected
+
+    def test_small_update_only_writes_new_segment(self, tmp_path):
+        """Re-indexing a few documents leaves existing segment files untouched."""
+        segmented = SegmentedBM25Index(tmp_path / "bm25")
+        segmented.add_documents(*self._batch(0, 200))
+        segmented.save()
+        postings = tmp_path / "bm25" / "seg_000001" / "postings_docs.bin"
+        before = postings.stat().st_mtime_ns
+
+        reopened = load_bm25_index(tmp_path / "bm25")
+        reopened.add_documents(["doc3"], ["brand new words"])
+        reopened.save()
+
+        assert postings.stat().st_mtime_ns == before
+        assert load_bm25_index(tmp_path / "bm25").segment_names == ["seg_000001", "seg_000002"]
+        assert load_bm25_index(tmp_path / "bm25").search("brand", k=1)[0][0] == "doc3"
+
+    def test_tiered_merge(self, tmp_path):
+        """merge_factor same-tier segments are merged into one."""
+        segmented = SegmentedBM25Index(tmp_path / "bm25", merge_factor=3)
+        single = BM25Index()
+        for start in (0, 5, 10):
+            ids, texts = self._batch(start, 5)
+            segmented.add_documents(ids, texts)
+            single.add_documents(ids, texts)
+            segmented.save()
+
+        assert segmented.segment_names == ["seg_000004"]
+        assert sorted(p.name for p in (tmp_path / "bm25").iterdir()) == ["seg_000004", "segments.json"]
+        for query in self.QUERIES:
+            assert segmented.search(query, k=5) == single.search(query, k=5)
+
+    def test_compact_merges_everything(self, tmp_path):
+        """compact() leaves one segment without tombstones."""
+        segmented = SegmentedBM25Index(tmp_path / "bm25", compaction_threshold=1.0)
+        for start in (0, 20):
+            segmented.add_documents(*self._batch(start, 20))
+            segmented.save()
+        segmented.remove_document("doc1")
+        segmented.remove_document("doc25")
+
+        assert segmented.compact() == 2
+        reloaded = load_bm25_index(tmp_path / "bm25")
+        assert len(reloaded.segments) == 1
+        assert reloaded.tombstone_count == 0
+        assert reloaded.doc_count == 38
+        assert "doc1" not in reloaded
+
+    def test_removals_persist(self, tmp_path):
+        """Deleting from a sealed segment is persisted by save()."""
+        segmented = SegmentedBM25Index(tmp_path / "bm25")
+        segmented.add_documents(["doc1", "doc2"], ["alpha beta", "beta gamma"])
+        segmented.save()
+
+        reopened = load_bm25_index(tmp_path / "bm25")
+        reopened.remove_document("doc1")
+        reopened.save()
+
+        reloaded = load_bm25_index(tmp_path / "bm25")
+        assert reloaded.doc_ids == ["doc2"]
+        assert [doc_id for doc_id, _ in reloaded.search("beta", k=5)] == ["doc2"]
+
+    def test_adopts_single_segment_layout(self, tmp_path):
+        """A plain binary index directory becomes the first segment."""
+        index = BM25Index()
+        index.add_documents(["doc1", "doc2"], ["alpha beta", "beta gamma"])
+        index.save(str(tmp_path / "bm25"))
+
+        adopted = upgrade_bm25_index(tmp_path / "bm25")
+
+        assert adopted.segment_names == ["seg_000001"]
+        assert adopted.search("alpha", k=1) == index.search("alpha", k=1)
+        assert load_bm25_index(tmp_path / "bm25").doc_count == 2
+
+    def test_search_load_opens_single_segment_in_place(self, tmp_path):
+        """load_bm25_index opens a plain binary index directory without adopting it."""
+        index = BM25Index()
+        index.add_documents(["doc1", "doc2"], ["alpha beta", "beta gamma"])
+        index.save(str(tmp_path / "bm25"))
+        before = sorted(p.name for p in (tmp_path / "bm25").iterdir())
+
+        loaded = load_bm25_index(tmp_path / "bm25")
+
+        assert sorted(p.name for p in (tmp_path / "bm25").iterdir()) == before
+        assert loaded.search("alpha", k=1) == index.search("alpha", k=1)
+
+    def test_drop_texts_rewrites_segments(self, tmp_path):
+        """Segments written with texts are rewritten text-less on save."""
+        segmented = SegmentedBM25Index(tmp_path / "bm25")
+        segmented.add_documents(["doc1", "doc2"], ["alpha beta", "beta gamma"])
+        segmented.save()
+        assert segmented.get_document("doc1") == "alpha beta"
+
+        segmented.drop_texts()
+        segmented.save()
+
+        reloaded = load_bm25_index(tmp_path / "bm25")
+        assert reloaded.store_texts is False
+        assert reloaded.get_document("doc1") is None
+        assert reloaded.search("alpha", k=1)[0][0] == "doc1"
+
+
+class TestQueryCache:
+    """Tests for the LRU result cache and index generation counter."""
+
+    def test_lru_evicts_least_recently_used(self):
+        """Reading an entry protects it from the next eviction."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_stats_report_hit_rate(self):
+        """Hits and misses are counted per lookup."""
+        cache = LRUCache(maxsize=4)
+        cache.put("q", [1])
+        cache.get("q")
+        cache.get("q")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+
+    def test_zero_size_disables_cache(self):
+        """maxsize 0 never stores anything."""
+        cache = LRUCache(maxsize=0)
+        cache.put("q", 1)
+        assert cache.get("q") is None
+        assert len(cache) == 0
+
+    def test_normalize_query(self):
+        """Whitespace differences map to the same key; case differences do not."""
+        assert normalize_query("  Machine\tLearning  ") == normalize_query("Machine Learning")
+        assert normalize_query("Machine Learning") != normalize_query("machine learning")
+
+    def test_generation_counter(self, tmp_path):
+        """Generation starts at 0 and increases on every bump."""
+        path = tmp_path / "state" / "index_generation"
+        assert read_generation(path) == 0
+        assert bump_generation(path) == 1
+        assert bump_generation(path) == 2
+        assert read_generation(path) == 2
+
+
+class _CountingEncoder:
+    """Embedding model stub that counts encode calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, normalize_embeddings=True):
+        self.calls += 1
+        return np.array([[float(len(t)), 1.0, 0.0] for t in texts])
+
+
+class TestQueryEmbeddingCache:
+    """Tests for the shared query-embedding cache."""
+
+    def test_repeated_query_encodes_once(self):
+        """Normalized repeats are served from the cache as float32."""
+        cache = QueryEmbeddingCache(maxsize=8)
+        model = _CountingEncoder()
+
+        first = cache.encode(model, "m", "Neural networks")
+        second = cache.encode(model, "m", "  Neural   networks")
+
+        assert model.calls == 1
+        assert second is first
+        assert first.dtype == np.float32
+        assert not first.flags.writeable
+        assert cache.stats()["hits"] == 1
+
+    def test_model_name_is_part_of_key(self):
+        """The same query embedded by another model is a miss."""
+        cache = QueryEmbeddingCache(maxsize=8)
+        model = _CountingEncoder()
+        cache.encode(model, "model-a", "query")
+        cache.encode(model, "model-b", "query")
+        assert model.calls == 2
+
+    def test_persists_between_instances(self, tmp_path):
+        """A persistent cache is reloaded by a fresh instance."""
+        path = tmp_path / "query_embeddings.npz"
+        model = _CountingEncoder()
+        vector = QueryEmbeddingCache(maxsize=8, persist_path=path).encode(model, "m", "query")
+
+        reloaded = QueryEmbeddingCache(maxsize=8, persist_path=path)
+        assert len(reloaded) == 1
+        np.testing.assert_array_equal(reloaded.encode(model, "m", "query"), vector)
+        assert model.calls == 1
+
+    def test_ignores_other_persist_format(self, tmp_path):
+        """A cache file from an older key format is not loaded."""
+        path = tmp_path / "query_embeddings.npz"
+        np.savez(path, keys=np.array(["m\0query"]), vectors=np.ones((1, 3), dtype=np.float32))
+        assert len(QueryEmbeddingCache(maxsize=8, persist_path=path)) == 0
+
+    def test_case_is_part_of_key(self):
+        """Cased models get their own vector for each casing."""
+        cache = QueryEmbeddingCache(maxsize=8)
+        model = _CountingEncoder()
+        cache.encode(model, "m", "US exports")
+        cache.encode(model, "m", "us exports")
+        assert model.calls == 2
+
+    def test_hybrid_searcher_uses_cache(self):
+        """HybridSearcher embeds through the configured cache."""
+        model = _CountingEncoder()
+        searcher = HybridSearcher(
+            embed_model=model, embed_model_name="m", embedding_cache=QueryEmbeddingCache()
+        )
+        searcher.embed_query("hello")
+        searcher.embed_query(" hello ")
+        assert model.calls == 1
+
+
 class TestSearchResult:
     """Tests for SearchResult dataclass."""
 
@@ -308,6 +1131,197 @@ class TestHybridSearcher:
         assert new_searcher.bm25_index.doc_count == 2
 
 
+class _FakeCollection:
+    """Chroma-like collection returning fixed hits after an optional delay."""
+
+    def __init__(self, ids, delay=0.0):
+        self.ids = ids
+        self.delay = delay
+        self.calls = 0
+
+    def query(self, query_embeddings, n_results, include, where=None):
+        time.sleep(self.delay)
+        self.calls += 1
+        rows = len(query_embeddings)
+        ids = self.ids[:n_results]
+        return {
+            "ids": [ids] * rows,
+            "documents": [[f"text of {i}" for i in ids]] * rows,
+            "metadatas": [[{"path": i} for i in ids]] * rows,
+            "distances": [[0.1 * n for n in range(len(ids))]] * rows,
+        }
+
+
+class TestParallelRetrieval:
+    """Tests for concurrent vector/BM25 branches in HybridSearcher.search."""
+
+    def _searcher(self, **config):
+        searcher = HybridSearcher(
+            config=SearchConfig(method=SearchMethod.HYBRID, **config),
+            embed_model=_CountingEncoder(),
+        )
+        searcher.build_bm25_index(
+            ["doc1", "doc2", "doc3"],
+            ["python code sample", "java code", "python tutorial"],
+        )
+        return searcher
+
+    def test_parallel_matches_sequential(self):
+        """Running branches concurrently does not change the fused ranking."""
+        collection = _FakeCollection(["doc2", "doc1"])
+        sequential = self._searcher(parallel_retrieval=False).search("python", collection, k=3)
+        parallel = self._searcher(parallel_retrieval=True).search("python", collection, k=3)
+
+        assert [r.doc_id for r in parallel] == [r.doc_id for r in sequential]
+        assert [r.score for r in parallel] == pytest.approx([r.score for r in sequential])
+
+    def test_slow_branch_degrades_to_single_source(self):
+        """A vector branch past the timeout is dropped; BM25 answers alone."""
+        searcher = self._searcher(branch_timeout=0.05)
+        results = searcher.search("python", _FakeCollection(["doc2"], delay=0.5), k=3)
+
+        assert searcher.last_search_stats["timed_out"] == ["vector"]
+        assert {r.doc_id for r in results} == {"doc1", "doc3"}
+        assert all(set(r.source_scores) == {"bm25"} for r in results)
+
+    def test_records_branch_timings(self):
+        """Both branches report their wall time."""
+        searcher = self._searcher()
+        searcher.search("python", _FakeCollection(["doc1"]), k=2)
+        assert set(searcher.last_search_stats["timings_ms"]) == {"vector", "bm25"}
+        assert searcher.last_search_stats["timed_out"] == []
+
+    def test_concurrent_searches_keep_their_own_stats(self):
+        """A fast search finishing during a degraded one does not see its timeout, or hide it."""
+        searcher = self._searcher(branch_timeout=1.0)
+        seen = {}
+        slow_started, release = threading.Event(), threading.Event()
+
+        class _BlockedCollection(_FakeCollection):
+            def query(self, *args, **kwargs):
+                slow_started.set()
+                release.wait(5)
+                return super().query(*args, **kwargs)
+
+        def slow():
+            searcher.search("python", _BlockedCollection(["doc2"]), k=3)
+            seen["slow"] = list(searcher.last_search_stats["timed_out"])
+
+        thread = threading.Thread(target=slow)
+        thread.start()
+        assert slow_started.wait(5)
+        searcher.search("python", _FakeCollection(["doc2"]), k=3)
+        thread.join()
+        release.set()
+        seen["fast"] = list(searcher.last_search_stats["timed_out"])
+
+        assert seen == {"slow": ["vector"], "fast": []}
+
+
+class TestSearchMany:
+    """Tests for batched HybridSearcher.search_many."""
+
+    def test_matches_single_queries_with_one_call_each(self):
+        """A batch equals per-query searches but encodes and queries once."""
+        model = _CountingEncoder()
+        searcher = HybridSearcher(config=SearchConfig(method=SearchMethod.HYBRID), embed_model=model)
+        searcher.build_bm25_index(
+            ["doc1", "doc2", "doc3"],
+            ["python code sample", "java code", "python tutorial"],
+        )
+        queries = ["python", "java code", "tutorial"]
+
+        collection = _FakeCollection(["doc2", "doc1", "doc3"])
+        batch = searcher.search_many(queries, collection, k=2)
+        assert model.calls == 1
+        assert collection.calls == 1
+
+        singles = [searcher.search(q, _FakeCollection(["doc2", "doc1", "doc3"]), k=2) for q in queries]
+        assert [[r.doc_id for r in rs] for rs in batch] == [[r.doc_id for r in rs] for rs in singles]
+
+    def test_empty_batch(self):
+        """No queries, no work."""
+        assert HybridSearcher().search_many([], _FakeCollection([]), k=3) == []
+
+
+class _RecordingCrossEncoder:
+    """Cross-encoder stub scoring by text length and recording each batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs):
+        self.batches.append([text for _, text in pairs])
+        return [float(len(text)) for _, text in pairs]
+
+
+class TestReranking:
+    """Tests for cached, length-bucketed cross-encoder reranking."""
+
+    def _results(self):
+        texts = {"a": "x" * 30, "b": "x" * 5, "c": "x" * 50, "d": "x" * 10}
+        return [
+            SearchResult(doc_id=doc_id, text=text, score=1.0 - n * 0.01, source_scores={})
+            for n, (doc_id, text) in enumerate(texts.items())
+        ]
+
+    def _searcher(self, **config):
+        reranker = _RecordingCrossEncoder()
+        searcher = HybridSearcher(
+            config=SearchConfig(use_reranker=True, **config),
+            reranker=reranker,
+            rerank_cache=LRUCache(64),
+        )
+        searcher.last_search_stats = {}
+        return searcher, reranker
+
+    def test_batches_sorted_by_length(self):
+        """Pairs are scored shortest-first in fixed-size batches."""
+        searcher, reranker = self._searcher(rerank_batch_size=2)
+        reranked = searcher._rerank("query", self._results())
+
+        assert [len(batch) for batch in reranker.batches] == [2, 2]
+        assert [len(t) for t in reranker.batches[0]] == [5, 10]
+        assert [r.doc_id for r in reranked] == ["c", "a", "d", "b"]
+        assert reranked[0].source_scores["rerank"] == 50.0
+
+    def test_scores_cached_per_generation(self):
+        """Repeat queries reuse cached scores until the generation changes."""
+        searcher, reranker = self._searcher()
+        searcher._rerank("query", self._results())
+        searcher._rerank("  query ", self._results())
+        assert len(reranker.batches) == 1
+        assert searcher.last_search_stats["rerank_cache_hits"] == 4
+
+        searcher._rerank("Query", self._results())
+        assert len(reranker.batches) == 2
+
+        searcher.index_generation += 1
+        searcher._rerank("query", self._results())
+        assert len(reranker.batches) == 3
+
+    def test_large_margin_skips_reranker(self):
+        """A confident fused top-1 is returned without calling the model."""
+        searcher, reranker = self._searcher(rerank_skip_margin=0.5)
+        results = self._results()
+        results[0].score = 10.0
+
+        assert searcher._rerank("query", results) is results
+        assert reranker.batches == []
+        assert searcher.last_search_stats["rerank_skipped"] == 1
+
+    def test_rerank_time_reported(self):
+        """Search stats carry the rerank time next to branch timings."""
+        searcher, _ = self._searcher(method=SearchMethod.BM25)
+        searcher.build_bm25_index(["doc1", "doc2"], ["python code", "python tutorial"])
+        searcher.search("python", collection=None, k=2)
+
+        stats = searcher.last_search_stats
+        assert "bm25" in stats["timings_ms"]
+        assert stats["rerank_pairs"] == 2
+        assert stats["rerank_ms"] >= 0
+
+
 class TestFusionMethods:
     """Tests for result fusion methods."""
 
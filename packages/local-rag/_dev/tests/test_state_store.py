@@ -0,0 +1,92 @@
+"""Tests for the SQLite ingest state store."""
+
+import json
+
+import pytest
+
+from local_rag.storage.state_store import IngestStateStore, read_state_summary
+
+
+def _entry(chunks=1, mtime=100):
+    return {"hash": "h", "mtime": mtime, "chunks": chunks, "chunk_hashes": {"a:0-1": "x"}}
+
+
+class TestIngestStateStore:
+    """Tests for IngestStateStore dict semantics and persistence."""
+
+    def test_dict_interface(self, tmp_path):
+        """Entries behave like the old in-memory dict."""
+        state = IngestStateStore(tmp_path / "state.db")
+        state["a.md"] = _entry()
+        state["b.md"] = _entry(chunks=3)
+
+        assert len(state) == 2
+        assert state.get("missing") is None
+        assert state["b.md"]["chunks"] == 3
+        assert sorted(state) == ["a.md", "b.md"]
+        del state["a.md"]
+        assert "a.md" not in state
+        with pytest.raises(KeyError):
+            del state["a.md"]
+
+    def test_only_committed_changes_persist(self, tmp_path):
+        """A new store sees committed entries, not buffered ones."""
+        state = IngestStateStore(tmp_path / "state.db")
+        state["a.md"] = _entry()
+        state.commit()
+        state["b.md"] = _entry()
+
+        reopened = IngestStateStore(tmp_path / "state.db")
+        assert list(reopened) == ["a.md"]
+        assert reopened["a.md"] == _entry()
+
+    def test_in_place_changes_need_mark_dirty(self, tmp_path):
+        """Mutated entries are written after mark_dirty."""
+        state = IngestStateStore(tmp_path / "state.db")
+        state["a.md"] = _entry()
+        state.commit()
+        state["a.md"]["size"] = 42
+        state.mark_dirty("a.md")
+        state.commit()
+
+        assert IngestStateStore(tmp_path / "state.db")["a.md"]["size"] == 42
+
+    def test_len_counts_pending_rows(self, tmp_path):
+        """len() combines stored rows with buffered inserts and deletes."""
+        state = IngestStateStore(tmp_path / "state.db")
+        state["a.md"] = _entry()
+        state["b.md"] = _entry()
+        state.commit()
+
+        fresh = IngestStateStore(tmp_path / "state.db")
+        fresh["c.md"] = _entry()
+        fresh["a.md"] = _entry(chunks=2)
+        del fresh["b.md"]
+        assert len(fresh) == 2
+
+    def test_migrates_legacy_json(self, tmp_path):
+        """ingest_state.json is imported once and set aside."""
+        legacy = tmp_path / "ingest_state.json"
+        legacy.write_text(json.dumps({"a.md": _entry(), "b.md": _entry(chunks=2)}))
+
+        state = IngestStateStore(tmp_path / "state.db", legacy_json_path=legacy)
+        assert len(state) == 2
+        assert not legacy.exists()
+        assert (tmp_path / "ingest_state.json.migrated").exists()
+
+    def test_summary_without_loading_entries(self, tmp_path):
+        """Counts and last-index times come from one aggregate query."""
+        assert read_state_summary(tmp_path / "state.db") is None
+
+        state = IngestStateStore(tmp_path / "state.db")
+        state["a.md"] = _entry(chunks=2, mtime=100)
+        state["b.md"] = _entry(chunks=3, mtime=200)
+        state.commit()
+        state.set_meta("last_run", {"source": "/docs", "finished_at": None})
+
+        summary = read_state_summary(tmp_path / "state.db")
+        assert summary["indexed_files"] == 2
+        assert summary["indexed_chunks"] == 5
+        assert summary["last_index_mtime"] == 200
+        assert summary["last_indexed_at"] is not None
+        assert summary["last_run"] == {"source": "/docs", "finished_at": None}
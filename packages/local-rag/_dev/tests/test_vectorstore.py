@@ -504,3 +504,13 @@ class TestVectorStoreIntegration:
 
         assert len(results) == 1
         assert results[0].metadata["language"] == "python"
+
+    def test_search_many_matches_search(self, store_with_embeddings):
+        """Batched search returns one result list per query vector."""
+        queries = [[0.9, 0.1] + [0.0] * 382, [0.1, 0.9] + [0.0] * 382]
+
+        batch = store_with_embeddings.search_many(queries, k=2)
+
+        assert len(batch) == 2
+        for query, results in zip(queries, batch):
+            assert [r.id for r in results] == [r.id for r in store_with_embeddings.search(query, k=2)]
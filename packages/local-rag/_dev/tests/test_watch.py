@@ -0,0 +1,292 @@
+"""Tests for filesystem watching and the watch daemon."""
+
+import errno
+import sys
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from local_rag.ingestion.discover import TreeWalker
+from local_rag.ingestion.watch import (
+    CHANGED,
+    DELETED,
+    DIR_CHANGED,
+    DIR_DELETED,
+    OVERFLOW,
+    FsEvent,
+    InotifyWatcher,
+    PollingWatcher,
+)
+from local_rag.services.watch_service import WatchService
+
+EXTS = {".md", ".txt"}
+EXCLUDE_DIRS = {"node_modules", ".git"}
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+
+
+def _read_until(watcher, predicate, timeout=3.0):
+    events = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not predicate(events):
+        events.extend(watcher.read(0.1))
+    return events
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "docs"
+    (root / "sub").mkdir(parents=True)
+    (root / "node_modules").mkdir()
+    (root / "existing.md").write_text("hello")
+    return root
+
+
+@linux_only
+class TestInotifyWatcher:
+    """Tests for the inotify event source."""
+
+    def test_file_events(self, root):
+        """Writes, deletes and renames of kept files are reported; other files are not."""
+        watcher = InotifyWatcher(TreeWalker(root, EXTS, EXCLUDE_DIRS))
+        renamed = FsEvent(CHANGED, str(root / "sub" / "renamed.md"))
+        try:
+            (root / "sub" / "new.md").write_text("new")
+            (root / "image.bin").write_text("ignored")
+            (root / "node_modules" / "lib.md").write_text("ignored")
+            (root / "existing.md").unlink()
+            (root / "sub" / "new.md").rename(root / "sub" / "renamed.md")
+            events = set(_read_until(watcher, lambda ev: renamed in ev))
+        finally:
+            watcher.close()
+
+        assert FsEvent(CHANGED, str(root / "sub" / "new.md")) in events
+        assert FsEvent(DELETED, str(root / "existing.md")) in events
+        assert FsEvent(DELETED, str(root / "sub" / "new.md")) in events
+        assert renamed in events
+        assert not any("node_modules" in e.path or e.path.endswith(".bin") for e in events)
+
+    def test_directory_events(self, root, tmp_path):
+        """Directories moved in are watched and reported; moved out are reported once."""
+        watcher = InotifyWatcher(TreeWalker(root, EXTS, EXCLUDE_DIRS))
+        try:
+            assert watcher.watch_count == 2  # root and sub, not node_modules
+            outside = tmp_path / "outside"
+            (outside / "deep").mkdir(parents=True)
+            (outside / "deep" / "a.md").write_text("a")
+            outside.rename(root / "moved")
+            events = _read_until(watcher, lambda ev: ev)
+            assert FsEvent(DIR_CHANGED, str(root / "moved")) in events
+            assert watcher.watch_count == 4
+
+            (root / "moved" / "deep" / "b.md").write_text("b")
+            events = _read_until(watcher, lambda ev: ev)
+            assert FsEvent(CHANGED, str(root / "moved" / "deep" / "b.md")) in events
+
+            (root / "moved").rename(tmp_path / "gone")
+            events = _read_until(watcher, lambda ev: ev)
+            assert events == [FsEvent(DIR_DELETED, str(root / "moved"))]
+            assert watcher.watch_count == 2
+        finally:
+            watcher.close()
+
+    def test_watch_errors_do_not_escape_read(self, root, monkeypatch):
+        """A directory that cannot be watched is skipped; the watch limit reports an overflow."""
+        watcher = InotifyWatcher(TreeWalker(root, EXTS, EXCLUDE_DIRS))
+        add_watch = watcher._add_watch
+        failures = {str(root / "denied"): errno.EPERM, str(root / "full"): errno.ENOSPC}
+
+        def failing_add_watch(path):
+            if path in failures:
+                raise OSError(failures[path], "inotify_add_watch")
+            add_watch(path)
+
+        monkeypatch.setattr(watcher, "_add_watch", failing_add_watch)
+        try:
+            (root / "denied").mkdir()
+            events = _read_until(watcher, lambda ev: ev)
+            assert events == [FsEvent(DIR_CHANGED, str(root / "denied"))]
+            assert not watcher.exhausted
+
+            (root / "full").mkdir()
+            events = _read_until(watcher, lambda ev: ev)
+            assert FsEvent(OVERFLOW, str(root)) in events
+            assert watcher.exhausted
+        finally:
+            watcher.close()
+
+
+class TestPollingWatcher:
+    """Tests for the polling fallback."""
+
+    def test_detects_changes_and_deletions(self, root):
+        """A scan reports files whose size or mtime changed, and files that disappeared."""
+        watcher = PollingWatcher(TreeWalker(root, EXTS, EXCLUDE_DIRS), interval=0.1)
+        (root / "sub" / "new.md").write_text("new")
+        (root / "existing.md").unlink()
+        (root / "node_modules" / "lib.md").write_text("ignored")
+
+        events = set(_read_until(watcher, lambda ev: ev))
+        assert events == {
+            FsEvent(CHANGED, str(root / "sub" / "new.md")),
+            FsEvent(DELETED, str(root / "existing.md")),
+        }
+
+
+class FakeWatcher:
+    def __init__(self):
+        self.closed = False
+
+    def read(self, timeout):
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+class FakeIndexer:
+    """Records what the watch service asks of DocumentIndexer."""
+
+    def __init__(self, indexed=()):
+        self.settings = SimpleNamespace(
+            watch_debounce_seconds=2.0, watch_commit_seconds=30.0, watch_max_pending=100,
+            watch_backend="poll", watch_poll_seconds=10.0, max_file_size_mb=100,
+        )
+        self.include_globs, self.exclude_globs = [], []
+        self.indexed = set(indexed)
+        self.calls = Counter()
+        self.log = []
+
+    def indexed_paths(self, under=None):
+        prefix = f"{under}/" if under else ""
+        return [p for p in self.indexed if p.startswith(prefix)]
+
+    def remove_orphans(self, orphans, candidates=(), dry_run=False):
+        removed = [p for p in orphans if p in self.indexed]
+        self.log.extend(("remove", p) for p in orphans)
+        self.indexed.difference_update(removed)
+        return {"files_removed": len(removed), "files_moved": 0, "chunks_removed": len(removed), "chunks_rekeyed": 0}
+
+    def should_index_file(self, path, st=None):
+        return True
+
+    def check_file(self, path, st=None, verify=False):
+        return True, ("fingerprint", str(path))
+
+    def index_file(self, path, force=False, fingerprint=None):
+        assert fingerprint == ("fingerprint", str(path)), "check_file's fingerprint must be reused"
+        self.log.append(("index", str(path)))
+        self.indexed.add(str(path))
+        return 1, 0
+
+    def index_directory(self, source_dir, force=False, verify_hashes=False):
+        self.calls["index_directory"] += 1
+        return {"files_removed": 1, "files_moved": 0}
+
+    def commit(self):
+        self.calls["commit"] += 1
+
+
+class TestWatchService:
+    """Tests for debouncing, coalescing and burst handling."""
+
+    def test_events_coalesce_per_path_after_quiet_period(self, root):
+        """Repeated events for one path run once, after the debounce window."""
+        indexer = FakeIndexer()
+        service = WatchService(indexer, root, watcher=FakeWatcher(), debounce=2.0)
+        path = str(root / "existing.md")
+        service.add_events([FsEvent(CHANGED, path)] * 5, now=100.0)
+        service.add_events([FsEvent(CHANGED, path)], now=101.0)
+
+        assert not service.due(now=102.5)
+        assert service.due(now=103.0)
+        service.flush()
+        assert indexer.log == [("index", path)]
+        assert indexer.calls["commit"] == 0
+
+    def test_last_event_wins(self, root):
+        """A file created then deleted before the flush is only removed."""
+        indexer = FakeIndexer()
+        service = WatchService(indexer, root, watcher=FakeWatcher())
+        path = str(root / "sub" / "tmp.md")
+        service.add_events([FsEvent(CHANGED, path), FsEvent(DELETED, path)], now=0.0)
+        service.flush()
+        assert indexer.log == [("remove", path)]
+
+    def test_directory_events_expand_to_files(self, root):
+        """A moved-in directory queues its files; a removed one queues its indexed files."""
+        gone = str(root / "old" / "a.md")
+        indexer = FakeIndexer(indexed=[gone, str(root / "existing.md")])
+        service = WatchService(indexer, root, watcher=FakeWatcher())
+        (root / "sub" / "b.md").write_text("b")
+        service.add_events([FsEvent(DIR_CHANGED, str(root / "sub")), FsEvent(DIR_DELETED, str(root / "old"))])
+        assert service.pending == {str(root / "sub" / "b.md"): CHANGED, gone: DELETED}
+
+    def test_burst_switches_to_rescan(self, root):
+        """More pending paths than max_pending, or an overflow, run one rescan instead."""
+        indexer = FakeIndexer()
+        service = WatchService(indexer, root, watcher=FakeWatcher(), max_pending=10)
+        service.add_events([FsEvent(CHANGED, str(root / f"f{n}.md")) for n in range(50)], now=0.0)
+        assert service.rescan_needed and not service.pending
+
+        service.flush()
+        assert indexer.calls["index_directory"] == 1
+        assert indexer.log == []
+        assert service.stats["removed"] == 1
+
+        service.add_events([FsEvent(OVERFLOW, str(root))], now=10.0)
+        service.flush()
+        assert indexer.calls["index_directory"] == 2
+
+    def test_commits_are_periodic(self, root):
+        """Changes are committed once per commit interval, not per flush."""
+        indexer = FakeIndexer()
+        service = WatchService(indexer, root, watcher=FakeWatcher(), commit_interval=30.0)
+        start = service._last_commit
+        for n in range(3):
+            service.add_events([FsEvent(CHANGED, str(root / "existing.md"))])
+            service.flush()
+            service.maybe_commit(now=start + n)
+        assert indexer.calls["commit"] == 0
+        assert service.maybe_commit(now=start + 31)
+        assert indexer.calls["commit"] == 1
+        assert not service.maybe_commit(now=start + 100)
+
+    def test_exhausted_watcher_falls_back_to_polling(self, root):
+        """Running out of inotify watches swaps in a polling watcher and rescans."""
+
+        class ExhaustedWatcher(FakeWatcher):
+            exhausted = False
+
+            def read(self, timeout):
+                stop.set()
+                self.exhausted = True
+                return [FsEvent(OVERFLOW, str(root))]
+
+        stop = threading.Event()
+        indexer = FakeIndexer()
+        watcher = ExhaustedWatcher()
+        service = WatchService(indexer, root, watcher=watcher, debounce=60)
+        service.run(stop, initial_scan=False)
+        assert watcher.closed
+        assert isinstance(service.watcher, PollingWatcher)
+        assert indexer.calls["index_directory"] == 1
+
+    def test_run_flushes_and_closes_on_stop(self, root):
+        """Stopping the loop indexes what is queued, commits and closes the watcher."""
+
+        class OneShotWatcher(FakeWatcher):
+            def read(self, timeout):
+                stop.set()
+                return [FsEvent(CHANGED, str(root / "existing.md"))]
+
+        stop = threading.Event()
+        indexer = FakeIndexer()
+        watcher = OneShotWatcher()
+        WatchService(indexer, root, watcher=watcher, debounce=60).run(stop, initial_scan=False)
+        assert indexer.log == [("index", str(root / "existing.md"))]
+        assert indexer.calls["commit"] == 1
+        assert watcher.closed
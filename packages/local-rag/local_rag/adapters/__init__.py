@@ -1,3 +1,4 @@
 """Adapter layer for external storage/clients."""
 
 from .vectorstore import *  # noqa: F401,F403
+from .embeddings import *  # noqa: F401,F403
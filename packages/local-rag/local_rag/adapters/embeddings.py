@@ -0,0 +1,117 @@
+"""
+Model loading for embeddings and reranking.
+
+``ModelBackend`` decides how SentenceTransformer / CrossEncoder models are
+run:
+
+- ``torch``: the model as published (full precision PyTorch)
+- ``onnx``: exported once to ONNX and run with ONNX Runtime
+- ``onnx-int8``: the ONNX export with dynamic int8 quantization
+
+Exports live under ``<user_data_dir>/models/<model>/onnx/`` and are reused
+by every later process. The ONNX backends need
+``sentence-transformers[onnx]`` (4.1+ for cross-encoders).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+__all__ = ["EMBED_BACKENDS", "ModelBackend"]
+
+logger = logging.getLogger(__name__)
+
+EMBED_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Quantization presets understood by sentence_transformers.export_dynamic_quantized_onnx_model
+ONNX_QUANTIZATIONS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+_export_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ModelBackend:
+    """How to load SentenceTransformer and CrossEncoder models."""
+
+    name: str = "torch"
+    cache_dir: Optional[Path] = None
+    quantization: str = "avx512_vnni"
+
+    def __post_init__(self):
+        if self.name not in EMBED_BACKENDS:
+            raise ValueError(
+                f"Unknown embed backend {self.name!r} (expected one of {', '.join(EMBED_BACKENDS)})"
+            )
+        if self.name == "onnx-int8" and self.quantization not in ONNX_QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown ONNX quantization {self.quantization!r} "
+                f"(expected one of {', '.join(ONNX_QUANTIZATIONS)})"
+            )
+        if self.name != "torch" and self.cache_dir is None:
+            raise ValueError(f"The {self.name} backend needs a cache_dir for exported models")
+
+    @classmethod
+    def from_settings(cls, settings) -> "ModelBackend":
+        """Backend configured by EMBED_BACKEND / ONNX_QUANTIZATION."""
+        return cls(
+            name=settings.embed_backend,
+            cache_dir=settings.paths["model_cache_dir"],
+            quantization=settings.onnx_quantization,
+        )
+
+    def cache_key(self, model_name: str) -> str:
+        """Model identity for caches: backends produce slightly different vectors."""
+        return model_name if self.name == "torch" else f"{model_name}#{self.name}"
+
+    @property
+    def onnx_file_name(self) -> str:
+        """ONNX file (relative to the export directory) this backend runs."""
+        if self.name == "onnx-int8":
+            return f"onnx/model_qint8_{self.quantization}.onnx"
+        return "onnx/model.onnx"
+
+    def export_dir(self, model_name: str) -> Path:
+        """Directory holding the exported copy of ``model_name``."""
+        return Path(self.cache_dir) / re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+
+    def load_sentence_transformer(self, model_name: str):
+        """Load an embedding model with this backend."""
+        from sentence_transformers import SentenceTransformer
+
+        return self._load(SentenceTransformer, model_name)
+
+    def load_cross_encoder(self, model_name: str):
+        """Load a cross-encoder reranker with this backend."""
+        from sentence_transformers import CrossEncoder
+
+        return self._load(CrossEncoder, model_name)
+
+    def _load(self, model_cls, model_name: str):
+        if self.name == "torch":
+            return model_cls(model_name)
+
+        target = self.export_dir(model_name)
+        with _export_lock:
+            if not (target / self.onnx_file_name).exists():
+                self._export(model_cls, model_name, target)
+        return model_cls(str(target), backend="onnx", model_kwargs={"file_name": self.onnx_file_name})
+
+    def _export(self, model_cls, model_name: str, target: Path):
+        """Export ``model_name`` to ONNX (and quantize it) under ``target``."""
+        if not (target / "onnx" / "model.onnx").exists():
+            logger.info(f"Exporting {model_name} to ONNX in {target} (one-time)...")
+            model = model_cls(model_name, backend="onnx")
+            target.mkdir(parents=True, exist_ok=True)
+            model.save_pretrained(str(target))
+
+        if self.name == "onnx-int8":
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            logger.info(f"Quantizing {model_name} to int8 ({self.quantization})...")
+            model = model_cls(str(target), backend="onnx")
+            export_dynamic_quantized_onnx_model(model, self.quantization, str(target))
@@ -19,8 +19,41 @@ import uuid
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# A float32 matrix of shape (n, dim), or one vector per document
+Embeddings = Union[np.ndarray, Sequence[Sequence[float]]]
+
+
+def as_embedding_matrix(embeddings: Embeddings) -> np.ndarray:
+    """
+    Embeddings as a C-contiguous float32 matrix.
+
+    A C-contiguous float32 array is returned as is; anything else (lists of
+    floats, lists of 1-D arrays, float64 arrays) is converted once, without
+    creating a Python float per value.
+    """
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+@lru_cache(maxsize=1)
+def _chroma_accepts_arrays() -> bool:
+    """Whether the installed chromadb takes NumPy embeddings (it normalizes them itself)."""
+    try:
+        from chromadb.api import types
+    except ImportError:
+        return False
+    return hasattr(types, "normalize_embeddings")
+
+
+def _chroma_embeddings(embeddings: Embeddings):
+    matrix = as_embedding_matrix(embeddings)
+    # Older chromadb validates plain lists of Python floats
+    return matrix if _chroma_accepts_arrays() else matrix.tolist()
 
 
 class VectorStoreType(str, Enum):
@@ -48,7 +81,14 @@ class SearchResult:
 
 
 class BaseVectorStore(ABC):
-    """Abstract base class for vector stores."""
+    """
+    Abstract base class for vector stores.
+
+    Write methods take ``embeddings`` as a float32 ``(n, dim)`` matrix (see
+    :func:`as_embedding_matrix`) or as one vector per document; backends hand
+    the matrix to their client without building Python float lists where the
+    client allows it.
+    """
 
     def __init__(self, collection_name: str = "docs", persist_dir: str = None):
         self.collection_name = collection_name
@@ -59,7 +99,7 @@ class BaseVectorStore(ABC):
         self,
         ids: List[str],
         texts: List[str],
-        embeddings: List[List[float]],
+        embeddings: Embeddings,
         metadatas: Optional[List[Dict]] = None
     ):
         """Add documents to the store."""
@@ -70,6 +110,11 @@ class BaseVectorStore(ABC):
         """Delete documents by ID or filter."""
         pass
 
+    def delete_by_field(self, key: str, values: List[Any]):
+        """Delete documents whose metadata ``key`` is any of ``values``; backends override this with one call."""
+        for value in values:
+            self.delete_documents(where={key: value})
+
     @abstractmethod
     def search(
         self,
@@ -80,9 +125,18 @@ class BaseVectorStore(ABC):
         """Search for similar documents."""
         pass
 
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 10,
+        where: Dict = None
+    ) -> List[List[SearchResult]]:
+        """Search for several query vectors; backends override this with one batched call."""
+        return [self.search(query_embedding, k=k, where=where) for query_embedding in query_embeddings]
+
     @abstractmethod
-    def get_documents(self, ids: List[str]) -> List[Document]:
-        """Get documents by ID."""
+    def get_documents(self, ids: List[str], include_embeddings: bool = True) -> List[Document]:
+        """Get documents by ID; ``include_embeddings=False`` fetches text and metadata only."""
         pass
 
     @abstractmethod
@@ -153,23 +207,17 @@ class ChromaVectorStore(BaseVectorStore):
         self,
         ids: List[str],
         texts: List[str],
-        embeddings: List[List[float]],
+        embeddings: Embeddings,
         metadatas: Optional[List[Dict]] = None
     ):
         """Add documents to ChromaDB."""
         if not ids:
             return
 
-        # Ensure embeddings are lists (not numpy arrays)
-        embeddings_list = [
-            e.tolist() if hasattr(e, 'tolist') else list(e)
-            for e in embeddings
-        ]
-
         self.collection.add(
             ids=ids,
             documents=texts,
-            embeddings=embeddings_list,
+            embeddings=_chroma_embeddings(embeddings),
             metadatas=metadatas or [{} for _ in ids]
         )
 
@@ -177,22 +225,17 @@ class ChromaVectorStore(BaseVectorStore):
         self,
         ids: List[str],
         texts: List[str],
-        embeddings: List[List[float]],
+        embeddings: Embeddings,
         metadatas: Optional[List[Dict]] = None
     ):
         """Upsert documents (add or update)."""
         if not ids:
             return
 
-        embeddings_list = [
-            e.tolist() if hasattr(e, 'tolist') else list(e)
-            for e in embeddings
-        ]
-
         self.collection.upsert(
             ids=ids,
             documents=texts,
-            embeddings=embeddings_list,
+            embeddings=_chroma_embeddings(embeddings),
             metadatas=metadatas or [{} for _ in ids]
         )
 
@@ -203,6 +246,11 @@ class ChromaVectorStore(BaseVectorStore):
         elif where:
             self.collection.delete(where=where)
 
+    def delete_by_field(self, key: str, values: List[Any]):
+        """Delete documents matching any of ``values`` with one ``$in`` filter."""
+        if values:
+            self.collection.delete(where={key: {"$in": list(values)}})
+
     def search(
         self,
         query_embedding: List[float],
@@ -210,10 +258,20 @@ class ChromaVectorStore(BaseVectorStore):
         where: Dict = None
     ) -> List[SearchResult]:
         """Search ChromaDB."""
-        query_emb = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
+        return self.search_many([query_embedding], k=k, where=where)[0]
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 10,
+        where: Dict = None
+    ) -> List[List[SearchResult]]:
+        """Search ChromaDB for several query vectors in one ``query`` call."""
+        if not len(query_embeddings):
+            return []
 
         kwargs = {
-            'query_embeddings': [query_emb],
+            'query_embeddings': _chroma_embeddings(query_embeddings),
             'n_results': k,
             'include': ['documents', 'metadatas', 'distances']
         }
@@ -222,25 +280,33 @@ class ChromaVectorStore(BaseVectorStore):
 
         results = self.collection.query(**kwargs)
 
-        search_results = []
-        if results.get('ids') and results['ids'][0]:
-            for i in range(len(results['ids'][0])):
-                distance = results['distances'][0][i]
+        batch = []
+        for row in range(len(query_embeddings)):
+            search_results = []
+            ids = results['ids'][row] if results.get('ids') and len(results['ids']) > row else []
+            for i in range(len(ids)):
+                distance = results['distances'][row][i]
                 # Convert distance to similarity (cosine distance -> similarity)
                 score = 1 - distance
 
                 search_results.append(SearchResult(
-                    id=results['ids'][0][i],
-                    text=results['documents'][0][i],
+                    id=ids[i],
+                    text=results['documents'][row][i],
                     score=score,
-                    metadata=results['metadatas'][0][i] if results.get('metadatas') else {}
+                    metadata=results['metadatas'][row][i] if results.get('metadatas') else {}
                 ))
+            batch.append(search_results)
 
-        return search_results
+        return batch
 
-    def get_documents(self, ids: List[str]) -> List[Document]:
+    def get_documents(self, ids: List[str], include_embeddings: bool = True) -> List[Document]:
         """Get documents by ID."""
-        results = self.collection.get(ids=ids, include=['documents', 'metadatas', 'embeddings'])
+        include = ['documents', 'metadatas']
+        if include_embeddings:
+            include.append('embeddings')
+        results = self.collection.get(ids=ids, include=include)
+        # Newer chromadb returns embeddings as a NumPy array, which has no truth value
+        embeddings = results.get('embeddings')
 
         documents = []
         if results.get('ids'):
@@ -248,7 +314,7 @@ class ChromaVectorStore(BaseVectorStore):
                 documents.append(Document(
                     id=doc_id,
                     text=results['documents'][i] if results.get('documents') else '',
-                    embedding=results['embeddings'][i] if results.get('embeddings') else None,
+                    embedding=embeddings[i] if embeddings is not None else None,
                     metadata=results['metadatas'][i] if results.get('metadatas') else {}
                 ))
 
@@ -344,36 +410,27 @@ class QdrantVectorStore(BaseVectorStore):
         self,
         ids: List[str],
         texts: List[str],
-        embeddings: List[List[float]],
+        embeddings: Embeddings,
         metadatas: Optional[List[Dict]] = None
     ):
-        """Add documents to Qdrant."""
+        """Add documents to Qdrant (upserts: point ids derive from document ids)."""
         if not ids:
             return
 
-        from qdrant_client.models import PointStruct
-
-        points = []
-        for i, (doc_id, text, embedding) in enumerate(zip(ids, texts, embeddings)):
-            # Convert embedding to list if needed
-            emb_list = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
-
-            # Prepare payload
-            payload = metadatas[i] if metadatas else {}
-            payload['text'] = text
-
-            # Qdrant needs integer or UUID IDs
-            point_id = self._to_point_id(doc_id)
-
-            points.append(PointStruct(
-                id=point_id,
-                vector=emb_list,
-                payload={**payload, '_original_id': doc_id}
-            ))
-
-        self.client.upsert(
+        payloads = [
+            {**(metadatas[i] if metadatas else {}), 'text': text, '_original_id': doc_id}
+            for i, (doc_id, text) in enumerate(zip(ids, texts))
+        ]
+        # upload_collection takes the float32 matrix as is; one batch per call,
+        # as callers (BatchedWriter) already bound the call size
+        self.client.upload_collection(
             collection_name=self.collection_name,
-            points=points
+            vectors=as_embedding_matrix(embeddings),
+            payload=payloads,
+            # Qdrant needs integer or UUID IDs
+            ids=[self._to_point_id(doc_id) for doc_id in ids],
+            batch_size=len(ids),
+            wait=True,
         )
 
     def _to_point_id(self, doc_id: str) -> str:
@@ -404,6 +461,45 @@ class QdrantVectorStore(BaseVectorStore):
                     points_selector=Filter(must=conditions)
                 )
 
+    def delete_by_field(self, key: str, values: List[Any]):
+        """Delete points whose payload ``key`` matches any of ``values`` in one call."""
+        from qdrant_client.models import FieldCondition, Filter, MatchAny
+
+        if values:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=Filter(must=[FieldCondition(key=key, match=MatchAny(any=list(values)))])
+            )
+
+    def _build_filter(self, where: Dict = None):
+        """Convert a where dict into a Qdrant filter (None if empty)."""
+        from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+        if not where:
+            return None
+        conditions = [
+            FieldCondition(key=key, match=MatchValue(value=value))
+            for key, value in where.items()
+        ]
+        return Filter(must=conditions) if conditions else None
+
+    def _to_search_results(self, points) -> List[SearchResult]:
+        """Convert scored points into SearchResults."""
+        search_results = []
+        for result in points:
+            payload = result.payload or {}
+            text = payload.pop('text', '')
+            original_id = payload.pop('_original_id', str(result.id))
+
+            search_results.append(SearchResult(
+                id=original_id,
+                text=text,
+                score=result.score,
+                metadata=payload
+            ))
+
+        return search_results
+
     def search(
         self,
         query_embedding: List[float],
@@ -411,45 +507,48 @@ class QdrantVectorStore(BaseVectorStore):
         where: Dict = None
     ) -> List[SearchResult]:
         """Search Qdrant."""
-        from qdrant_client.models import FieldCondition, Filter, MatchValue
-
         query_emb = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
 
-        # Build filter if provided
-        query_filter = None
-        if where:
-            conditions = []
-            for key, value in where.items():
-                conditions.append(
-                    FieldCondition(key=key, match=MatchValue(value=value))
-                )
-            if conditions:
-                query_filter = Filter(must=conditions)
-
         results = self.client.search(
             collection_name=self.collection_name,
             query_vector=query_emb,
             limit=k,
-            query_filter=query_filter,
+            query_filter=self._build_filter(where),
             with_payload=True
         )
 
-        search_results = []
-        for result in results:
-            payload = result.payload or {}
-            text = payload.pop('text', '')
-            original_id = payload.pop('_original_id', str(result.id))
+        return self._to_search_results(results)
 
-            search_results.append(SearchResult(
-                id=original_id,
-                text=text,
-                score=result.score,
-                metadata=payload
-            ))
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = 10,
+        where: Dict = None
+    ) -> List[List[SearchResult]]:
+        """Search Qdrant for several query vectors in one ``search_batch`` request."""
+        from qdrant_client.models import SearchRequest
+
+        if not len(query_embeddings):
+            return []
+
+        query_filter = self._build_filter(where)
+        requests = [
+            SearchRequest(
+                vector=emb.tolist() if hasattr(emb, 'tolist') else list(emb),
+                limit=k,
+                filter=query_filter,
+                with_payload=True
+            )
+            for emb in query_embeddings
+        ]
+        batches = self.client.search_batch(
+            collection_name=self.collection_name,
+            requests=requests
+        )
 
-        return search_results
+        return [self._to_search_results(points) for points in batches]
 
-    def get_documents(self, ids: List[str]) -> List[Document]:
+    def get_documents(self, ids: List[str], include_embeddings: bool = True) -> List[Document]:
         """Get documents by ID."""
         point_ids = [self._to_point_id(doc_id) for doc_id in ids]
 
@@ -457,7 +556,7 @@ class QdrantVectorStore(BaseVectorStore):
             collection_name=self.collection_name,
             ids=point_ids,
             with_payload=True,
-            with_vectors=True
+            with_vectors=include_embeddings
         )
 
         documents = []
@@ -4,6 +4,7 @@ import sys
 from typing import List
 
 from . import __version__, indexer, query, visualize
+from .services import gc_service, watch_service
 from .health import get_health
 from .settings import get_settings
 
@@ -14,12 +15,17 @@ Local RAG CLI (v{__version__})
 
 Commands:
   index      Index a folder of documents
+  watch      Keep a folder's index up to date as files change
+  gc         Remove deleted files from the index
   query      Search an existing index
   visualize  Inspect how text is chunked
   health     Show vector count and last index time
 
 Examples:
   local-rag index ~/Docs --user-data-dir ~/rag-data
+  local-rag index --compact --user-data-dir ~/rag-data
+  local-rag watch ~/Docs --user-data-dir ~/rag-data
+  local-rag gc ~/Docs --user-data-dir ~/rag-data --dry-run
   local-rag query "neural nets" --user-data-dir ~/rag-data -k 5
   local-rag visualize README.md --strategy template
   local-rag health --user-data-dir ~/rag-data
@@ -44,6 +50,14 @@ def main(argv: List[str] | None = None):
         sys.argv = [f"{sys.argv[0]} index"] + passthrough
         return indexer.main()
 
+    if command == "watch":
+        sys.argv = [f"{sys.argv[0]} watch"] + passthrough
+        return watch_service.main()
+
+    if command == "gc":
+        sys.argv = [f"{sys.argv[0]} gc"] + passthrough
+        return gc_service.main()
+
     if command == "query":
         sys.argv = [f"{sys.argv[0]} query"] + passthrough
         return query.main()
@@ -34,5 +34,8 @@ def get_paths(user_data_dir: str) -> Dict[str, Path]:
         'base': base,
         'persist_dir': base / "vectordb",
         'state_path': base / "state" / "ingest_state.json",
-        'bm25_path': base / "state" / "bm25_index.json"
+        'state_db_path': base / "state" / "ingest_state.db",
+        'bm25_path': base / "state" / "bm25_index.json",
+        'bm25_dir': base / "state" / "bm25",
+        'generation_path': base / "state" / "index_generation"
     }
@@ -9,29 +9,45 @@ from .adapters.vectorstore import get_vector_store
 from .services.index_service import load_state
 from .settings import LocalRagSettings, get_settings
 from .storage import create_repository
+from .storage.state_store import read_state_summary
+
+
+def _readable(timestamp: Optional[float]) -> Optional[str]:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)) if timestamp else None
 
 
 def get_health(settings: Optional[LocalRagSettings] = None) -> Dict[str, Any]:
     """
-    Return a small health snapshot: vector count and last index mtime.
+    Return a small health snapshot: vector count, indexed files and last index times.
+
+    Counts come from one aggregate query on the ingest state database; the
+    per-file entries are never loaded.
     """
     settings = settings or get_settings()
     repo = create_repository(settings, factory=get_vector_store)
     count = repo.count()
-    state = load_state(settings.paths["state_path"])
-    last_index = None
-    if state:
-        try:
-            last_index = max(entry.get("mtime", 0) for entry in state.values())
-        except Exception:
-            last_index = None
 
+    summary = read_state_summary(settings.paths["state_db_path"])
+    if summary is None:
+        # Not migrated yet: fall back to the legacy JSON state
+        state = load_state(settings.paths["state_path"])
+        summary = {
+            "indexed_files": len(state),
+            "indexed_chunks": sum(entry.get("chunks", 0) for entry in state.values()),
+            "last_index_mtime": max((entry.get("mtime", 0) for entry in state.values()), default=None),
+            "last_indexed_at": None,
+            "last_run": None,
+        }
+
+    last_run = summary["last_run"] or {}
     return {
         "vector_count": count,
-        "last_index_mtime": last_index,
-        "last_index_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_index))
-        if last_index
-        else None,
+        "indexed_files": summary["indexed_files"],
+        "indexed_chunks": summary["indexed_chunks"],
+        "last_index_mtime": summary["last_index_mtime"],
+        "last_index_readable": _readable(summary["last_index_mtime"]),
+        "last_indexed_at": _readable(summary["last_indexed_at"]),
+        "last_run_interrupted": bool(last_run) and last_run.get("finished_at") is None,
         "user_data_dir": str(settings.user_data_dir),
         "collection": settings.collection_name,
     }
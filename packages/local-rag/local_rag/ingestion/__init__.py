@@ -1,5 +1,13 @@
 """Ingestion helpers for Local RAG."""
 
-from . import extractors as extractor  # backward compat alias
+__all__ = ["extractors", "extractor", "ocr", "discover", "filters", "chunking", "pipeline", "utils", "watch"]
 
-__all__ = ["extractors", "extractor", "ocr", "discover", "filters", "chunking", "utils"]
+
+def __getattr__(name):
+    # Imported on first use: extractors needs the PDF/OCR libraries, which
+    # extraction worker processes must not require just to start up
+    if name == "extractor":  # backward compat alias
+        from . import extractors
+
+        return extractors
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
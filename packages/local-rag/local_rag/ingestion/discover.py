@@ -2,25 +2,159 @@
 
 from __future__ import annotations
 
-from fnmatch import fnmatch
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import translate
 from pathlib import Path
-from typing import Iterable, List, Set
+from typing import Iterable, Iterator, List, Optional, Pattern, Set, Tuple
 
 
-def _is_excluded_dir(path: Path, root: Path, exclude_dirs: Set[str]) -> bool:
-    """Check if any parent directory (relative to root) is excluded by name."""
-    # Only check parents within the scanned directory tree, not absolute system paths
-    try:
-        rel_path = path.relative_to(root)
-        # Check each component of the relative path (excluding the filename itself)
-        return any(part in exclude_dirs for part in rel_path.parent.parts)
-    except ValueError:
-        # path is not relative to root, shouldn't happen but handle gracefully
-        return False
+def _compile_globs(globs: List[str]) -> Optional[Pattern[str]]:
+    """One regex matching any of ``globs`` (fnmatch semantics: ``*`` also matches ``/``)."""
+    if not globs:
+        return None
+    return re.compile("|".join(f"(?:{translate(os.path.normcase(g))})" for g in globs))
 
 
-def _matches_globs(rel_path: str, globs: List[str]) -> bool:
-    return any(fnmatch(rel_path, pattern) for pattern in globs)
+def _compile_dir_prefixes(globs: List[str]) -> Optional[Pattern[str]]:
+    """
+    Directories whose whole subtree an exclude glob matches.
+
+    ``build/*``, ``docs/private/**`` and ``*/fixtures/*`` end in a component
+    made only of ``*``. Because ``*`` also matches ``/``, every file below a
+    directory matching the part before that component is excluded, so the
+    walker never needs to enter it.
+    """
+    prefixes = []
+    for glob in globs:
+        head, sep, tail = glob.replace("\\", "/").rpartition("/")
+        if sep and head and tail and set(tail) == {"*"}:
+            prefixes.append(head.replace("/", os.sep))
+    return _compile_globs(prefixes)
+
+
+class TreeWalker:
+    """
+    Scandir-based walk that prunes excluded directories before entering them.
+
+    Paths are matched relative to ``root``, so the same walker also answers
+    whether a single file or directory below ``root`` is in scope (used by
+    the watch daemon for filesystem events).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        allowed_exts: Set[str],
+        exclude_dirs: Set[str],
+        include_globs: List[str] | None = None,
+        exclude_globs: List[str] | None = None,
+    ):
+        self.root = str(root)
+        self.allowed_exts = allowed_exts
+        self.exclude_dirs = exclude_dirs
+        self.include = _compile_globs(include_globs or [])
+        self.exclude = _compile_globs(exclude_globs or [])
+        self.prune = _compile_dir_prefixes(exclude_globs or [])
+
+    def _relative(self, path) -> Optional[str]:
+        rel = os.path.relpath(path, self.root)
+        if rel == os.curdir:
+            return ""
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return rel
+
+    def _enters(self, name: str, rel: str) -> bool:
+        return name not in self.exclude_dirs and not (
+            self.prune and self.prune.match(os.path.normcase(rel))
+        )
+
+    def _keeps(self, name: str, rel: str) -> bool:
+        if os.path.splitext(name)[1].lower() not in self.allowed_exts:
+            return False
+        rel_key = os.path.normcase(rel)
+        if self.include and not self.include.match(rel_key):
+            return False
+        if self.exclude and self.exclude.match(rel_key):
+            return False
+        return True
+
+    def enters_dir(self, path) -> bool:
+        """Whether the walk enters directory ``path`` (checked from ``root`` down)."""
+        rel = self._relative(path)
+        if rel is None:
+            return False
+        parts = rel.split(os.sep) if rel else []
+        return all(self._enters(name, os.sep.join(parts[: i + 1])) for i, name in enumerate(parts))
+
+    def keeps_file(self, path) -> bool:
+        """Whether file ``path`` would be discovered (it need not exist)."""
+        rel = self._relative(path)
+        if not rel:
+            return False
+        return self.enters_dir(os.path.dirname(path)) and self._keeps(os.path.basename(rel), rel)
+
+    def scan(self, dir_path: str, rel_dir: str) -> Tuple[List[Path], List[Tuple[str, str]]]:
+        """Files kept in one directory, and its subdirectories still to walk."""
+        files: List[Path] = []
+        subdirs: List[Tuple[str, str]] = []
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return files, subdirs
+
+        for entry in entries:
+            name = entry.name
+            rel = rel_dir + name
+            try:
+                # d_type from readdir: no stat() for the common case
+                if entry.is_dir(follow_symlinks=False):
+                    if self._enters(name, rel):
+                        subdirs.append((entry.path, rel + os.sep))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+
+            if self._keeps(name, rel):
+                files.append(Path(entry.path))
+        return files, subdirs
+
+    def walk(self, dir_path: str, rel_dir: str) -> Iterator[Path]:
+        """Depth-first walk of one subtree."""
+        for files, _ in self._walk(dir_path, rel_dir):
+            yield from files
+
+    def _walk(self, dir_path: str, rel_dir: str) -> Iterator[Tuple[List[Path], str]]:
+        stack = [(dir_path, rel_dir)]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            files, subdirs = self.scan(dir_path, rel_dir)
+            yield files, dir_path
+            stack.extend(reversed(subdirs))
+
+    def _start(self, path) -> Optional[Tuple[str, str]]:
+        rel = self._relative(path)
+        if rel is None or not self.enters_dir(path):
+            return None
+        return str(path), rel + os.sep if rel else ""
+
+    def files_under(self, path) -> Iterator[Path]:
+        """Files discovered below directory ``path``."""
+        start = self._start(path)
+        if start is not None:
+            yield from self.walk(*start)
+
+    def dirs_under(self, path) -> Iterator[str]:
+        """``path`` and every directory the walk enters below it."""
+        start = self._start(path)
+        if start is not None:
+            for _, dir_path in self._walk(*start):
+                yield dir_path
 
 
 def discover_files(
@@ -29,33 +163,30 @@ def discover_files(
     exclude_dirs: Set[str],
     include_globs: List[str] | None = None,
     exclude_globs: List[str] | None = None,
+    workers: int = 1,
 ) -> Iterable[Path]:
     """
     Yield files under root that match extensions and glob filters.
 
     include_globs: if provided, only files matching any pattern are kept.
     exclude_globs: files matching any pattern are skipped.
-    """
-    include_globs = include_globs or []
-    exclude_globs = exclude_globs or []
-
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-
-        if _is_excluded_dir(path, root, exclude_dirs):
-            continue
-
-        if path.suffix.lower() not in allowed_exts:
-            continue
+    workers: walk the top-level subdirectories on this many threads.
 
-        rel = path.relative_to(root)
-        rel_str = str(rel)
-
-        if include_globs and not _matches_globs(rel_str, include_globs):
-            continue
-
-        if exclude_globs and _matches_globs(rel_str, exclude_globs):
-            continue
-
-        yield path
+    Directories named in ``exclude_dirs``, and directories an exclude glob
+    covers entirely (``build/*``), are never entered. Symlinked directories
+    are not followed.
+    """
+    walker = TreeWalker(root, allowed_exts, exclude_dirs, include_globs, exclude_globs)
+    files, subdirs = walker.scan(str(root), "")
+    yield from files
+
+    if workers <= 1 or len(subdirs) <= 1:
+        for dir_path, rel_dir in subdirs:
+            yield from walker.walk(dir_path, rel_dir)
+        return
+
+    # Each top-level subtree is collected on its own thread; results keep walk order
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="discover") as executor:
+        futures = [executor.submit(lambda d: list(walker.walk(*d)), d) for d in subdirs]
+        for future in futures:
+            yield from future.result()
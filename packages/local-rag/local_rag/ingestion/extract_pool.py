@@ -0,0 +1,99 @@
+"""
+Document extraction in worker processes.
+
+PDF, Office and OCR post-processing are CPU-bound Python, so extraction
+threads serialize on the GIL. :class:`ExtractorPool` runs
+``read_text_with_ocr`` in a ``ProcessPoolExecutor`` instead. Each worker
+process is replaced after ``max_files_per_worker`` files so memory leaked
+by the PDF libraries is returned to the OS, and a pool broken by a
+crashing worker is rebuilt, failing only the files that were in flight.
+
+Workers are started with ``spawn``: they import ``local_rag`` fresh and
+rebuild the indexer's settings from a plain dict.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_worker_settings = None
+
+
+def _init_worker(settings_data: Dict[str, Any]):
+    global _worker_settings
+    from ..settings import LocalRagSettings
+
+    _worker_settings = LocalRagSettings(**settings_data)
+    _worker_settings.apply_runtime_env()
+
+
+def extract_in_worker(path: str) -> str:
+    """Extract one file's text inside a worker process."""
+    from .extractors import read_text_with_ocr
+
+    return read_text_with_ocr(Path(path), settings=_worker_settings)
+
+
+class ExtractorPool:
+    """Process pool that extracts document text, recycling workers after N files."""
+
+    def __init__(
+        self,
+        settings,
+        workers: int,
+        max_files_per_worker: int = 0,
+        target: Callable[[str], str] = extract_in_worker,
+    ):
+        self.workers = max(1, workers)
+        self.max_files_per_worker = max_files_per_worker
+        self._settings_data = settings.model_dump()
+        self._target = target
+        self._lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._settings_data,),
+            max_tasks_per_child=self.max_files_per_worker or None,
+        )
+
+    def read_text(self, path: Path) -> str:
+        """Extract ``path`` in a worker; blocks the calling thread until done."""
+        executor = self._executor
+        try:
+            return executor.submit(self._target, str(path)).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    logger.warning(f"Extraction worker died while reading {path}; restarting the pool")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._start()
+            raise
+
+    def close(self):
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "ExtractorPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_extractor_pool(settings) -> Optional[ExtractorPool]:
+    """Process pool configured by EXTRACT_WORKERS, or None to extract in-process."""
+    if settings.extract_workers <= 0:
+        return None
+    return ExtractorPool(settings, settings.extract_workers, settings.extract_max_files_per_worker)
@@ -0,0 +1,194 @@
+"""
+Staged pipeline used by the indexer.
+
+Stages run on their own threads and hand work to the next one through
+bounded queues, so a slow stage applies back-pressure instead of buffering
+the whole corpus in memory. Batching stages drain whatever is queued (up
+to a size budget) into one call: when the stage keeps up, batches stay
+small and latency low; when it is the bottleneck, its queue fills and
+batches grow.
+
+Every stage keeps a :class:`StageStats` with item/chunk/batch counts and
+the time spent working. Time blocked on a full downstream queue is
+counted separately as ``blocked_seconds``, so per-stage throughput shows
+which stage limits the pipeline.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+CLOSED = object()
+
+
+@dataclass
+class StageStats:
+    """Counters for one pipeline stage."""
+
+    name: str
+    items: int = 0
+    chunks: int = 0
+    batches: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, items: int = 0, chunks: int = 0, batches: int = 0, errors: int = 0,
+            busy: float = 0.0, blocked: float = 0.0):
+        with self._lock:
+            self.items += items
+            self.chunks += chunks
+            self.batches += batches
+            self.errors += errors
+            self.busy_seconds += busy
+            self.blocked_seconds += blocked
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Counters plus throughput over busy time."""
+        busy = self.busy_seconds
+        return {
+            "items": self.items,
+            "chunks": self.chunks,
+            "batches": self.batches,
+            "errors": self.errors,
+            "busy_s": round(busy, 3),
+            "blocked_s": round(self.blocked_seconds, 3),
+            "items_per_s": round(self.items / busy, 1) if busy else None,
+            "chunks_per_s": round(self.chunks / busy, 1) if busy else None,
+        }
+
+
+class Pipeline:
+    """
+    Threads connected by bounded queues.
+
+    Stage functions are called as ``fn(item, emit)`` (or ``fn(batch, emit)``
+    for batching stages) and pass results downstream with ``emit``. They
+    return an optional ``(items, chunks)`` tuple for the stage counters.
+    Exceptions are handed to the stage's ``on_error`` and never stop the
+    stage, so the pipeline always drains.
+    """
+
+    def __init__(self, queue_size: int = 64):
+        self.queue_size = max(1, queue_size)
+        self.stats: Dict[str, StageStats] = {}
+        self.stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def queue(self, maxsize: Optional[int] = None) -> "queue.Queue":
+        """A bounded queue between two stages."""
+        return queue.Queue(maxsize=maxsize or self.queue_size)
+
+    def _emitter(self, outbox: Optional["queue.Queue"], blocked: List[float]) -> Callable[[Any], None]:
+        def emit(item):
+            start = time.perf_counter()
+            outbox.put(item)
+            blocked[0] += time.perf_counter() - start
+        return emit
+
+    def _run(self, stats: StageStats, fn, work, outbox, on_error, batch: bool):
+        blocked = [0.0]
+        emit = self._emitter(outbox, blocked)
+        start = time.perf_counter()
+        try:
+            counts = fn(work, emit)
+        except Exception as e:
+            stats.add(errors=1)
+            if on_error is not None:
+                on_error(work, e)
+            else:
+                logger.error(f"Pipeline stage {stats.name} failed: {e}", exc_info=True)
+            counts = None
+        elapsed = time.perf_counter() - start
+        items, chunks = counts or (len(work) if batch else 1, 0)
+        stats.add(items=items, chunks=chunks, batches=1 if batch else 0,
+                  busy=elapsed - blocked[0], blocked=blocked[0])
+
+    def stage(
+        self,
+        name: str,
+        fn: Callable,
+        inbox: "queue.Queue",
+        outbox: Optional["queue.Queue"] = None,
+        workers: int = 1,
+        on_error: Optional[Callable[[Any, Exception], None]] = None,
+    ):
+        """Run ``fn`` for every item of ``inbox`` on ``workers`` threads."""
+        stats = self.stats.setdefault(name, StageStats(name))
+        remaining = [max(1, workers)]
+        lock = threading.Lock()
+
+        def run():
+            while True:
+                item = inbox.get()
+                if item is CLOSED:
+                    inbox.put(CLOSED)  # wake sibling workers
+                    break
+                self._run(stats, fn, item, outbox, on_error, batch=False)
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and outbox is not None:
+                outbox.put(CLOSED)
+
+        for i in range(remaining[0]):
+            self._start(run, f"{name}-{i}")
+
+    def batch_stage(
+        self,
+        name: str,
+        fn: Callable,
+        inbox: "queue.Queue",
+        outbox: Optional["queue.Queue"] = None,
+        batch_size: int = 256,
+        size: Callable[[Any], int] = lambda item: 1,
+        on_error: Optional[Callable[[Any, Exception], None]] = None,
+    ):
+        """Run ``fn`` on batches drained from ``inbox``, up to ``batch_size`` by ``size``."""
+        stats = self.stats.setdefault(name, StageStats(name))
+
+        def run():
+            closed = False
+            while not closed:
+                item = inbox.get()
+                if item is CLOSED:
+                    break
+                batch, total = [item], max(1, size(item))
+                while total < batch_size:
+                    try:
+                        item = inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is CLOSED:
+                        closed = True
+                        break
+                    batch.append(item)
+                    total += max(1, size(item))
+                self._run(stats, fn, batch, outbox, on_error, batch=True)
+            if outbox is not None:
+                outbox.put(CLOSED)
+
+        self._start(run, name)
+
+    def _start(self, target, name: str):
+        thread = threading.Thread(target=target, name=f"index-{name}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def join(self):
+        """Wait for every stage to drain."""
+        for thread in self._threads:
+            thread.join()
+
+    def stats_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Counters of every stage, in the order the stages were added."""
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
@@ -0,0 +1,258 @@
+"""
+Filesystem event sources for ``local-rag watch``.
+
+:class:`InotifyWatcher` reads Linux inotify events through ``ctypes`` (no
+extra dependency); :class:`PollingWatcher` rescans the tree every few
+seconds and diffs size/mtime snapshots, for other platforms or when the
+inotify watch limit is reached. Both only report paths a
+:class:`~local_rag.ingestion.discover.TreeWalker` would discover, and
+neither watches excluded directories.
+
+Events are :class:`FsEvent` tuples. A directory created or moved into the
+tree is reported once as ``DIR_CHANGED`` (its files may predate the new
+watch), a directory removed or moved out as ``DIR_DELETED``, and a kernel
+queue overflow as ``OVERFLOW``, after which only a rescan is reliable.
+``InotifyWatcher`` also reports ``OVERFLOW`` and sets ``exhausted`` when a
+new directory cannot be watched because the watch limit was reached; the
+caller should switch to polling.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+from .discover import TreeWalker
+
+logger = logging.getLogger(__name__)
+
+CHANGED = "changed"
+DELETED = "deleted"
+DIR_CHANGED = "dir_changed"
+DIR_DELETED = "dir_deleted"
+OVERFLOW = "overflow"
+
+WATCH_BACKENDS = ("auto", "inotify", "poll")
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_EXCL_UNLINK
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class FsEvent(NamedTuple):
+    kind: str
+    path: str
+
+
+class InotifyWatcher:
+    """inotify watches on every directory the walker enters."""
+
+    def __init__(self, walker: TreeWalker):
+        self.walker = walker
+        # Set once a directory could not be watched for lack of watches
+        self.exhausted = False
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self._wds: Dict[int, str] = {}
+        self._paths: Dict[str, int] = {}
+        try:
+            self._add_tree(walker.root, strict=True)
+        except OSError:
+            self.close()
+            raise
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._wds)
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return  # gone already, or unreadable
+            # ENOSPC: fs.inotify.max_user_watches reached
+            raise OSError(err, f"inotify_add_watch {path}: {os.strerror(err)}")
+        self._wds[wd] = path
+        self._paths[path] = wd
+
+    def _add_tree(self, path: str, strict: bool = False) -> bool:
+        """
+        Watch ``path`` and the directories below it.
+
+        Unless ``strict``, errors are handled per directory: a directory
+        that cannot be watched is skipped, and hitting the watch limit
+        (ENOSPC) stops and sets ``exhausted``.
+
+        Returns:
+            False if the watch limit was reached
+        """
+        for dir_path in self.walker.dirs_under(path):
+            try:
+                self._add_watch(dir_path)
+            except OSError as e:
+                if strict:
+                    raise
+                if e.errno == errno.ENOSPC:
+                    logger.warning(f"inotify watch limit reached at {dir_path}; raise fs.inotify.max_user_watches")
+                    self.exhausted = True
+                    return False
+                logger.warning(f"Not watching {dir_path}: {e}")
+        return True
+
+    def _drop_tree(self, path: str):
+        prefix = os.path.join(path, "")
+        for watched in [p for p in self._paths if p == path or p.startswith(prefix)]:
+            wd = self._paths.pop(watched)
+            self._wds.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read(self, timeout: float) -> List[FsEvent]:
+        """Events that arrived within ``timeout`` seconds (may be empty)."""
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+        events: List[FsEvent] = []
+        while True:
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self._parse(data, events)
+        return events
+
+    def _parse(self, data: bytes, events: List[FsEvent]):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append(FsEvent(OVERFLOW, self.walker.root))
+                continue
+            if mask & IN_IGNORED:
+                path = self._wds.pop(wd, None)
+                if path is not None and self._paths.get(path) == wd:
+                    del self._paths[path]
+                continue
+            parent = self._wds.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    if self.walker.enters_dir(path):
+                        if not self._add_tree(path):
+                            # Part of the tree is unwatched: only a rescan catches it
+                            events.append(FsEvent(OVERFLOW, self.walker.root))
+                        events.append(FsEvent(DIR_CHANGED, path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._drop_tree(path)
+                    events.append(FsEvent(DIR_DELETED, path))
+                continue
+            if not self.walker.keeps_file(path):
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append(FsEvent(DELETED, path))
+            else:
+                events.append(FsEvent(CHANGED, path))
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Periodic rescans of the tree, diffed against the previous size/mtime snapshot."""
+
+    def __init__(self, walker: TreeWalker, interval: float = 10.0):
+        self.walker = walker
+        self.interval = max(0.1, interval)
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + self.interval
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.walker.files_under(self.walker.root):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            snapshot[str(path)] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def read(self, timeout: float) -> List[FsEvent]:
+        """Changes found by the next scan, if it is due within ``timeout`` seconds."""
+        wait = self._next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(0.0, timeout))
+            return []
+        time.sleep(max(0.0, wait))
+        self._next_scan = time.monotonic() + self.interval
+
+        previous, self._snapshot = self._snapshot, self._scan()
+        events = [FsEvent(CHANGED, p) for p, sig in self._snapshot.items() if previous.get(p) != sig]
+        events.extend(FsEvent(DELETED, p) for p in previous if p not in self._snapshot)
+        return events
+
+    def close(self):
+        pass
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError(errno.ENOSYS, "libc has no inotify support")
+    return libc
+
+
+def open_watcher(walker: TreeWalker, backend: str = "auto", poll_interval: float = 10.0):
+    """
+    Event source for ``walker``'s tree.
+
+    ``auto`` uses inotify where available and falls back to polling (for
+    example when ``fs.inotify.max_user_watches`` is too low for the tree).
+    """
+    if backend not in WATCH_BACKENDS:
+        raise ValueError(f"Unknown watch backend {backend!r}; expected one of {', '.join(WATCH_BACKENDS)}")
+    if backend != "poll":
+        try:
+            return InotifyWatcher(walker)
+        except OSError as e:
+            if backend == "inotify":
+                raise
+            logger.warning(f"inotify unavailable ({e}); polling every {poll_interval}s instead")
+    return PollingWatcher(walker, poll_interval)
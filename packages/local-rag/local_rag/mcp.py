@@ -32,6 +32,25 @@ logger = logging.getLogger("mcp-server")
 # Initialize Server
 server = Server("local-rag")
 
+# Searchers are reused across calls so their models, BM25 index and query
+# cache stay warm; each one invalidates itself when the index generation moves.
+_searchers: dict[tuple, DocumentSearcher] = {}
+
+
+def _get_searcher(settings, method: str, rerank: bool) -> DocumentSearcher:
+    """Return the cached searcher for (data dir, method, rerank), creating it once."""
+    key = (str(settings.user_data_dir), method, bool(rerank))
+    searcher = _searchers.get(key)
+    if searcher is None:
+        searcher = DocumentSearcher(
+            user_data_dir=str(settings.user_data_dir),
+            search_method=method,
+            use_reranker=rerank
+        )
+        _searchers[key] = searcher
+    return searcher
+
+
 @server.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
@@ -93,6 +112,41 @@ async def list_tools() -> list[Tool]:
                 "required": ["query"]
             }
         ),
+        Tool(
+            name="local_rag_query_batch",
+            description="Run several searches in one call (queries are embedded and retrieved as a batch).",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "queries": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "The search queries"
+                    },
+                    "user_data_dir": {
+                        "type": "string",
+                        "description": "Directory where the index is stored (default: ~/.local-rag-data)"
+                    },
+                    "k": {
+                        "type": "integer",
+                        "description": "Number of results per query (default: 5)",
+                        "default": 5
+                    },
+                    "method": {
+                        "type": "string",
+                        "enum": ["hybrid", "vector", "bm25"],
+                        "description": "Search method (default: hybrid)",
+                        "default": "hybrid"
+                    },
+                    "rerank": {
+                        "type": "boolean",
+                        "description": "Enable cross-encoder reranking for better precision (slower)",
+                        "default": False
+                    }
+                },
+                "required": ["queries"]
+            }
+        ),
         Tool(
             name="local_rag_stats",
             description="Get statistics about the current index.",
@@ -140,20 +194,24 @@ async def call_tool(
             if not path:
                 raise ValueError("Path is required")
 
-            indexer = DocumentIndexer(
-                settings=settings
-            )
-            
             source_path = Path(path)
             if not source_path.exists():
                 return [TextContent(type="text", text=f"Error: Path {path} does not exist")]
 
-            if source_path.is_file():
-                count, dropped = indexer.index_file(source_path)
-                return [TextContent(type="text", text=f"Indexed file: {path} ({count} chunks, dropped {dropped})")]
-            else:
-                stats = indexer.index_directory(source_path, force=force)
-                return [TextContent(type="text", text=json.dumps(stats, indent=2))]
+            # Raises IndexLockedError while another writer (e.g. the watch daemon) runs
+            indexer = DocumentIndexer(
+                settings=settings
+            )
+            try:
+                if source_path.is_file():
+                    count, dropped = indexer.index_file(source_path)
+                    indexer.commit()
+                    return [TextContent(type="text", text=f"Indexed file: {path} ({count} chunks, dropped {dropped})")]
+                else:
+                    stats = indexer.index_directory(source_path, force=force)
+                    return [TextContent(type="text", text=json.dumps(stats, indent=2))]
+            finally:
+                indexer.close()
 
         elif name == "local_rag_query":
             query = arguments.get("query")
@@ -161,11 +219,7 @@ async def call_tool(
             method = arguments.get("method", settings.search_method)
             rerank = arguments.get("rerank", settings.use_reranker)
 
-            searcher = DocumentSearcher(
-                settings=settings,
-                search_method=method,
-                use_reranker=rerank
-            )
+            searcher = _get_searcher(settings, method, rerank)
 
             results = searcher.search(query, k=k)
             
@@ -181,8 +235,32 @@ async def call_tool(
             response_text = f"Found {len(results)} results for '{query}':\n\n" + "\n---\n".join(formatted_results)
             return [TextContent(type="text", text=response_text)]
 
+        elif name == "local_rag_query_batch":
+            queries = arguments.get("queries") or []
+            k = arguments.get("k", 5)
+            method = arguments.get("method", settings.search_method)
+            rerank = arguments.get("rerank", settings.use_reranker)
+
+            if not queries:
+                raise ValueError("At least one query is required")
+
+            searcher = _get_searcher(settings, method, rerank)
+            batch = searcher.search_many(queries, k=k)
+
+            output = [
+                {
+                    "query": query,
+                    "results": [
+                        {"path": r["path"], "filename": r["filename"], "score": r["score"], "preview": r["preview"]}
+                        for r in results
+                    ],
+                }
+                for query, results in zip(queries, batch)
+            ]
+            return [TextContent(type="text", text=json.dumps(output, indent=2))]
+
         elif name == "local_rag_stats":
-            searcher = DocumentSearcher(user_data_dir=user_data_dir)
+            searcher = _get_searcher(settings, settings.search_method, settings.use_reranker)
             stats = searcher.get_stats()
             return [TextContent(type="text", text=json.dumps(stats, indent=2))]
         elif name == "local_rag_health":
@@ -1,3 +1,10 @@
 """Search module exports."""
 
 from .hybrid import *  # noqa: F401,F403
+from .bm25_segments import (  # noqa: F401
+    SegmentedBM25Index,
+    load_bm25_index,
+    migrate_bm25_json,
+    upgrade_bm25_index,
+)
+from .cache import LRUCache, QueryEmbeddingCache, normalize_query  # noqa: F401
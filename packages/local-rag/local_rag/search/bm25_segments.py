@@ -0,0 +1,539 @@
+"""
+Segmented (log-structured) BM25 index.
+
+On disk the index is a directory of immutable segments plus a manifest::
+
+    bm25/
+        segments.json   format/version, BM25 parameters, ordered segment list
+        seg_000001/     binary segment (see bm25_storage)
+        seg_000002/
+        ...
+
+New and re-indexed documents go into a small in-memory segment that
+``save()`` flushes as a new segment. Removing a document flips its bit in
+the deletion bitmap of whichever segment holds it; only that segment's
+``tombstones.bin`` is rewritten. An indexing run that touches a few files
+therefore writes one small segment and a few bitmaps instead of the whole
+index.
+
+Searches score every segment with corpus-wide statistics (N, document
+frequencies and average length summed over all segments) and merge the
+per-segment top k, so results match a single ``BM25Index`` holding the same
+documents in the same order.
+
+A tiered merge policy keeps the segment count logarithmic in corpus size:
+whenever ``merge_factor`` adjacent segments fall into the same size tier
+they are merged, dropping tombstoned slots, into one segment of the next
+tier. Segments whose tombstone ratio passes ``compaction_threshold`` are
+rewritten on their own.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .bm25_storage import is_index_dir, pack_arrays, write_index_dir
+from .hybrid import BM25Index, bm25_idf, bm25_length_norms
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS_FORMAT = "local-rag-bm25-segments"
+SEGMENTS_VERSION = 1
+
+MANIFEST_FILE = "segments.json"
+
+
+def is_segmented_dir(path: Path) -> bool:
+    """Return True if ``path`` holds a segmented BM25 index."""
+    return (Path(path) / MANIFEST_FILE).is_file()
+
+
+class SegmentedBM25Index:
+    """
+    BM25 index made of immutable on-disk segments and one in-memory segment.
+
+    Exposes the same read/write API as ``BM25Index`` (add/remove/search/
+    get_document/doc_count), so indexers and searchers can use either.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        k1: float = 1.5,
+        b: float = 0.75,
+        compaction_threshold: float = 0.25,
+        merge_factor: int = 10,
+        store_texts: bool = True,
+    ):
+        """
+        Initialize an empty segmented index rooted at ``directory``.
+
+        Args:
+            directory: Index directory (created on first save)
+            k1: Term frequency saturation parameter
+            b: Document length normalization
+            compaction_threshold: Tombstone ratio that triggers a segment rewrite
+            merge_factor: Number of same-tier segments merged together
+            store_texts: Keep a copy of each document's text in the index
+        """
+        self.directory = Path(directory)
+        self.k1 = k1
+        self.b = b
+        self.compaction_threshold = compaction_threshold
+        self.merge_factor = max(2, merge_factor)
+        self.store_texts = store_texts
+
+        # Sealed segments in insertion order, and their directory names
+        self.segments: List[BM25Index] = []
+        self.segment_names: List[str] = []
+        self._next_segment = 1
+        # Sealed segments with tombstones not yet written
+        self._dirty: Set[str] = set()
+
+        self.memtable = self._new_memtable()
+
+    def _new_memtable(self) -> BM25Index:
+        return BM25Index(
+            k1=self.k1,
+            b=self.b,
+            compaction_threshold=self.compaction_threshold,
+            store_texts=self.store_texts,
+        )
+
+    def _all_segments(self) -> List[BM25Index]:
+        return self.segments + [self.memtable]
+
+    @property
+    def doc_count(self) -> int:
+        """Number of live documents across all segments."""
+        return sum(segment.doc_count for segment in self._all_segments())
+
+    @property
+    def tombstone_count(self) -> int:
+        """Removed documents whose slots have not been reclaimed yet."""
+        return sum(segment.tombstone_count for segment in self._all_segments())
+
+    @property
+    def num_slots(self) -> int:
+        """Slots across all segments, tombstoned included."""
+        return sum(len(segment.slot_ids) for segment in self._all_segments())
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Average token count per live document across all segments."""
+        doc_count = self.doc_count
+        if not doc_count:
+            return 0.0
+        return sum(segment.live_length for segment in self._all_segments()) / doc_count
+
+    @property
+    def doc_ids(self) -> List[str]:
+        """Identifiers of live documents, in insertion order."""
+        return [doc_id for segment in self._all_segments() for doc_id in segment.doc_ids]
+
+    def __contains__(self, doc_id: str) -> bool:
+        return any(doc_id in segment for segment in self._all_segments())
+
+    def tokenize(self, text: str) -> List[str]:
+        """Tokenize text into terms."""
+        return self.memtable.tokenize(text)
+
+    def add_documents(self, doc_ids: List[str], texts: List[str]):
+        """
+        Add documents to the in-memory segment.
+
+        Re-adding an existing doc_id replaces the previous version.
+        """
+        for doc_id in doc_ids:
+            self._remove_sealed(doc_id)
+        self.memtable.add_documents(doc_ids, texts)
+
+    def remove_document(self, doc_id: str):
+        """Tombstone a document in whichever segment holds it."""
+        if doc_id in self.memtable:
+            self.memtable.remove_document(doc_id)
+        else:
+            self._remove_sealed(doc_id)
+
+    def _remove_sealed(self, doc_id: str) -> bool:
+        for name, segment in zip(self.segment_names, self.segments):
+            if doc_id in segment:
+                segment.remove_document(doc_id)
+                self._dirty.add(name)
+                return True
+        return False
+
+    def doc_ids_with_prefix(self, prefix: str) -> List[str]:
+        """Return live document IDs starting with ``prefix``."""
+        return [
+            doc_id
+            for segment in self._all_segments()
+            for doc_id in segment.doc_ids_with_prefix(prefix)
+        ]
+
+    def memory_report(self) -> Dict[str, int]:
+        """``BM25Index.memory_report`` summed over all segments."""
+        report: Dict[str, int] = {}
+        for segment in self._all_segments():
+            for key, value in segment.memory_report().items():
+                report[key] = report.get(key, 0) + value
+        return report
+
+    def drop_texts(self):
+        """Switch to statistics-only mode; segments are rewritten on save."""
+        if not self.store_texts:
+            return
+        self.store_texts = False
+        self.memtable.drop_texts()
+        for segment in self.segments:
+            segment.store_texts = False
+
+    def search(self, query: str, k: int = 10, prune: bool = False) -> List[Tuple[str, float]]:
+        """
+        Search all segments using BM25 scoring.
+
+        Returns:
+            List of (doc_id, score) tuples sorted by score descending
+            (ties broken by insertion order)
+        """
+        query_tokens = self.tokenize(query)
+        if not query_tokens or not self.doc_count or k <= 0:
+            return []
+
+        segments = self._all_segments()
+        doc_count = self.doc_count
+        idfs = {
+            token: bm25_idf(doc_count, sum(segment.doc_freq(token) for segment in segments))
+            for token in set(query_tokens)
+        }
+        avg_doc_length = self.avg_doc_length
+
+        hits = []
+        for order, segment in enumerate(segments):
+            if not segment.doc_count:
+                continue
+            top = segment._search_tokens(query_tokens, k, prune, idfs, avg_doc_length)
+            # Within a segment ties are already in slot order
+            hits.extend((-score, order, rank, doc_id) for rank, (doc_id, score) in enumerate(top))
+
+        hits.sort()
+        return [(doc_id, -neg_score) for neg_score, _, _, doc_id in hits[:k]]
+
+    def get_document(self, doc_id: str) -> Optional[str]:
+        """Get document text by ID (None if unknown or texts are not stored)."""
+        for segment in self._all_segments():
+            if doc_id in segment:
+                return segment.get_document(doc_id)
+        return None
+
+    def save(self):
+        """Flush the in-memory segment, write deletions and apply the merge policy."""
+        self._save(merge_all=False)
+
+    def compact(self) -> int:
+        """
+        Merge every segment into one, dropping all tombstoned slots.
+
+        Returns:
+            Number of slots reclaimed
+        """
+        reclaimed = self.tombstone_count
+        self._save(merge_all=True)
+        return reclaimed
+
+    def _save(self, merge_all: bool):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        obsolete: List[str] = []
+
+        memtable = self.memtable
+        memtable.compact()  # slots replaced before they were ever written
+        if memtable.slot_ids:
+            name = self._allocate_name()
+            memtable.save(str(self.directory / name))
+            self._append_segment(name)
+        self.memtable = self._new_memtable()
+
+        if merge_all:
+            if len(self.segments) > 1 or self.tombstone_count:
+                obsolete += self._merge_range(0, len(self.segments))
+        else:
+            obsolete += self._apply_merge_policy()
+
+        # Surviving segments only need their deletion bitmap rewritten
+        for name, segment in zip(self.segment_names, self.segments):
+            if name in self._dirty:
+                segment._save_binary(self.directory / name)
+        self._dirty.clear()
+
+        self._write_manifest()
+        for name in obsolete:
+            shutil.rmtree(self.directory / name, ignore_errors=True)
+
+    def _apply_merge_policy(self) -> List[str]:
+        """Rewrite tombstone-heavy segments, then merge same-tier runs."""
+        obsolete: List[str] = []
+
+        i = 0
+        while i < len(self.segments):
+            segment = self.segments[i]
+            stale = segment.tombstone_count and segment.tombstone_ratio >= self.compaction_threshold
+            if stale or self._stores_texts_on_disk(segment) != self.store_texts:
+                before = len(self.segments)
+                obsolete += self._merge_range(i, i + 1)
+                if len(self.segments) < before:
+                    continue  # nothing survived; the next segment moved into slot i
+            i += 1
+
+        while True:
+            run = self._find_merge_run()
+            if run is None:
+                break
+            obsolete += self._merge_range(*run)
+        return obsolete
+
+    def _tier(self, segment: BM25Index) -> int:
+        return int(math.log(max(segment.doc_count, 1), self.merge_factor))
+
+    def _find_merge_run(self) -> Optional[Tuple[int, int]]:
+        """First run of ``merge_factor`` adjacent segments in the same tier."""
+        tiers = [self._tier(segment) for segment in self.segments]
+        width = self.merge_factor
+        for start in range(len(tiers) - width + 1):
+            if len(set(tiers[start:start + width])) == 1:
+                return start, start + width
+        return None
+
+    def _merge_range(self, start: int, end: int) -> List[str]:
+        """
+        Replace segments[start:end] with one merged segment.
+
+        Returns the names of the replaced segment directories, which are
+        deleted once the new manifest is in place.
+        """
+        sources = self.segments[start:end]
+        replaced = self.segment_names[start:end]
+
+        name = self._allocate_name()
+        live = self._merge_segments(sources, self.directory / name)
+        if live:
+            merged = self._open_segment(name)
+            self.segments[start:end] = [merged]
+            self.segment_names[start:end] = [name]
+        else:
+            shutil.rmtree(self.directory / name, ignore_errors=True)
+            del self.segments[start:end]
+            del self.segment_names[start:end]
+
+        logger.debug(f"Merged BM25 segments {replaced} -> {name} ({live} documents)")
+        return replaced
+
+    def _merge_segments(self, sources: List[BM25Index], directory: Path) -> int:
+        """Write the live documents of ``sources`` as one segment; returns its size."""
+        doc_ids: List[str] = []
+        texts: List[str] = []
+        lengths: List[np.ndarray] = []
+        remaps: List[np.ndarray] = []
+
+        for segment in sources:
+            live = segment.live_slots()
+            remap = np.full(len(segment.slot_ids), -1, dtype=np.int64)
+            remap[live] = np.arange(len(doc_ids), len(doc_ids) + len(live))
+            remaps.append(remap)
+
+            slot_list = live.tolist()
+            doc_ids.extend(segment.slot_ids[slot] for slot in slot_list)
+            if self.store_texts:
+                texts.extend(segment.doc_texts[slot] for slot in slot_list)
+            lengths.append(np.asarray(segment.doc_lengths, dtype=np.int32)[live])
+
+        if not doc_ids:
+            return 0
+
+        # term -> per-source (slots, tfs) chunks; sources are in slot order
+        chunks: Dict[str, List[Tuple[np.ndarray, np.ndarray]]] = {}
+        for segment, remap in zip(sources, remaps):
+            for term, docs, tfs in segment.iter_postings():
+                new_docs = remap[docs]
+                keep = new_docs >= 0
+                if keep.any():
+                    chunks.setdefault(term, []).append((new_docs[keep], np.asarray(tfs)[keep]))
+
+        terms = sorted(chunks)
+        postings_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        postings_docs = np.zeros(0, dtype=np.int32)
+        postings_tfs = np.zeros(0, dtype=np.int32)
+        if terms:
+            np.cumsum([sum(len(d) for d, _ in chunks[term]) for term in terms], out=postings_offsets[1:])
+            postings_docs = np.concatenate([d for term in terms for d, _ in chunks[term]]).astype(np.int32)
+            postings_tfs = np.concatenate([t for term in terms for _, t in chunks[term]]).astype(np.int32)
+
+        doc_lengths = np.concatenate(lengths)
+        avg_doc_length = int(doc_lengths.sum()) / len(doc_ids)
+        arrays = pack_arrays(
+            terms, postings_offsets, postings_docs, postings_tfs,
+            doc_ids, texts, doc_lengths, bytearray(len(doc_ids)),
+            bm25_length_norms(doc_lengths, self.k1, self.b, avg_doc_length), self.k1,
+        )
+        meta = {
+            'k1': self.k1,
+            'b': self.b,
+            'avg_doc_length': avg_doc_length,
+            'max_scores_avg_doc_length': avg_doc_length,
+            'doc_count': len(doc_ids),
+            'store_texts': self.store_texts,
+        }
+        write_index_dir(directory, meta, arrays)
+        return len(doc_ids)
+
+    @staticmethod
+    def _stores_texts_on_disk(segment: BM25Index) -> bool:
+        mapped = segment._mapped
+        if mapped is None:
+            return segment.store_texts
+        return mapped.meta.get('store_texts', True)
+
+    def _allocate_name(self) -> str:
+        name = f"seg_{self._next_segment:06d}"
+        self._next_segment += 1
+        return name
+
+    def _open_segment(self, name: str) -> BM25Index:
+        segment = BM25Index.load(str(self.directory / name))
+        segment.compaction_threshold = self.compaction_threshold
+        if not self.store_texts:
+            segment.store_texts = False
+        return segment
+
+    def _append_segment(self, name: str):
+        self.segments.append(self._open_segment(name))
+        self.segment_names.append(name)
+
+    def _write_manifest(self):
+        manifest = {
+            'format': SEGMENTS_FORMAT,
+            'version': SEGMENTS_VERSION,
+            'k1': self.k1,
+            'b': self.b,
+            'store_texts': self.store_texts,
+            'next_segment': self._next_segment,
+            'segments': self.segment_names,
+        }
+        tmp_path = self.directory / f"{MANIFEST_FILE}.tmp"
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, self.directory / MANIFEST_FILE)
+
+    @classmethod
+    def load(cls, directory: Path, **kwargs) -> 'SegmentedBM25Index':
+        """Open a segmented index directory; segments are memory-mapped."""
+        directory = Path(directory)
+        manifest = json.loads((directory / MANIFEST_FILE).read_text())
+        if manifest.get('format') != SEGMENTS_FORMAT:
+            raise ValueError(f"Not a segmented BM25 index: {directory}")
+        if manifest.get('version', 0) > SEGMENTS_VERSION:
+            raise ValueError(
+                f"Unsupported BM25 segments version {manifest.get('version')} "
+                f"(supported: {SEGMENTS_VERSION})"
+            )
+
+        index = cls(
+            directory,
+            k1=manifest['k1'],
+            b=manifest['b'],
+            store_texts=manifest.get('store_texts', True),
+            **kwargs,
+        )
+        index._next_segment = manifest['next_segment']
+        for name in manifest['segments']:
+            index._append_segment(name)
+        return index
+
+    @classmethod
+    def from_index(cls, index: BM25Index, directory: Path) -> 'SegmentedBM25Index':
+        """Write a standalone ``BM25Index`` as the first segment of a new directory."""
+        segmented = cls(directory, k1=index.k1, b=index.b, store_texts=index.store_texts)
+        segmented.memtable = index
+        segmented.save()
+        return segmented
+
+
+def _adopt_single_segment(index_dir: Path) -> SegmentedBM25Index:
+    """Move a pre-segments binary index directory into a one-segment layout."""
+    staging = index_dir.with_name(f".{index_dir.name}.adopt")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.replace(index_dir, staging)
+    index_dir.mkdir()
+    os.replace(staging, index_dir / "seg_000001")
+
+    meta = json.loads((index_dir / "seg_000001" / "meta.json").read_text())
+    segmented = SegmentedBM25Index(
+        index_dir, k1=meta['k1'], b=meta['b'], store_texts=meta.get('store_texts', True)
+    )
+    segmented._next_segment = 2
+    segmented._append_segment("seg_000001")
+    segmented._write_manifest()
+    return segmented
+
+
+def migrate_bm25_json(json_path: Path, index_dir: Path, remove_source: bool = True) -> SegmentedBM25Index:
+    """
+    One-shot migration of a legacy ``bm25_index.json`` to the segmented format.
+
+    The JSON file is removed once the new index has been written.
+    """
+    index = BM25Index.load(str(json_path))
+    index.maybe_compact()
+    SegmentedBM25Index.from_index(index, Path(index_dir))
+    if remove_source:
+        Path(json_path).unlink()
+    logger.info(f"Migrated BM25 index {json_path} -> {index_dir}")
+    return SegmentedBM25Index.load(Path(index_dir))
+
+
+def load_bm25_index(
+    index_dir: Path, legacy_json_path: Optional[Path] = None
+) -> Optional[Union[SegmentedBM25Index, BM25Index]]:
+    """
+    Open the BM25 index for searching without changing anything on disk.
+
+    Older layouts (a single binary index directory, a legacy JSON file) are
+    opened as a plain ``BM25Index``; converting them is left to the indexer
+    (:func:`upgrade_bm25_index`), so a search process never races a writer.
+
+    Returns:
+        The index, or None if no index exists on disk
+    """
+    index_dir = Path(index_dir)
+    if is_segmented_dir(index_dir):
+        return SegmentedBM25Index.load(index_dir)
+    if is_index_dir(index_dir):
+        return BM25Index.load(str(index_dir))
+    if legacy_json_path is not None and Path(legacy_json_path).exists():
+        return BM25Index.load(str(legacy_json_path))
+    return None
+
+
+def upgrade_bm25_index(index_dir: Path, legacy_json_path: Optional[Path] = None) -> Optional[SegmentedBM25Index]:
+    """
+    Open the BM25 index for writing, migrating older layouts to segments first.
+
+    Only the indexer (the single writer) should call this.
+
+    Returns:
+        The index, or None if no index exists on disk
+    """
+    index_dir = Path(index_dir)
+    if is_segmented_dir(index_dir):
+        return SegmentedBM25Index.load(index_dir)
+    if is_index_dir(index_dir):
+        return _adopt_single_segment(index_dir)
+    if legacy_json_path is not None and Path(legacy_json_path).exists():
+        return migrate_bm25_json(Path(legacy_json_path), index_dir)
+    return None
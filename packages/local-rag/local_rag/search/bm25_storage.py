@@ -0,0 +1,248 @@
+"""
+Binary on-disk format for the BM25 index.
+
+An index is a directory (format version 1)::
+
+    meta.json             format/version, BM25 parameters, array manifest
+    terms.bin             UTF-8 terms, sorted, concatenated
+    term_offsets.bin      int64[V + 1] byte offsets into terms.bin
+    postings_offsets.bin  int64[V + 1] CSR row offsets into the posting arrays
+    postings_docs.bin     int32[P] slots, ascending within each term
+    postings_tfs.bin      int32[P] term frequencies
+    doc_lengths.bin       int32[N] token counts per slot
+    doc_ids.bin           UTF-8 document ids, offsets in doc_id_offsets.bin
+    texts.bin             UTF-8 document texts, offsets in text_offsets.bin
+                          (empty when meta.json has store_texts: false)
+    tombstones.bin        uint8[N], 1 = removed
+    term_max_scores.bin   float64[V] max tf * (k1 + 1) / (tf + norm) per term,
+                          used as MaxScore upper bounds (optional)
+
+Every array is opened with ``np.memmap``, so loading is O(1) regardless of
+index size and concurrent searcher processes share the same page cache.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_NAME = "local-rag-bm25"
+FORMAT_VERSION = 1
+
+META_FILE = "meta.json"
+
+# name -> dtype for every array file in the directory
+ARRAY_DTYPES: Dict[str, str] = {
+    "terms": "u1",
+    "term_offsets": "<i8",
+    "postings_offsets": "<i8",
+    "postings_docs": "<i4",
+    "postings_tfs": "<i4",
+    "doc_lengths": "<i4",
+    "doc_ids": "u1",
+    "doc_id_offsets": "<i8",
+    "texts": "u1",
+    "text_offsets": "<i8",
+    "tombstones": "u1",
+    "term_max_scores": "<f8",
+}
+
+
+def is_index_dir(path: Path) -> bool:
+    """Return True if ``path`` holds a binary BM25 index."""
+    return (Path(path) / META_FILE).is_file()
+
+
+def encode_strings(strings: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack strings into a UTF-8 blob plus int64 offsets (len + 1 entries)."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+class StringTable(Sequence[str]):
+    """Read-only sequence of strings decoded lazily from a UTF-8 blob."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string table index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _map_array(path: Path, dtype: str, length: int) -> np.ndarray:
+    """
+    Memory-map a raw array file (mmap cannot map empty files).
+
+    Returns a plain ndarray view of the memmap: same pages, without the
+    per-slice overhead of the np.memmap subclass on hot lookup paths.
+    """
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,)).view(np.ndarray)
+
+
+def write_index_dir(directory: Path, meta: dict, arrays: Dict[str, np.ndarray]):
+    """
+    Atomically write an index directory.
+
+    Files are written into a sibling temp directory which then replaces
+    ``directory``. Readers that still map the old files keep working until
+    they reopen the index.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+
+    try:
+        manifest = {}
+        for name, dtype in ARRAY_DTYPES.items():
+            array = np.ascontiguousarray(arrays[name], dtype=dtype)
+            array.tofile(tmp_dir / f"{name}.bin")
+            manifest[name] = {"dtype": dtype, "length": int(array.shape[0])}
+
+        full_meta = dict(meta, format=FORMAT_NAME, version=FORMAT_VERSION, arrays=manifest)
+        (tmp_dir / META_FILE).write_text(json.dumps(full_meta, indent=2))
+
+        old_dir = None
+        if directory.exists():
+            old_dir = directory.with_name(f".{directory.name}.old")
+            shutil.rmtree(old_dir, ignore_errors=True)
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def update_tombstones(directory: Path, tombstones: bytearray, meta_updates: dict):
+    """Rewrite only the tombstone bitmap (and meta) of an existing index."""
+    directory = Path(directory)
+    meta = json.loads((directory / META_FILE).read_text())
+    meta.update(meta_updates)
+    meta["arrays"]["tombstones"]["length"] = len(tombstones)
+
+    tmp_path = directory / "tombstones.bin.tmp"
+    tmp_path.write_bytes(bytes(tombstones))
+    os.replace(tmp_path, directory / "tombstones.bin")
+
+    tmp_meta = directory / f"{META_FILE}.tmp"
+    tmp_meta.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_meta, directory / META_FILE)
+
+
+class MappedIndex:
+    """Read-only, memory-mapped view of a binary index directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / META_FILE).read_text())
+
+        if self.meta.get("format") != FORMAT_NAME:
+            raise ValueError(f"Not a BM25 index directory: {self.directory}")
+        if self.meta.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported BM25 index format version {self.meta.get('version')} "
+                f"(supported: {FORMAT_VERSION})"
+            )
+
+        arrays: Dict[str, np.ndarray] = {}
+        for name, spec in self.meta["arrays"].items():
+            arrays[name] = _map_array(self.directory / f"{name}.bin", spec["dtype"], spec["length"])
+
+        self.terms = StringTable(arrays["terms"], arrays["term_offsets"])
+        self.postings_offsets = arrays["postings_offsets"]
+        self.postings_docs = arrays["postings_docs"]
+        self.postings_tfs = arrays["postings_tfs"]
+        self.doc_lengths = arrays["doc_lengths"]
+        self.doc_ids = StringTable(arrays["doc_ids"], arrays["doc_id_offsets"])
+        self.texts = StringTable(arrays["texts"], arrays["text_offsets"])
+        self.tombstones = arrays["tombstones"]
+        # Written since the MaxScore pruning support; absent in older directories
+        self.term_max_scores: Optional[np.ndarray] = arrays.get("term_max_scores")
+
+        # Query terms repeat heavily; remember recent dictionary lookups
+        self._term_ids: Dict[str, Optional[int]] = {}
+
+    def term_id(self, term: str) -> Optional[int]:
+        """Binary-search the sorted term dictionary."""
+        if term in self._term_ids:
+            return self._term_ids[term]
+        idx = bisect.bisect_left(self.terms, term)
+        found = idx if idx < len(self.terms) and self.terms[idx] == term else None
+        if len(self._term_ids) >= 65536:
+            self._term_ids.clear()
+        self._term_ids[term] = found
+        return found
+
+    def postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (slots, term_freqs) views for a term id."""
+        start = self.postings_offsets[term_id]
+        end = self.postings_offsets[term_id + 1]
+        return self.postings_docs[start:end], self.postings_tfs[start:end]
+
+
+def pack_arrays(
+    terms: List[str],
+    postings_offsets: np.ndarray,
+    postings_docs: np.ndarray,
+    postings_tfs: np.ndarray,
+    doc_ids: Sequence[str],
+    texts: Sequence[str],
+    doc_lengths: Sequence[int],
+    tombstones: bytearray,
+    length_norms: np.ndarray,
+    k1: float,
+) -> Dict[str, np.ndarray]:
+    """Assemble the on-disk arrays from postings already in CSR form."""
+    term_blob, term_offsets = encode_strings(terms)
+
+    term_max_scores = np.zeros(len(terms), dtype=np.float64)
+    if len(postings_docs):
+        tf_scores = (postings_tfs * (k1 + 1)) / (postings_tfs + length_norms[postings_docs])
+        term_max_scores = np.maximum.reduceat(tf_scores, postings_offsets[:-1])
+
+    id_blob, id_offsets = encode_strings(doc_ids)
+    text_blob, text_offsets = encode_strings(texts)
+
+    return {
+        "terms": term_blob,
+        "term_offsets": term_offsets,
+        "postings_offsets": postings_offsets,
+        "postings_docs": postings_docs,
+        "postings_tfs": postings_tfs,
+        "doc_lengths": np.asarray(doc_lengths, dtype=np.int32),
+        "doc_ids": id_blob,
+        "doc_id_offsets": id_offsets,
+        "texts": text_blob,
+        "text_offsets": text_offsets,
+        "tombstones": np.frombuffer(bytes(tombstones), dtype=np.uint8),
+        "term_max_scores": term_max_scores,
+    }
@@ -0,0 +1,224 @@
+"""
+Small in-process caches for the search path.
+
+``LRUCache`` is a bounded, thread-safe mapping with hit/miss counters.
+Cached search results are tied to an *index generation*: a counter kept in
+a tiny file next to the ingest state that the indexer bumps every time it
+commits. Searchers compare the generation they cached against the file
+before serving a hit, so an index written by another process invalidates
+their caches without any extra coordination.
+
+``QueryEmbeddingCache`` memoizes query embeddings, which do not depend on
+the index at all, keyed by (model name, normalized query). It can be
+persisted to a ``.npz`` file so one-shot CLI processes benefit as well.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# Bumped when the key format changes; persisted caches of another version are ignored
+_PERSIST_FORMAT = 2
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query for cache keys (whitespace folded).
+
+    Case is kept: cased embedding models and cross-encoders give different
+    vectors and scores for "US" and "us", so those must not share entries.
+    """
+    return " ".join(query.split())
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache. ``maxsize <= 0`` disables it."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (marking it recently used) or ``default``."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or refresh ``key``, evicting the least recently used entry."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def items(self):
+        """Snapshot of (key, value) pairs, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit-rate counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def read_generation(path: Path) -> int:
+    """Current index generation (0 if nothing has been committed yet)."""
+    try:
+        return int(Path(path).read_text().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump_generation(path: Path) -> int:
+    """Atomically advance the index generation and return the new value."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generation = read_generation(path) + 1
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(str(generation))
+    os.replace(tmp_path, path)
+    return generation
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded cache of normalized query embeddings.
+
+    Vectors are stored as read-only float32 arrays. With ``persist_path``
+    set, the cache is loaded from that file on creation and rewritten
+    (atomically) whenever a new query is embedded.
+    """
+
+    def __init__(self, maxsize: int = 1024, persist_path: Optional[Path] = None):
+        self._cache = LRUCache(maxsize)
+        self.persist_path = Path(persist_path) if persist_path else None
+        if self.persist_path is not None:
+            self._load()
+
+    @staticmethod
+    def _key(model_name: str, query: str) -> str:
+        return f"{model_name}\0{normalize_query(query)}"
+
+    def encode(self, embed_model, model_name: str, query: str) -> np.ndarray:
+        """Return the embedding of ``query``, encoding it only on a miss."""
+        return self.encode_many(embed_model, model_name, [query])[0]
+
+    def encode_many(self, embed_model, model_name: str, queries: List[str]) -> List[np.ndarray]:
+        """Embeddings for ``queries``; all misses are encoded in one batch."""
+        keys = [self._key(model_name, query) for query in queries]
+        vectors = [self._cache.get(key) for key in keys]
+
+        missing: Dict[str, List[int]] = {}
+        for i, (key, vector) in enumerate(zip(keys, vectors)):
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+        if not missing:
+            return vectors
+
+        texts = [queries[positions[0]] for positions in missing.values()]
+        encoded = embed_model.encode(texts, normalize_embeddings=True)
+        for (key, positions), raw in zip(missing.items(), encoded):
+            vector = np.asarray(raw, dtype=np.float32)
+            vector.flags.writeable = False
+            self._cache.put(key, vector)
+            for i in positions:
+                vectors[i] = vector
+
+        if self.persist_path is not None:
+            self.save()
+        return vectors
+
+    def _load(self):
+        try:
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                if int(data["format"]) != _PERSIST_FORMAT:
+                    return
+                keys, vectors = data["keys"], data["vectors"]
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return
+        for key, vector in zip(keys.tolist(), vectors):
+            vector = np.array(vector, dtype=np.float32)
+            vector.flags.writeable = False
+            self._cache.put(key, vector)
+
+    def save(self):
+        """Write the cache to ``persist_path`` (no-op when not persistent)."""
+        if self.persist_path is None:
+            return
+        entries = self._cache.items()
+        if not entries:
+            return
+        keys = np.array([key for key, _ in entries])
+        dims = {vector.shape for _, vector in entries}
+        if len(dims) != 1:
+            # Several models with different dimensions: keep the newest one's
+            shape = entries[-1][1].shape
+            entries = [(k, v) for k, v in entries if v.shape == shape]
+            keys = np.array([key for key, _ in entries])
+        vectors = np.stack([vector for _, vector in entries])
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_name(f".{self.persist_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, format=_PERSIST_FORMAT, keys=keys, vectors=vectors)
+        os.replace(tmp_path, self.persist_path)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit-rate counters."""
+        return dict(self._cache.stats(), persistent=self.persist_path is not None)
+
+
+_embedding_caches: Dict[Tuple[int, Optional[str]], QueryEmbeddingCache] = {}
+_embedding_caches_lock = threading.Lock()
+
+
+def get_query_embedding_cache(
+    maxsize: int = 1024, persist_path: Optional[Path] = None
+) -> QueryEmbeddingCache:
+    """Process-wide embedding cache, shared by every searcher with the same settings."""
+    key = (maxsize, str(persist_path) if persist_path else None)
+    with _embedding_caches_lock:
+        cache = _embedding_caches.get(key)
+        if cache is None:
+            cache = QueryEmbeddingCache(maxsize, persist_path)
+            _embedding_caches[key] = cache
+        return cache
@@ -10,12 +10,73 @@ Combines multiple retrieval methods:
 Supports configurable fusion strategies and reranking.
 """
 
+import hashlib
 import json
+import logging
 import math
+import os
 import re
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..adapters.embeddings import ModelBackend
+from .bm25_storage import (
+    MappedIndex,
+    is_index_dir,
+    pack_arrays,
+    update_tombstones,
+    write_index_dir,
+)
+from .cache import LRUCache, QueryEmbeddingCache, normalize_query
+
+logger = logging.getLogger(__name__)
+
+# In-memory postings: one array('I') per term of interleaved (slot, tf) pairs
+POSTING_TYPECODE = 'I'
+POSTING_DTYPE = np.uintc  # matches the C unsigned int behind 'I'
+
+# MaxScore pruning is only attempted when the posting lists it may skip hold at
+# least 1/PRUNE_MIN_SKIP_RATIO as many entries as there are slots; below that
+# the exhaustive scatter is faster (see _dev/benchmarks/bench_bm25_scoring.py)
+PRUNE_MIN_SKIP_RATIO = 16
+
+
+def bm25_idf(num_docs: int, df: int) -> float:
+    """BM25 inverse document frequency (always positive)."""
+    return math.log((num_docs - df + 0.5) / (df + 0.5) + 1)
+
+
+def bm25_length_norms(doc_lengths, k1: float, b: float, avg_doc_length: float) -> np.ndarray:
+    """Per-document length normalization k1 * (1 - b + b * dl / avgdl)."""
+    lengths = np.asarray(doc_lengths, dtype=np.float64)
+    return k1 * ((1 - b) + b * lengths / (avg_doc_length or 1.0))
+
+
+def _pack_postings(docs: np.ndarray, tfs: np.ndarray) -> array:
+    """Interleave slot and term-frequency arrays into one array('I')."""
+    pairs = np.empty(2 * len(docs), dtype=POSTING_DTYPE)
+    pairs[0::2] = docs
+    pairs[1::2] = tfs
+    packed = array(POSTING_TYPECODE)
+    packed.frombytes(pairs.tobytes())
+    return packed
+
+
+def _unpack_postings(packed: array) -> Tuple[np.ndarray, np.ndarray]:
+    """(slots, term_freqs) copies of an interleaved array('I')."""
+    pairs = np.frombuffer(packed, dtype=POSTING_DTYPE)
+    # Copies, so no buffer export pins the array against later appends
+    return pairs[0::2].copy(), pairs[1::2].copy()
 
 
 class SearchMethod(str, Enum):
@@ -52,6 +113,32 @@ class SearchConfig:
     rrf_k: int = 60  # RRF parameter
     use_reranker: bool = False
     reranker_top_k: int = 20
+    # Use MaxScore-pruned BM25 retrieval when fetching at most this many hits (0 = never)
+    bm25_prune_max_k: int = 30
+    # Run the vector and BM25 branches of a hybrid search concurrently
+    parallel_retrieval: bool = True
+    # Seconds to wait for each branch before answering from the other one (0 = no limit)
+    branch_timeout: float = 0.0
+    # Cross-encoder pairs per predict() call; pairs are sorted by length first
+    rerank_batch_size: int = 16
+    # Skip reranking when the fused top-1 leads top-2 by at least this fraction (0 = never)
+    rerank_skip_margin: float = 0.0
+
+
+_retrieval_pool: Optional[ThreadPoolExecutor] = None
+_retrieval_pool_lock = threading.Lock()
+
+
+def _get_retrieval_pool() -> ThreadPoolExecutor:
+    """Small process-wide pool shared by every HybridSearcher."""
+    global _retrieval_pool
+    with _retrieval_pool_lock:
+        if _retrieval_pool is None:
+            _retrieval_pool = ThreadPoolExecutor(
+                max_workers=min(8, (os.cpu_count() or 2) * 2),
+                thread_name_prefix="local-rag-retrieval",
+            )
+        return _retrieval_pool
 
 
 class BM25Index:
@@ -59,35 +146,293 @@ class BM25Index:
     BM25 sparse retrieval index.
 
     Implements Okapi BM25 scoring for keyword-based retrieval.
+
+    Every added document occupies a slot. Removing a document only flips its
+    tombstone bit, so removal is O(1); searches skip tombstoned slots and a
+    compaction pass reclaims them once the tombstone ratio passes
+    ``compaction_threshold``. Corpus statistics (N, document frequencies,
+    average length) count live documents only, so an updated index scores
+    exactly like a fresh build of the same documents.
+
+    An index loaded from the binary format is served straight from
+    memory-mapped arrays and is only materialized into Python structures
+    when it is modified (see ``bm25_storage``).
+
+    With ``store_texts=False`` the index keeps term statistics only; chunk
+    text lives in the vector store and ``get_document`` returns None.
     """
 
-    def __init__(self, k1: float = 1.5, b: float = 0.75):
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        compaction_threshold: float = 0.25,
+        store_texts: bool = True,
+    ):
         """
         Initialize BM25 index.
 
         Args:
             k1: Term frequency saturation parameter (1.2-2.0 typical)
             b: Document length normalization (0.75 typical)
+            compaction_threshold: Tombstone ratio that triggers compaction on save
+            store_texts: Keep a copy of each document's text in the index
         """
         self.k1 = k1
         self.b = b
+        self.compaction_threshold = compaction_threshold
+        self.store_texts = store_texts
 
-        # Index structures
-        self.doc_ids: List[str] = []
-        self.doc_texts: List[str] = []
-        self.doc_lengths: List[int] = []
+        # Index structures (one entry per slot, including tombstoned slots)
+        self.slot_ids: Sequence[str] = []
+        self.doc_texts: Sequence[str] = []  # empty unless store_texts
+        self.doc_lengths: Sequence[int] = []
         self.avg_doc_length: float = 0.0
-        self.doc_count: int = 0
-
-        # Inverted index: term -> [(doc_idx, term_freq), ...]
-        self.inverted_index: Dict[str, List[Tuple[int, int]]] = {}
-        # Document frequencies: term -> num_docs_containing_term
-        self.doc_freqs: Dict[str, int] = {}
+        # Running sums of doc_lengths over every slot and over tombstoned
+        # slots (None until computed for a loaded index)
+        self._total_length: Optional[int] = 0
+        self._dead_length: Optional[int] = 0
+        self.doc_count: int = 0  # live documents only
+
+        # doc_id -> slot, live documents only (built lazily for mapped indexes)
+        self._slots: Optional[Dict[str, int]] = {}
+        # One byte per slot, 1 = removed
+        self._tombstones = bytearray()
+        self.tombstone_count: int = 0
+
+        # Interned vocabulary: term -> term id, and term id -> term
+        self.term_ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+        # Postings per term id: array('I') of interleaved (slot, term_freq)
+        # pairs, slots ascending. Document frequency is half its length.
+        self._postings: List[array] = []
+
+        # Read-only binary backing store, set by load() on an index directory
+        self._mapped: Optional[MappedIndex] = None
+        # Per-slot length normalization k1 * (1 - b + b * dl / avgdl), and the
+        # avgdl it was computed for (segments are scored with corpus-wide stats)
+        self._length_norms: Optional[np.ndarray] = None
+        self._norms_avg: Optional[float] = None
+        # term -> max over its postings of tf * (k1 + 1) / (tf + norm), for pruning
+        self._max_tf_scores: Dict[str, float] = {}
 
         # Tokenization
         self._tokenize_pattern = re.compile(r'\b\w+\b')
         self._stopwords = self._get_stopwords()
 
+    @property
+    def slots(self) -> Dict[str, int]:
+        """doc_id -> slot map for live documents."""
+        if self._slots is None:
+            self._slots = {
+                doc_id: slot for slot, doc_id in enumerate(self.slot_ids)
+                if not self._tombstones[slot]
+            }
+        return self._slots
+
+    @property
+    def doc_ids(self) -> List[str]:
+        """Identifiers of live (non-removed) documents, in slot order."""
+        return [
+            doc_id for slot, doc_id in enumerate(self.slot_ids)
+            if not self._tombstones[slot]
+        ]
+
+    @property
+    def tombstone_ratio(self) -> float:
+        """Fraction of slots occupied by removed documents."""
+        if not self.slot_ids:
+            return 0.0
+        return self.tombstone_count / len(self.slot_ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.slots
+
+    def _ensure_mutable(self):
+        """Materialize a memory-mapped index into mutable Python structures."""
+        mapped = self._mapped
+        if mapped is None:
+            return
+
+        self.slots  # build the id map before the mapped tables go away
+        self.slot_ids = list(mapped.doc_ids)
+        self.doc_texts = list(mapped.texts)
+        self.doc_lengths = mapped.doc_lengths.tolist()
+        self.terms = list(mapped.terms)
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self._postings = [
+            _pack_postings(*mapped.postings(term_id)) for term_id in range(len(self.terms))
+        ]
+        self._mapped = None
+
+    def _term_postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Return (slots, term_freqs) arrays for a term, or None if unseen."""
+        if self._mapped is None:
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                return None
+            return _unpack_postings(self._postings[term_id])
+        term_id = self._mapped.term_id(term)
+        if term_id is None:
+            return None
+        return self._mapped.postings(term_id)
+
+    def doc_freq(self, term: str) -> int:
+        """Number of live documents containing ``term``."""
+        if self.tombstone_count:
+            postings = self._term_postings(term)
+            if postings is None:
+                return 0
+            dead = np.frombuffer(self._tombstones, dtype=np.uint8)[postings[0]]
+            return len(dead) - int(np.count_nonzero(dead))
+        if self._mapped is None:
+            term_id = self.term_ids.get(term)
+            return 0 if term_id is None else len(self._postings[term_id]) // 2
+        term_id = self._mapped.term_id(term)
+        if term_id is None:
+            return 0
+        offsets = self._mapped.postings_offsets
+        return int(offsets[term_id + 1] - offsets[term_id])
+
+    def iter_postings(self) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+        """Yield (term, slots, term_freqs) for every term, in no particular order."""
+        if self._mapped is None:
+            for term, postings in zip(self.terms, self._postings):
+                yield (term, *_unpack_postings(postings))
+            return
+        for term_id, term in enumerate(self._mapped.terms):
+            yield (term, *self._mapped.postings(term_id))
+
+    @property
+    def inverted_index(self) -> Dict[str, List[Tuple[int, int]]]:
+        """term -> [(slot, term_freq), ...], materialized for inspection."""
+        return {
+            term: list(zip(docs.tolist(), tfs.tolist()))
+            for term, docs, tfs in self.iter_postings()
+        }
+
+    @property
+    def doc_freqs(self) -> Dict[str, int]:
+        """term -> number of slots (tombstoned included) containing it, from posting lengths."""
+        return {term: len(docs) for term, docs, _ in self.iter_postings()}
+
+    def memory_report(self) -> Dict[str, int]:
+        """
+        Approximate heap footprint of the index structures, in bytes.
+
+        ``legacy_postings`` estimates what the same postings cost in the
+        previous layout (a term-keyed dict of lists of (slot, tf) tuples plus
+        a term-keyed doc_freqs dict) for comparison with ``postings`` +
+        ``vocabulary``. A memory-mapped index reports its file-backed arrays
+        under ``mapped`` instead; those live in the page cache.
+        """
+        def strings(values) -> int:
+            return sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+
+        report = {
+            'doc_ids': 0,
+            'texts': 0,
+            'doc_lengths': 0,
+            'vocabulary': 0,
+            'postings': 0,
+            'mapped': 0,
+        }
+        num_postings = 0
+        if self._mapped is None:
+            report['doc_ids'] = strings(self.slot_ids)
+            report['texts'] = strings(self.doc_texts)
+            report['doc_lengths'] = sys.getsizeof(self.doc_lengths) + 28 * len(self.doc_lengths)
+            report['vocabulary'] = sys.getsizeof(self.term_ids) + strings(self.terms)
+            report['postings'] = sys.getsizeof(self._postings) + sum(
+                sys.getsizeof(postings) for postings in self._postings
+            )
+            num_postings = sum(len(postings) for postings in self._postings) // 2
+        else:
+            mapped = self._mapped
+            report['mapped'] = sum(
+                int(array_.nbytes) for array_ in (
+                    mapped.postings_offsets, mapped.postings_docs, mapped.postings_tfs,
+                    mapped.doc_lengths, mapped.tombstones,
+                )
+            )
+            num_postings = len(mapped.postings_docs)
+        if self._slots:
+            report['slots'] = sys.getsizeof(self._slots)
+
+        # Per posting: list pointer + (slot, tf) tuple (the slot int is shared
+        # by a document's postings); per term: a list, a boxed doc freq and
+        # one entry in each of two dicts
+        num_terms = len(self.terms) if self._mapped is None else len(self._mapped.terms)
+        per_posting = 8 + sys.getsizeof((0, 0))
+        per_term = sys.getsizeof([]) + sys.getsizeof(1 << 20)
+        dict_size = sys.getsizeof(dict.fromkeys(range(num_terms)))
+        report['legacy_postings'] = num_postings * per_posting + num_terms * per_term + 2 * dict_size
+        report['total'] = sum(
+            value for key, value in report.items() if key not in ('legacy_postings', 'mapped')
+        )
+        return report
+
+    def live_slots(self) -> np.ndarray:
+        """Slots of live (non-removed) documents, ascending."""
+        return np.flatnonzero(np.frombuffer(bytes(self._tombstones), dtype=np.uint8) == 0)
+
+    @property
+    def total_length(self) -> int:
+        """Sum of token counts over every slot (maintained incrementally)."""
+        if self._total_length is None:
+            self._total_length = int(np.sum(self.doc_lengths, dtype=np.int64))
+        return self._total_length
+
+    @property
+    def live_length(self) -> int:
+        """Sum of token counts over live documents."""
+        if self._dead_length is None:
+            dead = 0
+            if self.tombstone_count:
+                mask = np.frombuffer(bytes(self._tombstones), dtype=np.uint8).astype(bool)
+                dead = int(np.sum(np.asarray(self.doc_lengths)[mask], dtype=np.int64))
+            self._dead_length = dead
+        return self.total_length - self._dead_length
+
+    def _update_avg_doc_length(self):
+        self.avg_doc_length = self.live_length / self.doc_count if self.doc_count else 0.0
+
+    def _get_length_norms(self, avg_doc_length: Optional[float] = None) -> np.ndarray:
+        """Cached per-slot BM25 length normalization for an average length."""
+        avg = self.avg_doc_length if avg_doc_length is None else avg_doc_length
+        norms = self._length_norms
+        if norms is None or len(norms) != len(self.doc_lengths) or self._norms_avg != avg:
+            norms = bm25_length_norms(self.doc_lengths, self.k1, self.b, avg)
+            self._length_norms = norms
+            self._norms_avg = avg
+            self._max_tf_scores = {}
+        return norms
+
+    def _invalidate_stats(self):
+        """Drop caches derived from document lengths and avg_doc_length."""
+        self._length_norms = None
+        self._norms_avg = None
+        self._max_tf_scores = {}
+
+    def _max_tf_score(self, term: str, docs: np.ndarray, tfs: np.ndarray, norms: np.ndarray) -> float:
+        """Largest length-normalized tf component of a term (cached per norms)."""
+        cached = self._max_tf_scores.get(term)
+        if cached is not None:
+            return cached
+
+        mapped = self._mapped
+        if (
+            mapped is not None
+            and mapped.term_max_scores is not None
+            and self._norms_avg == mapped.meta.get('max_scores_avg_doc_length', mapped.meta['avg_doc_length'])
+        ):
+            # Precomputed at save time with this index's then average length
+            value = float(mapped.term_max_scores[mapped.term_id(term)])
+        else:
+            value = float(np.max((tfs * (self.k1 + 1)) / (tfs + norms[docs])))
+        self._max_tf_scores[term] = value
+        return value
+
     def _get_stopwords(self) -> set:
         """Get common English stopwords."""
         return {
@@ -108,97 +453,373 @@ class BM25Index:
         """
         Add documents to the BM25 index.
 
+        Re-adding an existing doc_id replaces the previous version. The batch
+        is indexed in one pass: its terms are interned to batch-local ids, so
+        the shared vocabulary and postings are touched once per distinct
+        term rather than once per token.
+
         Args:
             doc_ids: List of document identifiers
             texts: List of document texts
         """
+        self._ensure_mutable()
+        total_length = self.total_length
+
+        # term -> batch-local id, and the new (slot, tf) pairs of each id
+        term_ids: Dict[str, int] = {}
+        batch_terms: List[str] = []
+        batch_postings: List[List[int]] = []
+
         for doc_id, text in zip(doc_ids, texts):
-            self._add_document(doc_id, text)
+            if doc_id in self.slots:
+                self.remove_document(doc_id)
+
+            slot = len(self.slot_ids)
+            self.slot_ids.append(doc_id)
+            if self.store_texts:
+                self.doc_texts.append(text)
+            self._tombstones.append(0)
+            self._slots[doc_id] = slot
+
+            tokens = self.tokenize(text)
+            self.doc_lengths.append(len(tokens))
+            total_length += len(tokens)
+            self.doc_count += 1
+
+            for term, freq in Counter(tokens).items():
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    term_id = term_ids[term] = len(batch_terms)
+                    batch_terms.append(term)
+                    batch_postings.append([])
+                pairs = batch_postings[term_id]
+                pairs.append(slot)
+                pairs.append(freq)
+
+        for term, pairs in zip(batch_terms, batch_postings):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                self.term_ids[term] = len(self.terms)
+                self.terms.append(term)
+                self._postings.append(array(POSTING_TYPECODE, pairs))
+            else:
+                self._postings[term_id].extend(pairs)
 
-        # Update average document length
-        if self.doc_lengths:
-            self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_lengths)
+        # Running totals keep the average O(1) per batch
+        self._total_length = total_length
+        self._update_avg_doc_length()
+        self._invalidate_stats()
 
-    def _add_document(self, doc_id: str, text: str):
-        """Add a single document to the index."""
-        doc_idx = len(self.doc_ids)
-        self.doc_ids.append(doc_id)
-        self.doc_texts.append(text)
+    def remove_document(self, doc_id: str):
+        """
+        Remove a document from the index.
 
-        tokens = self.tokenize(text)
-        self.doc_lengths.append(len(tokens))
-        self.doc_count += 1
+        The slot is tombstoned rather than rewritten out of every posting
+        list; call ``compact()`` (or ``save()``) to reclaim it.
+        """
+        slot = self.slots.pop(doc_id, None)
+        if slot is None:
+            return
 
-        # Count term frequencies in this document
-        term_freqs: Dict[str, int] = {}
-        for token in tokens:
-            term_freqs[token] = term_freqs.get(token, 0) + 1
+        self._tombstones[slot] = 1
+        self.tombstone_count += 1
+        self.doc_count -= 1
+        if self._dead_length is not None:
+            self._dead_length += int(self.doc_lengths[slot])
+        self._update_avg_doc_length()
+        if self._mapped is None and self.store_texts:
+            # Drop the text now; postings are reclaimed on compaction
+            self.doc_texts[slot] = ""
+
+    def doc_ids_with_prefix(self, prefix: str) -> List[str]:
+        """Return live document IDs starting with ``prefix``."""
+        return [doc_id for doc_id in self.slots if doc_id.startswith(prefix)]
+
+    def compact(self) -> int:
+        """
+        Rewrite the index without tombstoned slots.
 
-        # Update inverted index
-        for term, freq in term_freqs.items():
-            if term not in self.inverted_index:
-                self.inverted_index[term] = []
-                self.doc_freqs[term] = 0
+        Renumbers surviving slots, drops their postings and recomputes
+        document frequencies and the average length.
 
-            self.inverted_index[term].append((doc_idx, freq))
-            self.doc_freqs[term] += 1
+        Returns:
+            Number of slots reclaimed
+        """
+        reclaimed = self.tombstone_count
+        if not reclaimed:
+            return 0
+
+        self._ensure_mutable()
+        tombstones = self._tombstones
+        live = self.live_slots()
+        remap = np.full(len(self.slot_ids), -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+
+        slot_ids: List[str] = []
+        doc_texts: List[str] = []
+        doc_lengths: List[int] = []
+        for old_slot, doc_id in enumerate(self.slot_ids):
+            if tombstones[old_slot]:
+                continue
+            slot_ids.append(doc_id)
+            if self.store_texts:
+                doc_texts.append(self.doc_texts[old_slot])
+            doc_lengths.append(self.doc_lengths[old_slot])
+
+        terms: List[str] = []
+        postings: List[array] = []
+        for term, docs, tfs in self.iter_postings():
+            new_docs = remap[docs]
+            keep = new_docs >= 0
+            if keep.any():
+                terms.append(term)
+                postings.append(_pack_postings(new_docs[keep], tfs[keep]))
+
+        self.slot_ids = slot_ids
+        self.doc_texts = doc_texts
+        self.doc_lengths = doc_lengths
+        self.terms = terms
+        self.term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        self._postings = postings
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(slot_ids)}
+        self._tombstones = bytearray(len(slot_ids))
+        self.tombstone_count = 0
+        self.doc_count = len(slot_ids)
+        self._total_length = sum(doc_lengths)
+        self._dead_length = 0
+        self._update_avg_doc_length()
+        self._invalidate_stats()
+        return reclaimed
+
+    def maybe_compact(self) -> bool:
+        """Compact if the tombstone ratio has passed the threshold."""
+        if self.tombstone_count and self.tombstone_ratio >= self.compaction_threshold:
+            self.compact()
+            return True
+        return False
+
+    def _idf(self, df: int) -> float:
+        return bm25_idf(self.doc_count, df)
+
+    def _score_terms(self, query_tokens: List[str], idfs: Dict[str, float], norms: np.ndarray) -> np.ndarray:
+        """
+        Score every slot for the query in one NumPy pass per term.
 
-    def remove_document(self, doc_id: str):
-        """Remove a document from the index."""
-        if doc_id not in self.doc_ids:
-            return
+        Returns a dense score buffer indexed by slot; tombstoned slots are 0.
+        """
+        scores = np.zeros(len(self.slot_ids), dtype=np.float64)
+        k1_plus_1 = self.k1 + 1
 
-        doc_idx = self.doc_ids.index(doc_id)
+        for token in query_tokens:
+            postings = self._term_postings(token)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            idf = idfs[token]
+            # Same operation order as the scalar formula, so scores match exactly
+            scores[docs] += idf * (tfs * k1_plus_1) / (tfs + norms[docs])
+
+        if self.tombstone_count:
+            scores[np.frombuffer(self._tombstones, dtype=np.uint8).astype(bool)] = 0.0
+        return scores
+
+    def _top_k(self, scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Select the k best slots from a dense score buffer."""
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates) or k <= 0:
+            return []
+        cand_scores = scores[candidates]
 
-        # Remove from inverted index
-        for term, postings in list(self.inverted_index.items()):
-            self.inverted_index[term] = [(idx, freq) for idx, freq in postings if idx != doc_idx]
-            if not self.inverted_index[term]:
-                del self.inverted_index[term]
-                del self.doc_freqs[term]
-            else:
-                # Adjust doc_idx for documents after removed one
-                self.inverted_index[term] = [
-                    (idx - 1 if idx > doc_idx else idx, freq)
-                    for idx, freq in self.inverted_index[term]
-                ]
-
-        # Remove from document lists
-        del self.doc_ids[doc_idx]
-        del self.doc_texts[doc_idx]
-        del self.doc_lengths[doc_idx]
-        self.doc_count -= 1
+        if len(candidates) > k:
+            kth = np.argpartition(-cand_scores, k - 1)[k - 1]
+            # Keep every tie of the k-th score so the slot tie-break is stable
+            keep = cand_scores >= cand_scores[kth]
+            candidates, cand_scores = candidates[keep], cand_scores[keep]
 
-        # Recalculate average
-        if self.doc_lengths:
-            self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_lengths)
+        # Score descending, then slot ascending (candidates are slot-sorted)
+        order = np.lexsort((candidates, -cand_scores))[:k]
+        return [(self.slot_ids[int(candidates[i])], float(cand_scores[i])) for i in order]
 
-    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+    def _score_pruned(
+        self, query_tokens: List[str], k: int, idfs: Dict[str, float], norms: np.ndarray
+    ) -> List[Tuple[str, float]]:
+        """
+        Exact top-k with term-at-a-time MaxScore pruning.
+
+        Terms are visited by descending upper-bound score. While the bounds
+        of the unvisited terms could still lift an unseen document into the
+        top k, postings are scored exhaustively. Once the k-th best score
+        exceeds that remaining bound, no new document can qualify: the
+        remaining (typically long, low-idf) posting lists are only probed
+        for the surviving candidates, and candidates that can no longer
+        reach the k-th score are dropped.
+        """
+        k1_plus_1 = self.k1 + 1
+
+        # token -> (idf, slots, tfs), fetched once for both passes
+        term_data = {}
+        terms = []
+        for token in query_tokens:
+            if token not in term_data:
+                postings = self._term_postings(token)
+                term_data[token] = None if postings is None else (idfs[token], *postings)
+            if term_data[token] is None:
+                continue
+            idf, docs, tfs = term_data[token]
+            # Small slack so rounding never makes the bound undercut a real score
+            upper_bound = idf * self._max_tf_score(token, docs, tfs, norms) * (1 + 1e-9)
+            terms.append((upper_bound, idf, docs, tfs))
+        if not terms:
+            return []
+
+        terms.sort(key=lambda t: t[0], reverse=True)
+        # remaining[i] = sum of upper bounds of terms i..end
+        remaining = np.cumsum([t[0] for t in terms][::-1])[::-1]
+
+        # Only the lists after the first point where the visited bounds outweigh
+        # the rest can be skipped; when those are short, a plain scatter is cheaper
+        visited = np.cumsum([t[0] for t in terms])
+        first = next((i + 1 for i in range(len(terms) - 1) if visited[i] > remaining[i + 1]), len(terms))
+        skippable = sum(len(t[2]) for t in terms[first:])
+        if skippable * PRUNE_MIN_SKIP_RATIO < len(self.slot_ids):
+            return self._top_k(self._score_terms(query_tokens, idfs, norms), k)
+
+        scores = np.zeros(len(self.slot_ids), dtype=np.float64)
+        tombstones = None
+        if self.tombstone_count:
+            tombstones = np.frombuffer(self._tombstones, dtype=np.uint8).astype(bool)
+
+        def kth_score(candidates: np.ndarray) -> float:
+            if len(candidates) < k:
+                return 0.0
+            return float(np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k])
+
+        # Every contribution is positive, so scores > 0 marks the touched slots
+        candidates = None
+        threshold = 0.0
+        visited_bound = 0.0
+        # Best k live slots among those looked at: their k-th score is a lower
+        # bound on the true k-th score, found without scanning every slot
+        top = np.empty(0, dtype=np.int64)
+        for i, (upper_bound, idf, docs, tfs) in enumerate(terms):
+            if candidates is None:
+                # Exhaustive phase: any document may still enter the top k
+                scores[docs] += idf * (tfs * k1_plus_1) / (tfs + norms[docs])
+                visited_bound += upper_bound
+                # The k-th score can't beat the rest before the visited bounds do
+                if i + 1 < len(terms) and visited_bound > remaining[i + 1]:
+                    if len(top):
+                        pos = np.minimum(np.searchsorted(docs, top), len(docs) - 1)
+                        top = top[docs[pos] != top]
+                    pool = np.concatenate((top, docs))
+                    if tombstones is not None:
+                        pool = pool[~tombstones[pool]]
+                    if len(pool) > k:
+                        pool = pool[np.argpartition(scores[pool], len(pool) - k)[len(pool) - k:]]
+                    top = pool
+                    threshold = float(scores[top].min()) if len(top) >= k else 0.0
+                    if threshold > remaining[i + 1]:
+                        live = scores > 0
+                        candidates = np.flatnonzero(live if tombstones is None else live & ~tombstones)
+                continue
+
+            # Pruned phase: drop hopeless candidates, probe postings for the rest
+            candidates = candidates[scores[candidates] + remaining[i] >= threshold]
+            if len(candidates) * 8 >= len(docs):
+                # Probing would cost more than a straight scatter; scores of
+                # dropped slots are never read again
+                scores[docs] += idf * (tfs * k1_plus_1) / (tfs + norms[docs])
+                threshold = max(threshold, kth_score(candidates))
+                continue
+            pos = np.searchsorted(docs, candidates)
+            pos[pos == len(docs)] = 0
+            hit = docs[pos] == candidates
+            hit_docs, hit_tfs = candidates[hit], tfs[pos[hit]]
+            scores[hit_docs] += idf * (hit_tfs * k1_plus_1) / (hit_tfs + norms[hit_docs])
+            threshold = max(threshold, kth_score(candidates))
+
+        if candidates is None:
+            live = scores > 0
+            candidates = np.flatnonzero(live if tombstones is None else live & ~tombstones)
+        if not len(candidates):
+            return []
+
+        # Sums above ran in bound order; rescore the finalists in query order so
+        # results are bit-identical to the exhaustive scorer.
+        threshold = kth_score(candidates)
+        finalists = candidates[scores[candidates] >= threshold * (1 - 1e-9)]
+        exact = np.zeros(len(finalists), dtype=np.float64)
+        for token in query_tokens:
+            if term_data[token] is None:
+                continue
+            idf, docs, tfs = term_data[token]
+            pos = np.searchsorted(docs, finalists)
+            pos[pos == len(docs)] = 0
+            hit = docs[pos] == finalists
+            hit_tfs = tfs[pos[hit]]
+            exact[hit] += idf * (hit_tfs * k1_plus_1) / (hit_tfs + norms[finalists[hit]])
+
+        order = np.lexsort((finalists, -exact))[:k]
+        return [(self.slot_ids[int(finalists[i])], float(exact[i])) for i in order]
+
+    def search(self, query: str, k: int = 10, prune: bool = False) -> List[Tuple[str, float]]:
         """
         Search the index using BM25 scoring.
 
         Args:
             query: Search query
             k: Number of results to return
+            prune: Use MaxScore dynamic pruning (same results, less work
+                for small k and long queries)
 
         Returns:
             List of (doc_id, score) tuples sorted by score descending
+            (ties broken by insertion order)
+        """
+        query_tokens = self.tokenize(query)
+        if not query_tokens or not self.doc_count or k <= 0:
+            return []
+        idfs = {token: self._idf(self.doc_freq(token)) for token in set(query_tokens)}
+        return self._search_tokens(query_tokens, k, prune, idfs, self.avg_doc_length)
+
+    def _search_tokens(
+        self,
+        query_tokens: List[str],
+        k: int,
+        prune: bool,
+        idfs: Dict[str, float],
+        avg_doc_length: float,
+    ) -> List[Tuple[str, float]]:
+        """Top-k over this index with the given corpus statistics."""
+        norms = self._get_length_norms(avg_doc_length)
+        if prune:
+            return self._score_pruned(query_tokens, k, idfs, norms)
+        return self._top_k(self._score_terms(query_tokens, idfs, norms), k)
+
+    def search_reference(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Scalar BM25 scorer, kept as the correctness and benchmark baseline
+        for the vectorized ``search``.
         """
         query_tokens = self.tokenize(query)
-        if not query_tokens:
+        if not query_tokens or not self.doc_count:
             return []
 
         scores: Dict[int, float] = {}
+        tombstones = self._tombstones
 
         for token in query_tokens:
-            if token not in self.inverted_index:
+            arrays = self._term_postings(token)
+            postings = list(zip(arrays[0].tolist(), arrays[1].tolist())) if arrays else None
+            if not postings:
                 continue
 
             # IDF calculation
-            df = self.doc_freqs[token]
-            idf = math.log((self.doc_count - df + 0.5) / (df + 0.5) + 1)
+            idf = self._idf(self.doc_freq(token))
 
-            for doc_idx, tf in self.inverted_index[token]:
+            for doc_idx, tf in postings:
+                if tombstones[doc_idx]:
+                    continue
                 doc_length = self.doc_lengths[doc_idx]
 
                 # BM25 score for this term
@@ -208,48 +829,161 @@ class BM25Index:
 
                 scores[doc_idx] = scores.get(doc_idx, 0) + term_score
 
-        # Sort by score and return top k
-        sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
-        return [(self.doc_ids[idx], score) for idx, score in sorted_results]
+        # Sort by score (ties by slot) and return top k
+        sorted_results = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:k]
+        return [(self.slot_ids[idx], float(score)) for idx, score in sorted_results]
 
     def get_document(self, doc_id: str) -> Optional[str]:
-        """Get document text by ID."""
-        try:
-            idx = self.doc_ids.index(doc_id)
-            return self.doc_texts[idx]
-        except ValueError:
+        """Get document text by ID (None if unknown or texts are not stored)."""
+        if not self.store_texts:
+            return None
+        slot = self.slots.get(doc_id)
+        if slot is None:
             return None
+        return self.doc_texts[slot]
+
+    def drop_texts(self):
+        """Switch to statistics-only mode, releasing the stored texts."""
+        if not self.store_texts:
+            return
+        self._ensure_mutable()
+        self.store_texts = False
+        self.doc_texts = []
 
     def save(self, path: str):
-        """Save index to disk."""
+        """
+        Save index to disk, compacting first if enough slots are tombstoned.
+
+        Paths ending in ``.json`` use the legacy JSON format; anything else is
+        written as a binary index directory.
+        """
+        self.maybe_compact()
+        if str(path).endswith('.json'):
+            self._save_json(path)
+        else:
+            self._save_binary(Path(path))
+
+    def _binary_meta(self) -> dict:
+        return {
+            'k1': self.k1,
+            'b': self.b,
+            'avg_doc_length': self.avg_doc_length,
+            'doc_count': self.doc_count,
+            'store_texts': self.store_texts,
+        }
+
+    def _save_binary(self, directory: Path):
+        """Write the binary format; a mapped index only rewrites its tombstones."""
+        mapped = self._mapped
+        if (
+            mapped is not None
+            and mapped.directory.resolve() == directory.resolve()
+            and mapped.meta.get('store_texts', True) == self.store_texts
+        ):
+            update_tombstones(directory, self._tombstones, self._binary_meta())
+            return
+
+        self._ensure_mutable()
+        order = sorted(range(len(self.terms)), key=self.terms.__getitem__)
+        postings_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        pairs = np.zeros(0, dtype=POSTING_DTYPE)
+        if order:
+            np.cumsum([len(self._postings[term_id]) // 2 for term_id in order], out=postings_offsets[1:])
+            pairs = np.concatenate([np.frombuffer(self._postings[term_id], dtype=POSTING_DTYPE) for term_id in order])
+        arrays = pack_arrays(
+            [self.terms[term_id] for term_id in order],
+            postings_offsets,
+            pairs[0::2].astype(np.int32),
+            pairs[1::2].astype(np.int32),
+            doc_ids=self.slot_ids,
+            texts=self.doc_texts,
+            doc_lengths=self.doc_lengths,
+            tombstones=self._tombstones,
+            length_norms=self._get_length_norms(),
+            k1=self.k1,
+        )
+        # Tombstone updates change avg_doc_length but not the stored max scores
+        meta = dict(self._binary_meta(), max_scores_avg_doc_length=self.avg_doc_length)
+        write_index_dir(directory, meta, arrays)
+
+    def _save_json(self, path: str):
+        self._ensure_mutable()
         data = {
             'k1': self.k1,
             'b': self.b,
-            'doc_ids': self.doc_ids,
+            'doc_ids': self.slot_ids,
             'doc_texts': self.doc_texts,
+            'store_texts': self.store_texts,
             'doc_lengths': self.doc_lengths,
             'avg_doc_length': self.avg_doc_length,
             'doc_count': self.doc_count,
             'inverted_index': self.inverted_index,
-            'doc_freqs': self.doc_freqs
+            'doc_freqs': self.doc_freqs,
+            'tombstones': [slot for slot, dead in enumerate(self._tombstones) if dead],
         }
         with open(path, 'w') as f:
             json.dump(data, f)
 
     @classmethod
     def load(cls, path: str) -> 'BM25Index':
-        """Load index from disk."""
+        """Load index from disk (binary directory or legacy JSON file)."""
+        if is_index_dir(Path(path)):
+            return cls._load_binary(Path(path))
+
         with open(path, 'r') as f:
             data = json.load(f)
 
-        index = cls(k1=data['k1'], b=data['b'])
-        index.doc_ids = data['doc_ids']
+        index = cls(k1=data['k1'], b=data['b'], store_texts=data.get('store_texts', True))
+        index.slot_ids = data['doc_ids']
         index.doc_texts = data['doc_texts']
         index.doc_lengths = data['doc_lengths']
         index.avg_doc_length = data['avg_doc_length']
-        index.doc_count = data['doc_count']
-        index.inverted_index = {k: [tuple(x) for x in v] for k, v in data['inverted_index'].items()}
-        index.doc_freqs = data['doc_freqs']
+        index._total_length = None
+        index._dead_length = None
+        # doc_freqs in the file is redundant with the posting lengths
+        for term, postings in data['inverted_index'].items():
+            index.term_ids[term] = len(index.terms)
+            index.terms.append(term)
+            index._postings.append(array(POSTING_TYPECODE, [x for pair in postings for x in pair]))
+
+        index._tombstones = bytearray(len(index.slot_ids))
+        for slot in data.get('tombstones', []):
+            index._tombstones[slot] = 1
+        for slot, doc_id in enumerate(index.slot_ids):
+            if index._tombstones[slot]:
+                continue
+            # Files written before tombstones existed may repeat a doc_id
+            previous = index._slots.get(doc_id)
+            if previous is not None:
+                index._tombstones[previous] = 1
+            index._slots[doc_id] = slot
+        index.tombstone_count = sum(index._tombstones)
+        index.doc_count = len(index._slots)
+        # Files written before live-only statistics averaged over every slot
+        index._update_avg_doc_length()
+        return index
+
+    @classmethod
+    def _load_binary(cls, directory: Path) -> 'BM25Index':
+        """Open a binary index directory without reading its arrays."""
+        mapped = MappedIndex(directory)
+        meta = mapped.meta
+
+        index = cls(k1=meta['k1'], b=meta['b'], store_texts=meta.get('store_texts', True))
+        index._mapped = mapped
+        index.slot_ids = mapped.doc_ids
+        index.doc_texts = mapped.texts
+        index.doc_lengths = mapped.doc_lengths
+        index.avg_doc_length = meta['avg_doc_length']
+        index._total_length = None
+        index._dead_length = None
+        index._tombstones = bytearray(mapped.tombstones.tobytes())
+        index.tombstone_count = index._tombstones.count(1)
+        index.doc_count = len(index._tombstones) - index.tombstone_count
+        index._slots = None
+        if index.tombstone_count:
+            # Files written before live-only statistics averaged over every slot
+            index._update_avg_doc_length()
         return index
 
 
@@ -264,7 +998,11 @@ class HybridSearcher:
         self,
         config: SearchConfig = None,
         embed_model=None,
-        reranker=None
+        reranker=None,
+        embed_model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        embedding_cache: Optional[QueryEmbeddingCache] = None,
+        rerank_cache: Optional[LRUCache] = None,
+        model_backend: Optional[ModelBackend] = None
     ):
         """
         Initialize hybrid searcher.
@@ -273,26 +1011,65 @@ class HybridSearcher:
             config: Search configuration
             embed_model: Sentence transformer model for embeddings
             reranker: Optional cross-encoder reranker
+            embed_model_name: Model to load when embed_model is not given;
+                also part of the query-embedding cache key
+            embedding_cache: Optional query-embedding cache
+            rerank_cache: Optional cache of cross-encoder scores keyed by
+                (query hash, chunk id, index generation)
+            model_backend: How lazily loaded models are run (default: torch)
         """
         self.config = config or SearchConfig()
         self._embed_model = embed_model
         self._reranker = reranker
+        self.embed_model_name = embed_model_name
+        self.embedding_cache = embedding_cache
+        self.rerank_cache = rerank_cache
+        self.model_backend = model_backend or ModelBackend()
+        # Set by the owner whenever the index is reloaded; scopes rerank_cache entries
+        self.index_generation = 0
         self.bm25_index: Optional[BM25Index] = None
+        # Branch timings (ms) and timed-out branches, per calling thread so
+        # concurrent searches never see each other's stats
+        self._local = threading.local()
+        # Stats of the most recently finished search on any thread, for reporting
+        self.recent_search_stats: Dict[str, object] = {}
+
+    @property
+    def last_search_stats(self) -> Dict[str, object]:
+        """Stats of the last search made by the calling thread."""
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = {}
+        return stats
+
+    @last_search_stats.setter
+    def last_search_stats(self, stats: Dict[str, object]):
+        self._local.stats = stats
 
     @property
     def embed_model(self):
         """Lazy load embedding model."""
         if self._embed_model is None:
-            from sentence_transformers import SentenceTransformer
-            self._embed_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+            self._embed_model = self.model_backend.load_sentence_transformer(self.embed_model_name)
         return self._embed_model
 
+    def embed_query(self, query: str):
+        """Embed a query, going through the embedding cache when configured."""
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: List[str]) -> list:
+        """Embed several queries with a single ``encode`` call for the cache misses."""
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode_many(
+                self.embed_model, self.model_backend.cache_key(self.embed_model_name), queries
+            )
+        return list(self.embed_model.encode(list(queries), normalize_embeddings=True))
+
     @property
     def reranker(self):
         """Lazy load reranker model."""
         if self._reranker is None and self.config.use_reranker:
-            from sentence_transformers import CrossEncoder
-            self._reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+            self._reranker = self.model_backend.load_cross_encoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
         return self._reranker
 
     def build_bm25_index(self, doc_ids: List[str], texts: List[str]):
@@ -314,7 +1091,8 @@ class HybridSearcher:
         query: str,
         collection,  # ChromaDB collection
         k: int = 10,
-        metadata_filter: dict = None
+        metadata_filter: dict = None,
+        store=None
     ) -> List[SearchResult]:
         """
         Perform hybrid search.
@@ -324,35 +1102,140 @@ class HybridSearcher:
             collection: ChromaDB collection for vector search
             k: Number of results to return
             metadata_filter: Optional metadata filter
+            store: Optional vector store (``get_documents``) used to fill in
+                text and metadata of BM25-only hits after fusion
 
         Returns:
             List of SearchResult objects sorted by relevance
         """
+        return self.search_many([query], collection, k, metadata_filter, store)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        collection,  # ChromaDB collection
+        k: int = 10,
+        metadata_filter: dict = None,
+        store=None
+    ) -> List[List[SearchResult]]:
+        """
+        Perform hybrid search for a batch of queries.
+
+        All queries are embedded in one ``encode`` call and sent to the
+        collection in one ``query`` call; BM25 runs over the batch on the
+        other branch. Hydration of BM25-only hits is one ``get_documents``
+        call for the whole batch.
+
+        Returns:
+            One result list per query, in input order
+        """
+        if not queries:
+            return []
+
         # Fetch more results for fusion
         fetch_k = min(k * 3, 100)
 
-        results = []
-
+        branches = []
         if self.config.method in (SearchMethod.VECTOR, SearchMethod.HYBRID):
-            vector_results = self._vector_search(query, collection, fetch_k, metadata_filter)
-            results.append(('vector', vector_results))
+            branches.append(('vector', lambda: self._vector_search_many(queries, collection, fetch_k, metadata_filter)))
 
         if self.config.method in (SearchMethod.BM25, SearchMethod.HYBRID):
             if self.bm25_index:
-                bm25_results = self._bm25_search(query, fetch_k)
-                results.append(('bm25', bm25_results))
+                branches.append(('bm25', lambda: [self._bm25_search(q, fetch_k) for q in queries]))
 
-        # Fuse results
-        if len(results) == 1:
-            fused = results[0][1]
-        else:
-            fused = self._fuse_results(results, k)
+        branch_results = self._run_branches(branches)
+
+        use_reranker = self.config.use_reranker and self.reranker
+        keep = max(k, self.config.reranker_top_k) if use_reranker else k
+
+        batch = []
+        for i in range(len(queries)):
+            results = [(name, per_query[i]) for name, per_query in branch_results]
+
+            # Fuse results (the reranker gets its full candidate pool)
+            if not results:
+                fused = []
+            elif len(results) == 1:
+                fused = results[0][1]
+            else:
+                fused = self._fuse_results(results, keep)
+            batch.append(fused[:keep])
+
+        if store is not None:
+            self._hydrate([r for fused in batch for r in fused], store)
 
         # Rerank if enabled
-        if self.config.use_reranker and self.reranker:
-            fused = self._rerank(query, fused[:self.config.reranker_top_k])
+        if use_reranker:
+            batch = [
+                self._rerank(query, fused[:self.config.reranker_top_k])
+                for query, fused in zip(queries, batch)
+            ]
+
+        self.recent_search_stats = self.last_search_stats
+        return [fused[:k] for fused in batch]
+
+    def _run_branches(self, branches) -> List[Tuple[str, List[SearchResult]]]:
+        """
+        Run the retrieval branches, concurrently when there is more than one.
+
+        A branch that misses ``config.branch_timeout`` is dropped (and left to
+        finish in the background) so the response degrades to the remaining
+        sources. If every branch is late, the first one to finish is used.
+        """
+        timings: Dict[str, float] = {}
+        self.last_search_stats = stats = {
+            "timings_ms": timings,
+            "timed_out": [],
+            "rerank_ms": 0.0,
+            "rerank_pairs": 0,
+            "rerank_cache_hits": 0,
+            "rerank_skipped": 0,
+        }
+
+        def timed(name, fn):
+            start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+        if len(branches) < 2 or not self.config.parallel_retrieval:
+            return [(name, timed(name, fn)) for name, fn in branches]
+
+        pool = _get_retrieval_pool()
+        futures = {pool.submit(timed, name, fn): name for name, fn in branches}
+        timeout = self.config.branch_timeout or None
+        done, pending = wait(futures, timeout=timeout)
+        if not done:
+            done, pending = wait(futures, return_when=FIRST_COMPLETED)
+
+        timed_out = [futures[f] for f in pending]
+        if timed_out:
+            logger.warning(
+                f"Search branch(es) {', '.join(timed_out)} exceeded {self.config.branch_timeout}s; "
+                "returning results from the remaining sources"
+            )
+        stats["timed_out"] = timed_out
+
+        # Keep the configured branch order so fusion is deterministic
+        return [(name, future.result()) for future, name in futures.items() if future in done]
+
+    def _hydrate(self, results: List[SearchResult], store):
+        """Fetch text and metadata for BM25-only hits in one batched call."""
+        missing = [r for r in results if not r.metadata or not r.text]
+        if not missing:
+            return
 
-        return fused[:k]
+        docs = {
+            doc.id: doc
+            for doc in store.get_documents([r.doc_id for r in missing], include_embeddings=False)
+        }
+        for result in missing:
+            doc = docs.get(result.doc_id)
+            if doc is None:
+                continue
+            result.text = result.text or doc.text
+            result.metadata = result.metadata or doc.metadata or {}
 
     def _vector_search(
         self,
@@ -362,10 +1245,20 @@ class HybridSearcher:
         metadata_filter: dict = None
     ) -> List[SearchResult]:
         """Perform vector similarity search."""
-        query_embedding = self.embed_model.encode([query], normalize_embeddings=True)[0]
+        return self._vector_search_many([query], collection, k, metadata_filter)[0]
+
+    def _vector_search_many(
+        self,
+        queries: List[str],
+        collection,
+        k: int,
+        metadata_filter: dict = None
+    ) -> List[List[SearchResult]]:
+        """Vector similarity search for a batch of queries in one collection call."""
+        query_embeddings = self.embed_queries(queries)
 
         kwargs = {
-            'query_embeddings': [query_embedding.tolist()],
+            'query_embeddings': [e.tolist() for e in query_embeddings],
             'n_results': k,
             'include': ['documents', 'metadatas', 'distances']
         }
@@ -374,13 +1267,15 @@ class HybridSearcher:
 
         res = collection.query(**kwargs)
 
-        results = []
-        if res.get('ids') and res['ids'][0]:
-            for i in range(len(res['ids'][0])):
-                doc_id = res['ids'][0][i]
-                text = res['documents'][0][i]
-                distance = res['distances'][0][i]
-                metadata = res['metadatas'][0][i] if res.get('metadatas') else {}
+        batch = []
+        for row in range(len(queries)):
+            results = []
+            ids = res['ids'][row] if res.get('ids') and len(res['ids']) > row else []
+            for i in range(len(ids)):
+                doc_id = ids[i]
+                text = res['documents'][row][i]
+                distance = res['distances'][row][i]
+                metadata = res['metadatas'][row][i] if res.get('metadatas') else {}
 
                 # Convert distance to similarity score (cosine distance -> similarity)
                 score = 1 - distance
@@ -392,15 +1287,17 @@ class HybridSearcher:
                     metadata=metadata,
                     source_scores={'vector': score}
                 ))
+            batch.append(results)
 
-        return results
+        return batch
 
     def _bm25_search(self, query: str, k: int) -> List[SearchResult]:
         """Perform BM25 keyword search."""
         if not self.bm25_index:
             return []
 
-        bm25_results = self.bm25_index.search(query, k)
+        prune = 0 < k <= self.config.bm25_prune_max_k
+        bm25_results = self.bm25_index.search(query, k, prune=prune)
 
         # Normalize BM25 scores to [0, 1]
         if bm25_results:
@@ -539,15 +1436,44 @@ class HybridSearcher:
         return results
 
     def _rerank(self, query: str, results: List[SearchResult]) -> List[SearchResult]:
-        """Rerank results using cross-encoder."""
+        """
+        Rerank results using cross-encoder.
+
+        Scores come from ``rerank_cache`` when possible. The remaining pairs
+        are sorted by text length and scored in ``rerank_batch_size`` chunks so
+        each batch pads to similar lengths. When the fused top-1 already leads
+        by ``rerank_skip_margin``, the cross-encoder is not run at all.
+        """
         if not results or not self.reranker:
             return results
 
-        # Prepare pairs for cross-encoder
-        pairs = [(query, r.text) for r in results]
-
-        # Get reranking scores
-        rerank_scores = self.reranker.predict(pairs)
+        stats = self.last_search_stats
+        margin = self.config.rerank_skip_margin
+        if margin > 0 and len(results) > 1 and results[0].score > 0:
+            lead = (results[0].score - results[1].score) / results[0].score
+            if lead >= margin:
+                stats["rerank_skipped"] = stats.get("rerank_skipped", 0) + 1
+                return results
+
+        start = time.perf_counter()
+        query_hash = hashlib.blake2b(normalize_query(query).encode("utf-8"), digest_size=8).hexdigest()
+        keys = [(query_hash, r.doc_id, self.index_generation) for r in results]
+
+        rerank_scores: List[Optional[float]] = [None] * len(results)
+        if self.rerank_cache is not None:
+            rerank_scores = [self.rerank_cache.get(key) for key in keys]
+        todo = [i for i, score in enumerate(rerank_scores) if score is None]
+
+        # Length-bucketed batches: similar lengths pad less inside the model
+        todo.sort(key=lambda i: len(results[i].text or ""))
+        batch_size = max(1, self.config.rerank_batch_size)
+        for offset in range(0, len(todo), batch_size):
+            chunk = todo[offset:offset + batch_size]
+            pairs = [(query, results[i].text) for i in chunk]
+            for i, score in zip(chunk, self.reranker.predict(pairs)):
+                rerank_scores[i] = float(score)
+                if self.rerank_cache is not None:
+                    self.rerank_cache.put(keys[i], float(score))
 
         # Update scores
         for result, new_score in zip(results, rerank_scores):
@@ -557,6 +1483,10 @@ class HybridSearcher:
         # Sort by new scores
         results.sort(key=lambda x: x.score, reverse=True)
 
+        stats["rerank_ms"] = round(stats.get("rerank_ms", 0.0) + (time.perf_counter() - start) * 1000, 2)
+        stats["rerank_pairs"] = stats.get("rerank_pairs", 0) + len(todo)
+        stats["rerank_cache_hits"] = stats.get("rerank_cache_hits", 0) + len(results) - len(todo)
+
         return results
 
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Garbage collection for Local RAG.
+
+Removes chunks of files that no longer exist from the vector store, the
+BM25 index and the ingest state, without indexing anything. With source
+folders, each is rediscovered and reconciled like the first phase of
+``local-rag index`` (files moved within it are re-keyed, not deleted);
+without, every indexed file missing from disk is removed.
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+from ..settings import get_settings
+from ..storage.writer_lock import IndexLockedError
+from .index_service import DocumentIndexer
+
+DEFAULT_SETTINGS = get_settings()
+
+
+def collect_garbage(indexer: DocumentIndexer, source_dirs=(), dry_run: bool = False) -> dict:
+    """
+    Reconcile ``source_dirs`` (or all indexed files) against the filesystem.
+
+    Returns:
+        files_removed, files_moved, chunks_removed, chunks_rekeyed
+    """
+    totals = {"files_removed": 0, "files_moved": 0, "chunks_removed": 0, "chunks_rekeyed": 0}
+    results = []
+    if source_dirs:
+        for source in source_dirs:
+            paths = indexer.discover(source)
+            if not paths and indexer.indexed_paths(under=source):
+                indexer.logger.warning(f"No files found under {source}; keeping its indexed files")
+                continue
+            results.append(indexer.reconcile(source, paths, dry_run=dry_run))
+    else:
+        missing = [p for p in indexer.indexed_paths() if not os.path.exists(p)]
+        results.append(indexer.remove_orphans(missing, dry_run=dry_run))
+
+    for result in results:
+        for key in totals:
+            totals[key] += result[key]
+    if not dry_run and (totals["files_removed"] or totals["files_moved"]):
+        indexer.commit()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Remove deleted files from a Local RAG index",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --user-data-dir ~/rag-data
+  %(prog)s ~/Documents --user-data-dir ~/rag-data --dry-run
+  %(prog)s ~/Documents --user-data-dir ~/rag-data --compact
+        """
+    )
+    parser.add_argument(
+        "source_dirs",
+        nargs="*",
+        help="Indexed folders to reconcile (detects moves); default: drop every indexed file missing from disk"
+    )
+    parser.add_argument(
+        "--user-data-dir",
+        default=str(DEFAULT_SETTINGS.user_data_dir),
+        help="Path to user data directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--include",
+        nargs="*",
+        default=DEFAULT_SETTINGS.include_globs or None,
+        help="Glob patterns to include (relative to source dir)"
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="*",
+        default=DEFAULT_SETTINGS.exclude_globs or None,
+        help="Glob patterns to exclude (relative to source dir)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would be removed without changing the index"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Compact the BM25 index afterwards"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        indexer = DocumentIndexer(
+            user_data_dir=args.user_data_dir,
+            include_globs=args.include,
+            exclude_globs=args.exclude,
+        )
+    except IndexLockedError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    sources = [Path(d).resolve() for d in args.source_dirs]
+    totals = collect_garbage(indexer, sources, dry_run=args.dry_run)
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {totals['files_removed']} files ({totals['chunks_removed']} chunks)")
+    print(f"{'Would re-key' if args.dry_run else 'Re-keyed'} {totals['files_moved']} moved files "
+          f"({totals['chunks_rekeyed']} chunks)")
+    if args.compact and not args.dry_run:
+        reclaimed = indexer.compact_bm25()
+        print(f"BM25 compaction reclaimed {reclaimed} slots")
+
+
+if __name__ == "__main__":
+    main()
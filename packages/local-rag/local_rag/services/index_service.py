@@ -9,23 +9,34 @@ Supports multiple chunking strategies, vector stores, and BM25 indexing.
 import argparse
 import hashlib
 import json
+import os
+import stat
 import sys
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
-from ..adapters.vectorstore import get_vector_store
+from ..adapters.embeddings import ModelBackend
+from ..adapters.vectorstore import as_embedding_matrix, get_vector_store
 from ..ingestion.chunking import ChunkingStrategy, get_chunker
 from ..ingestion.discover import discover_files
+from ..ingestion.extract_pool import ExtractorPool, open_extractor_pool
 from ..ingestion.extractors import read_text_with_ocr as read_text
 from ..ingestion.filters import filter_chunks
-from ..search.hybrid import BM25Index
+from ..ingestion.pipeline import CLOSED, Pipeline
+from ..search.bm25_segments import SegmentedBM25Index, upgrade_bm25_index
+from ..search.cache import bump_generation
 from ..settings import LocalRagSettings, get_settings
 from ..storage import VectorStoreRepository, create_repository
+from ..storage.embedding_cache import EmbeddingCache
+from ..storage.state_store import IngestStateStore
+from ..storage.writer_lock import IndexLockedError, WriterLock
 from ..utils.logger import get_logger, setup_logging
 
 # Load defaults once
@@ -62,26 +73,91 @@ EXCLUDE_DIRS = {
 }
 
 
-def fhash(p: Path) -> str:
-    """Calculate file hash."""
-    h = hashlib.sha1()
+# Ids per vector store delete call when purging orphaned chunks
+DELETE_BATCH_SIZE = 1000
+
+# File content hashes: sha1 (legacy state files), blake2b, xxh3 (needs `xxhash`)
+FILE_HASHES = ("sha1", "blake2b", "xxh3")
+
+
+def _new_hasher(algo: str):
+    if algo == "sha1":
+        return hashlib.sha1()
+    if algo == "blake2b":
+        return hashlib.blake2b(digest_size=20)
+    if algo == "xxh3":
+        try:
+            import xxhash
+        except ImportError as e:
+            raise ImportError("FILE_HASH=xxh3 needs the xxhash package (pip install local-rag[fast-hash])") from e
+        return xxhash.xxh3_128()
+    raise ValueError(f"Unknown file hash {algo!r} (expected one of {', '.join(FILE_HASHES)})")
+
+
+def file_digest(p: Path, algo: str = "sha1") -> str:
+    """Hash a file's bytes with ``algo``."""
+    h = _new_hasher(algo)
     with p.open("rb") as f:
         for chunk in iter(lambda: f.read(1 << 20), b""):
             h.update(chunk)
     return h.hexdigest()
 
 
+def fhash(p: Path) -> str:
+    """Calculate file hash."""
+    return file_digest(p, "sha1")
+
+
+class FileFingerprint(NamedTuple):
+    """What change detection records about a file: stat fields and a content hash."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+    algo: str
+
+
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk, used to diff chunk sets on re-index."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
 def load_state(state_path: Path) -> dict:
-    """Load ingestion state."""
+    """Load a legacy JSON ingestion state (see storage.state_store for the current store)."""
     return json.loads(state_path.read_text()) if state_path.exists() else {}
 
 
 def save_state(state_path: Path, state: dict):
-    """Save ingestion state."""
+    """Save a legacy JSON ingestion state."""
     state_path.parent.mkdir(parents=True, exist_ok=True)
     state_path.write_text(json.dumps(state, indent=2))
 
 
+@dataclass
+class PreparedFile:
+    """A chunked file on its way through the indexing stages."""
+
+    path: Path
+    fingerprint: FileFingerprint
+    dropped: int = 0
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    hashes: List[str] = field(default_factory=list)
+    metadatas: List[dict] = field(default_factory=list)
+    old_hashes: Optional[Dict[str, str]] = None
+    # Positions to write, positions whose text is unchanged but whose
+    # metadata is rewritten, positions to embed, {position: float32 embedding row}
+    write: List[int] = field(default_factory=list)
+    refresh: List[int] = field(default_factory=list)
+    to_embed: List[int] = field(default_factory=list)
+    embeddings: Dict[int, np.ndarray] = field(default_factory=dict)
+    reused: int = 0
+
+    @property
+    def mtime(self) -> int:
+        return self.fingerprint.mtime_ns // 1_000_000_000
+
+
 class DocumentIndexer:
     """
     Enhanced document indexer with configurable chunking and storage.
@@ -102,8 +178,15 @@ class DocumentIndexer:
         exclude_globs: Optional[List[str]] = None,
         parallel_workers: Optional[int] = None,
         max_errors: Optional[int] = None,
-        settings: Optional[LocalRagSettings] = None
+        extract_workers: Optional[int] = None,
+        settings: Optional[LocalRagSettings] = None,
+        lock_timeout: Optional[float] = 0.0
     ):
+        """
+        ``lock_timeout`` is how long to wait for another writer on the same
+        user data directory to finish (None waits indefinitely); past it,
+        ``IndexLockedError`` is raised.
+        """
         overrides = {}
         if user_data_dir is not None:
             overrides["user_data_dir"] = user_data_dir
@@ -129,6 +212,8 @@ class DocumentIndexer:
             overrides["parallel_workers"] = parallel_workers
         if max_errors is not None:
             overrides["max_errors"] = max_errors
+        if extract_workers is not None:
+            overrides["extract_workers"] = extract_workers
 
         self.settings = settings or get_settings(**overrides)
         self.settings.apply_runtime_env()
@@ -162,23 +247,69 @@ class DocumentIndexer:
         self.min_chunk_entropy = self.settings.chunk_min_entropy
 
         self.paths = self.settings.paths
-        self.state = load_state(self.paths["state_path"])
+        # Held until close() or exit: the caches below assume a single writer
+        self.writer_lock = WriterLock(self.paths["writer_lock_path"]).acquire(lock_timeout)
+        self.state = IngestStateStore(self.paths["state_db_path"], legacy_json_path=self.paths["state_path"])
 
         self._embed_model = None
+        self._embedding_cache: Optional[EmbeddingCache] = None
         self._vector_store = None
         self._chunker = None
         self._bm25_index = None
         self._repository: Optional[VectorStoreRepository] = None
         self._write_lock = threading.Lock()
+        # Chunks embedded / re-keyed with a stored embedding / left untouched
+        self.chunk_counts = Counter()
 
     @property
     def embed_model(self):
         """Lazy load embedding model."""
         if self._embed_model is None:
             self.logger.info(f"Loading embedding model {self.embed_model_name}...")
-            self._embed_model = SentenceTransformer(self.embed_model_name)
+            backend = ModelBackend.from_settings(self.settings)
+            self._embed_model = backend.load_sentence_transformer(self.embed_model_name)
         return self._embed_model
 
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        """Content-addressed chunk embedding cache (None when disabled)."""
+        if self._embedding_cache is None and self.settings.embedding_cache_size > 0:
+            model_key = ModelBackend.from_settings(self.settings).cache_key(self.embed_model_name)
+            self._embedding_cache = EmbeddingCache.for_model(
+                self.paths["embedding_cache_dir"], model_key, self.settings.embedding_cache_size
+            )
+        return self._embedding_cache
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed chunk texts, encoding only those missing from the embedding cache.
+
+        Returns:
+            float32 matrix with one row per text, in order
+        """
+        unique = list(dict.fromkeys(texts))
+        cache = self.embedding_cache
+        vectors = cache.get_many(unique) if cache is not None else [None] * len(unique)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = as_embedding_matrix(self.embed_model.encode(
+                [unique[i] for i in missing],
+                normalize_embeddings=True,
+                batch_size=self.embed_batch_size
+            ))
+            if cache is not None:
+                cache.put_many([unique[i] for i in missing], encoded)
+            if len(missing) == len(texts):
+                # Nothing cached and no duplicates: the model output is the answer
+                return encoded
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+        matrix = as_embedding_matrix(vectors)
+        if len(unique) == len(texts):
+            return matrix
+        position = {text: i for i, text in enumerate(unique)}
+        return matrix[[position[text] for text in texts]]
+
     @property
     def vector_store(self):
         """Lazy initialize vector store."""
@@ -213,27 +344,34 @@ class DocumentIndexer:
         return self._chunker
 
     @property
-    def bm25_index(self) -> Optional[BM25Index]:
+    def bm25_index(self) -> Optional[SegmentedBM25Index]:
         """Get or create BM25 index."""
         if not self.build_bm25:
             return None
 
         if self._bm25_index is None:
-            bm25_path = self.paths['bm25_path']
-            if bm25_path.exists():
-                try:
-                    self._bm25_index = BM25Index.load(str(bm25_path))
-                except Exception as e:
-                    self.logger.warning(f"Could not load BM25 index: {e}")
-                    self._bm25_index = BM25Index()
-            else:
-                self._bm25_index = BM25Index()
+            try:
+                self._bm25_index = upgrade_bm25_index(self.paths['bm25_dir'], self.paths['bm25_path'])
+            except Exception as e:
+                self.logger.warning(f"Could not load BM25 index: {e}")
+            if self._bm25_index is None:
+                self._bm25_index = SegmentedBM25Index(
+                    self.paths['bm25_dir'], store_texts=self.settings.bm25_store_text
+                )
+            elif self._bm25_index.store_texts and not self.settings.bm25_store_text:
+                # Texts already live in the vector store; rewritten on next save
+                self._bm25_index.drop_texts()
 
         return self._bm25_index
 
-    def should_index_file(self, path: Path) -> bool:
-        """Check if file should be indexed."""
-        if not path.exists() or not path.is_file():
+    def should_index_file(self, path: Path, st: Optional[os.stat_result] = None) -> bool:
+        """Check if file should be indexed (``st``: the file's stat, if already known)."""
+        if st is None:
+            try:
+                st = path.stat()
+            except OSError:
+                return False
+        if not stat.S_ISREG(st.st_mode):
             return False
 
         # Note: Parent directory exclusion is handled by discover_files()
@@ -243,41 +381,120 @@ class DocumentIndexer:
             return False
 
         # Skip large files (>10MB)
-        if path.stat().st_size > 10 * (1 << 20):
+        if st.st_size > 10 * (1 << 20):
             return False
 
         return True
 
     def is_file_changed(self, path: Path) -> bool:
         """Check if file has changed since last indexing."""
-        current_hash = fhash(path)
-        stored_hash = self.state.get(str(path), {}).get("hash")
-        return current_hash != stored_hash
+        return self.check_file(path)[0]
 
-    def index_file(self, path: Path) -> Tuple[int, int]:
+    def check_file(
+        self, path: Path, st: Optional[os.stat_result] = None, verify: bool = False
+    ) -> Tuple[bool, Optional[FileFingerprint]]:
+        """
+        Decide whether ``path`` changed since it was last indexed.
+
+        A file whose size and mtime_ns match the stored state is unchanged
+        without being read. Otherwise (or with ``verify``) its bytes are
+        hashed once, with the algorithm the stored hash used. A touched but
+        identical file gets its stored stat refreshed so the next scan takes
+        the fast path again.
+
+        Returns:
+            (changed, fingerprint to reuse when indexing, if one was computed)
+        """
+        st = st or path.stat()
+        entry = self.state.get(str(path))
+        if entry is None:
+            return True, None
+        if not verify and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return False, None
+
+        # Entries written before the hash setting existed used sha1
+        algo = entry.get("hash_algo", "sha1")
+        fingerprint = FileFingerprint(st.st_size, st.st_mtime_ns, file_digest(path, algo), algo)
+        if fingerprint.digest != entry.get("hash"):
+            return True, fingerprint if algo == self.settings.file_hash else None
+
+        with self._write_lock:
+            entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+            self.state.mark_dirty(str(path))
+        return False, None
+
+    def fingerprint(self, path: Path, st: Optional[os.stat_result] = None) -> FileFingerprint:
+        """Stat and hash ``path`` with the configured FILE_HASH."""
+        st = st or path.stat()
+        algo = self.settings.file_hash
+        return FileFingerprint(st.st_size, st.st_mtime_ns, file_digest(path, algo), algo)
+
+    def index_file(
+        self, path: Path, force: bool = False, fingerprint: Optional[FileFingerprint] = None
+    ) -> Tuple[int, int]:
         """
         Index a single file.
 
+        On re-index, the new chunks are diffed against the content hashes
+        recorded for the previous version: unchanged chunks are left alone,
+        chunks that only moved (same text, new offsets) are re-keyed with
+        their stored embedding, and only new or edited chunks are embedded.
+        ``force`` re-embeds every chunk.
+
+        Runs the pipeline stages of ``index_directory`` inline.
+        ``fingerprint`` (from :meth:`check_file`) saves hashing the file again.
+
         Returns:
             (Number of chunks indexed, chunks dropped)
         """
-        if not self.should_index_file(path):
+        text = self.extract_text(path)
+        if not text:
             return 0, 0
 
+        prepared, dropped = self.prepare_file(path, text, force=force, fingerprint=fingerprint)
+        if prepared is None:
+            return 0, dropped
+
+        self.embed_prepared([prepared])
+        self.write_prepared([prepared])
+        return len(prepared.ids), dropped
+
+    def extract_text(
+        self, path: Path, pool: Optional[ExtractorPool] = None, st: Optional[os.stat_result] = None
+    ) -> Optional[str]:
+        """
+        Extraction stage: the file's text, or None if there is nothing to index.
+
+        With ``pool`` the file is parsed in a worker process.
+        """
+        if not self.should_index_file(path, st):
+            return None
+
         try:
-            text = read_text(path, settings=self.settings)
+            text = pool.read_text(path) if pool is not None else read_text(path, settings=self.settings)
+        except BrokenProcessPool:
+            raise  # the worker crashed on this file: report it as an error
         except Exception as e:
             self.logger.error(f"Error reading {path.name}: {e}")
-            return 0, 0
+            return None
 
-        if not text.strip():
-            return 0, 0
+        return text if text.strip() else None
+
+    def prepare_file(
+        self, path: Path, text: str, force: bool = False, fingerprint: Optional[FileFingerprint] = None
+    ) -> Tuple[Optional[PreparedFile], int]:
+        """
+        Chunk stage: chunk, filter and diff a file against its previous version.
+
+        ``fingerprint`` is reused when change detection already hashed the file.
 
-        # Chunk the text
+        Returns:
+            (prepared file or None if no chunk survived, chunks dropped)
+        """
         chunks = list(self.chunker.chunk(text, file_path=str(path)))
 
         if not chunks:
-            return 0, 0
+            return None, 0
 
         # Quality filter
         filtered_chunks, dropped = filter_chunks(
@@ -288,17 +505,14 @@ class DocumentIndexer:
         )
 
         if not filtered_chunks:
-            return 0, dropped
+            return None, dropped
 
-        # Prepare data for indexing
-        ids = []
-        texts = []
-        metadatas = []
+        prepared = PreparedFile(path=path, fingerprint=fingerprint or self.fingerprint(path), dropped=dropped)
 
         for i, chunk in enumerate(filtered_chunks):
-            chunk_id = f"{path}:{chunk.start}-{chunk.end}"
-            ids.append(chunk_id)
-            texts.append(chunk.text)
+            prepared.ids.append(f"{path}:{chunk.start}-{chunk.end}")
+            prepared.texts.append(chunk.text)
+            prepared.hashes.append(chunk_hash(chunk.text))
 
             # Build metadata, filtering out None values (ChromaDB doesn't accept None)
             meta = {
@@ -307,61 +521,370 @@ class DocumentIndexer:
                 "start": chunk.start,
                 "end": chunk.end,
                 "chunk_index": i,
-                "mtime": int(path.stat().st_mtime),
+                "mtime": prepared.mtime,
                 "strategy": chunk.metadata.get("strategy", self.chunking_strategy),
+                "chunk_hash": prepared.hashes[-1],
             }
             # Add extra metadata from chunk, excluding None values
             for k, v in chunk.metadata.items():
                 if k != "strategy" and v is not None:
                     meta[k] = v
-            metadatas.append(meta)
+            prepared.metadatas.append(meta)
 
-        # Generate embeddings
-        embeddings = self.embed_model.encode(
-            texts,
-            normalize_embeddings=True,
-            batch_size=self.embed_batch_size
-        )
+        # Diff against the chunk hashes of the previous version
+        prepared.old_hashes = None if force else self.state.get(str(path), {}).get("chunk_hashes")
+        if prepared.old_hashes is None:
+            prepared.write = list(range(len(prepared.ids)))
+        else:
+            prepared.write, prepared.refresh, prepared.embeddings = self._diff_chunks(
+                prepared.ids, prepared.hashes, prepared.old_hashes
+            )
+        prepared.reused = sum(1 for i in prepared.write if i in prepared.embeddings)
+        prepared.to_embed = [i for i in prepared.write if i not in prepared.embeddings]
+        return prepared, dropped
 
-        with self._write_lock:
-            # Delete existing chunks for this file
-            self.repository.delete_documents(where={"path": str(path)})
+    def embed_prepared(self, files: List[PreparedFile]) -> int:
+        """
+        Embedding stage: embed the new/edited chunks of several files in one call.
+
+        Returns:
+            Number of chunks embedded
+        """
+        texts = [f.texts[i] for f in files for i in f.to_embed]
+        if not texts:
+            return 0
+        # Rows are views into one matrix; write_prepared stacks them again per batch
+        vectors = iter(self.embed_texts(texts))
+        for f in files:
+            for i in f.to_embed:
+                f.embeddings[i] = next(vectors)
+        return len(texts)
+
+    def write_prepared(self, files: List[PreparedFile]) -> int:
+        """
+        Write stage: replace the chunks of several embedded files in one batch.
 
-            # Also remove from BM25 index
+        Returns:
+            Number of chunks written
+        """
+        ids, texts, embeddings, metadatas = [], [], [], []
+        bm25_ids, bm25_texts = [], []
+        with self._write_lock:
+            stale_ids = []
+            for f in files:
+                if f.old_hashes is None:
+                    # Delete existing chunks for this file
+                    self.repository.delete_documents(where={"path": str(f.path)})
+                    if self.bm25_index:
+                        stale_ids.extend(self.bm25_index.doc_ids_with_prefix(f"{f.path}:"))
+                else:
+                    new_ids = set(f.ids)
+                    file_stale = [old_id for old_id in f.old_hashes if old_id not in new_ids]
+                    if file_stale:
+                        self.repository.delete_documents(ids=file_stale)
+                    stale_ids.extend(file_stale)
+
+                for i in f.write + f.refresh:
+                    ids.append(f.ids[i])
+                    texts.append(f.texts[i])
+                    embeddings.append(f.embeddings[i])
+                    metadatas.append(f.metadatas[i])
+                # Refreshed chunks kept their text, so BM25 already has them
+                bm25_ids.extend(f.ids[i] for i in f.write)
+                bm25_texts.extend(f.texts[i] for i in f.write)
+
+            # Also remove from BM25 index (re-added ids replace themselves)
             if self.bm25_index:
-                # Remove old entries (by prefix matching on doc_id)
-                old_ids = [doc_id for doc_id in self.bm25_index.doc_ids if doc_id.startswith(str(path))]
-                for old_id in old_ids:
+                for old_id in stale_ids:
                     self.bm25_index.remove_document(old_id)
 
             # Add to vector store
-            self.repository.upsert_documents(
-                ids=ids,
-                texts=texts,
-                embeddings=embeddings.tolist(),
-                metadatas=metadatas
-            )
+            if ids:
+                self.repository.upsert_documents(
+                    ids=ids,
+                    texts=texts,
+                    embeddings=as_embedding_matrix(embeddings),
+                    metadatas=metadatas
+                )
 
             # Add to BM25 index
+            if self.bm25_index and bm25_ids:
+                self.bm25_index.add_documents(bm25_ids, bm25_texts)
+
+            # Update state
+            for f in files:
+                self.state[str(f.path)] = {
+                    "hash": f.fingerprint.digest,
+                    "hash_algo": f.fingerprint.algo,
+                    "size": f.fingerprint.size,
+                    "mtime_ns": f.fingerprint.mtime_ns,
+                    "mtime": f.mtime,
+                    "chunks": len(f.ids),
+                    "chunk_hashes": dict(zip(f.ids, f.hashes)),
+                }
+                self.chunk_counts["embedded"] += len(f.to_embed)
+                self.chunk_counts["reused"] += f.reused
+                self.chunk_counts["unchanged"] += len(f.ids) - len(f.write)
+
+        return len(ids)
+
+    def remove_file(self, path: Path) -> int:
+        """
+        Drop a deleted file's chunks from the vector store, BM25 and state.
+
+        Returns:
+            Number of chunks the file had, or 0 if it was not indexed
+        """
+        return self.remove_orphans([str(path)])["chunks_removed"]
+
+    def reconcile(self, source_dir: Path, present: Iterable[Path], dry_run: bool = False) -> dict:
+        """
+        Purge indexed files below ``source_dir`` that are not in ``present``.
+
+        ``present`` is the discovered file set. Discovered files that are not
+        indexed yet are candidates for moves (see ``remove_orphans``).
+        """
+        present_keys = {str(p) for p in present}
+        indexed = self.indexed_paths(under=source_dir)
+        orphans = [p for p in indexed if p not in present_keys]
+        if not orphans:
+            return {"files_removed": 0, "files_moved": 0, "chunks_removed": 0, "chunks_rekeyed": 0}
+        new_files = present_keys.difference(indexed)
+        return self.remove_orphans(orphans, candidates=new_files, dry_run=dry_run)
+
+    def _reconcile_discovered(self, source_dir: Path, paths: List[Path]) -> dict:
+        """Reconcile phase of ``index_directory``, guarded against an unreadable source."""
+        if not self.settings.index_reconcile:
+            return {}
+        if not paths and self.indexed_paths(under=source_dir):
+            # An unmounted or unreadable folder must not wipe its index
+            self.logger.warning(f"No files found under {source_dir}; keeping its indexed files")
+            return {}
+        result = self.reconcile(source_dir, paths)
+        if result["files_removed"] or result["files_moved"]:
+            self.logger.info(f"Reconciled: {result['files_removed']} removed "
+                             f"({result['chunks_removed']} chunks), {result['files_moved']} moved "
+                             f"({result['chunks_rekeyed']} chunks re-keyed)")
+        return result
+
+    def remove_orphans(
+        self, orphans: Iterable[str], candidates: Iterable[str] = (), dry_run: bool = False
+    ) -> dict:
+        """
+        Remove indexed files that no longer exist, re-keying the ones that moved.
+
+        An orphan whose size and content hash match an unindexed file among
+        ``candidates`` (same extension, so it chunks the same way) moved
+        there: its chunks are re-keyed to the new path with their stored
+        embeddings instead of being deleted and embedded again. The others
+        are deleted from the vector store, BM25 and state in batches.
+
+        Returns:
+            files_removed, files_moved, chunks_removed, chunks_rekeyed
+        """
+        orphans = [p for p in dict.fromkeys(orphans) if p in self.state]
+        moves = self._find_moves(orphans, candidates)
+        stats = {"files_removed": 0, "files_moved": 0, "chunks_removed": 0, "chunks_rekeyed": 0}
+        if dry_run:
+            stats["files_moved"] = len(moves)
+            stats["chunks_rekeyed"] = sum(self.state[old].get("chunks", 0) for old in moves)
+            gone = [p for p in orphans if p not in moves]
+            stats["files_removed"] = len(gone)
+            stats["chunks_removed"] = sum(self.state[p].get("chunks", 0) for p in gone)
+            return stats
+
+        gone = []
+        for old in orphans:
+            move = moves.get(old)
+            rekeyed = self._move_file(old, *move) if move else None
+            if rekeyed is None:
+                gone.append(old)
+            else:
+                stats["files_moved"] += 1
+                stats["chunks_rekeyed"] += rekeyed
+                self.logger.info(f"Moved: {old} -> {move[0]} ({rekeyed} chunks re-keyed)")
+
+        with self._write_lock:
+            ids, by_filter = [], []
+            for path in gone:
+                chunk_hashes = self.state[path].get("chunk_hashes")
+                if chunk_hashes is None:
+                    by_filter.append(path)  # entries from before chunk hashes were stored
+                else:
+                    ids.extend(chunk_hashes)
+                stats["chunks_removed"] += self.state[path].get("chunks", 0)
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                self.repository.delete_documents(ids=ids[start:start + DELETE_BATCH_SIZE])
+            for path in by_filter:
+                self.repository.delete_documents(where={"path": path})
             if self.bm25_index:
+                for doc_id in ids:
+                    self.bm25_index.remove_document(doc_id)
+                # Only legacy entries need the scan over every live id
+                for path in by_filter:
+                    for doc_id in self.bm25_index.doc_ids_with_prefix(f"{path}:"):
+                        self.bm25_index.remove_document(doc_id)
+            for path in gone:
+                del self.state[path]
+        stats["files_removed"] = len(gone)
+        return stats
+
+    def _find_moves(self, orphans: List[str], candidates: Iterable[str]) -> Dict[str, Tuple[Path, os.stat_result]]:
+        """{orphan: (new path, its stat)} for orphans whose content reappears among ``candidates``."""
+        by_size: Dict[Tuple[int, str], List[str]] = {}
+        for old in orphans:
+            size = self.state[old].get("size")
+            if size is not None:
+                by_size.setdefault((size, Path(old).suffix.lower()), []).append(old)
+        if not by_size:
+            return {}
+
+        moves = {}
+        for new in sorted(c for c in candidates if c not in self.state):
+            new_path = Path(new)
+            try:
+                st = new_path.stat()
+            except OSError:
+                continue
+            # Only files of a matching size are hashed
+            olds = by_size.get((st.st_size, new_path.suffix.lower()))
+            if not olds:
+                continue
+            digests = {}
+            for old in olds:
+                entry = self.state[old]
+                algo = entry.get("hash_algo", "sha1")
+                if algo not in digests:
+                    try:
+                        digests[algo] = file_digest(new_path, algo)
+                    except OSError:
+                        break
+                if digests[algo] == entry.get("hash"):
+                    moves[old] = (new_path, st)
+                    olds.remove(old)
+                    break
+        return moves
+
+    def _move_file(self, old: str, new_path: Path, st: os.stat_result) -> Optional[int]:
+        """
+        Re-key an indexed file's chunks to ``new_path`` with their stored embeddings.
+
+        Returns:
+            Chunks re-keyed, or None if the stored chunks are incomplete and the
+            file has to be removed and indexed again
+        """
+        new = str(new_path)
+        with self._write_lock:
+            entry = self.state[old]
+            old_ids = list(entry.get("chunk_hashes") or ())
+            if not old_ids:
+                return None
+            docs = self.repository.get_documents(old_ids)
+            if len(docs) != len(old_ids) or any(doc.embedding is None or not len(doc.embedding) for doc in docs):
+                return None
+
+            mtime = st.st_mtime_ns // 1_000_000_000
+            rekey = {doc_id: new + doc_id[len(old):] for doc_id in old_ids}
+            ids, texts, metadatas = [], [], []
+            for doc in docs:
+                ids.append(rekey[doc.id])
+                texts.append(doc.text)
+                metadatas.append({**doc.metadata, "path": new, "filename": new_path.name, "mtime": mtime})
+            embeddings = as_embedding_matrix([doc.embedding for doc in docs])
+            self.repository.upsert_documents(ids=ids, texts=texts, embeddings=embeddings, metadatas=metadatas)
+            self.repository.delete_documents(ids=old_ids)
+            if self.bm25_index:
+                for doc_id in old_ids:
+                    self.bm25_index.remove_document(doc_id)
                 self.bm25_index.add_documents(ids, texts)
 
-            # Update state
-            self.state[str(path)] = {
-                "hash": fhash(path),
-                "mtime": int(path.stat().st_mtime),
-                "chunks": len(filtered_chunks)
+            self.state[new] = {
+                **entry,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "mtime": mtime,
+                "chunk_hashes": {rekey[doc_id]: h for doc_id, h in entry["chunk_hashes"].items()},
             }
+            del self.state[old]
+        return len(ids)
+
+    def indexed_paths(self, under: Optional[Path] = None) -> List[str]:
+        """Paths recorded in the ingest state, optionally only those below ``under``."""
+        paths = list(self.state)
+        if under is None:
+            return paths
+        prefix = os.path.join(str(under), "")
+        return [p for p in paths if p.startswith(prefix)]
+
+    def _diff_chunks(
+        self,
+        ids: List[str],
+        hashes: List[str],
+        old_hashes: Dict[str, str],
+    ) -> Tuple[List[int], List[int], Dict[int, np.ndarray]]:
+        """
+        Compare new chunks with the previous version of a file.
+
+        A chunk under the same id with the same text keeps its embedding and
+        BM25 entry, but its metadata is still rewritten: ``chunk_index`` and
+        ``mtime`` change with the edit.
 
-        return len(filtered_chunks), dropped
+        Returns:
+            (positions of chunks to write, positions of unchanged chunks to
+            refresh, {position: stored embedding} for refreshed chunks and for
+            chunks whose text is unchanged but whose id moved)
+        """
+        write, refresh = [], []
+        for i, (chunk_id, h) in enumerate(zip(ids, hashes)):
+            (refresh if old_hashes.get(chunk_id) == h else write).append(i)
+
+        # Chunks whose text still exists under an id that is going away
+        new_ids = set(ids)
+        moved_from = {}
+        for old_id, h in old_hashes.items():
+            if old_id not in new_ids:
+                moved_from.setdefault(h, old_id)
+        sources = {i: ids[i] for i in refresh}
+        sources.update({i: moved_from[hashes[i]] for i in write if hashes[i] in moved_from})
+        if not sources:
+            return write, refresh, {}
+
+        stored = {
+            doc.id: doc.embedding
+            for doc in self.repository.get_documents(sorted(set(sources.values())))
+            if doc.embedding is not None and len(doc.embedding)
+        }
+        reused = {
+            i: np.asarray(stored[source], dtype=np.float32)
+            for i, source in sources.items()
+            if source in stored
+        }
+        # An unchanged chunk missing from the store is embedded and written again
+        missing = [i for i in refresh if i not in reused]
+        if missing:
+            refresh = [i for i in refresh if i in reused]
+            write = sorted(write + missing)
+        return write, refresh, reused
+
+    def discover(self, source_dir: Path) -> List[Path]:
+        """Files under ``source_dir`` that the configured extensions and globs select."""
+        return list(discover_files(
+            source_dir,
+            allowed_exts=ALLOWED_EXTS,
+            exclude_dirs=EXCLUDE_DIRS,
+            include_globs=self.include_globs,
+            exclude_globs=self.exclude_globs,
+            workers=self.settings.discover_workers,
+        ))
 
-    def index_directory(self, source_dir: Path, force: bool = False) -> dict:
+    def index_directory(self, source_dir: Path, force: bool = False, verify_hashes: bool = False) -> dict:
         """
         Index all files in a directory.
 
         Args:
             source_dir: Directory to index
             force: Force re-indexing of all files
+            verify_hashes: Hash every file even when its size and mtime are unchanged
 
         Returns:
             Statistics about indexing
@@ -376,89 +899,40 @@ class DocumentIndexer:
             "skipped_large": [],  # Files > max_file_size_mb
             "skipped_unchanged": 0,  # Files not changed since last index
         }
+        counts_before = Counter(self.chunk_counts)
+        cache = self.embedding_cache
+        cache_before = (cache.hits, cache.misses) if cache is not None else (0, 0)
 
         self.logger.info(f"Starting indexing: {source_dir}")
+        last_run = self.state.get_meta("last_run")
+        if last_run and last_run.get("finished_at") is None:
+            self.logger.info(f"Resuming interrupted run of {last_run.get('source')} "
+                             f"(started {last_run.get('started_at')}); finished files are skipped")
+        run = {"source": str(source_dir), "started_at": datetime.now().isoformat(), "finished_at": None}
+        self.state.set_meta("last_run", run)
         self.logger.info(f"Scanning {source_dir}...")
 
-        candidates = discover_files(
-            source_dir,
-            allowed_exts=ALLOWED_EXTS,
-            exclude_dirs=EXCLUDE_DIRS,
-            include_globs=self.include_globs,
-            exclude_globs=self.exclude_globs,
-        )
-        
-        paths = list(candidates)
+        paths = self.discover(source_dir)
         self.logger.info(f"Found {len(paths)} candidate files")
+        stats.update(self._reconcile_discovered(source_dir, paths))
 
-        def process_path(path: Path):
-            # Check file size before processing
-            try:
-                file_size_mb = path.stat().st_size / (1024 * 1024)
-                if file_size_mb > self.settings.max_file_size_mb:
-                    self.logger.warning(f"Skipping large file: {path} ({file_size_mb:.1f}MB > {self.settings.max_file_size_mb}MB)")
-                    stats["skipped_large"].append({"path": str(path), "size_mb": round(file_size_mb, 1)})
-                    return ("skip_large", path, 0, 0, None)
-            except (OSError, FileNotFoundError) as e:
-                self.logger.error(f"Cannot access file {path}: {e}")
-                return ("error", path, 0, 0, e)
-                
-            if not self.should_index_file(path):
-                return ("skip", path, 0, 0, None)
-            if not force and not self.is_file_changed(path):
-                stats["skipped_unchanged"] += 1
-                return ("skip_unchanged", path, 0, 0, None)
-            try:
-                num_chunks, dropped = self.index_file(path)
-                return ("ok", path, num_chunks, dropped, None)
-            except Exception as e:
-                self.logger.error(f"Failed to index {path}: {e}", exc_info=True)
-                return ("error", path, 0, 0, e)
-
-
-
-        # Decide execution strategy
-        if self.parallel_workers and self.parallel_workers > 1:
-            self.logger.info(f"Indexing with {self.parallel_workers} workers")
-            with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
-                futures = {executor.submit(process_path, p): p for p in paths}
-                for future in as_completed(futures):
-                    status, path, num_chunks, dropped, err = future.result()
-                    if status == "error":
-                        error_detail = {"path": str(path), "error": str(err), "timestamp": datetime.now().isoformat()}
-                        stats["error_details"].append(error_detail)
-                        self.logger.error(f"Error indexing {path.name}: {err}")
-                        stats["errors"] += 1
-                        if self.max_errors and stats["errors"] >= self.max_errors:
-                            self.logger.warning(f"Max errors reached ({self.max_errors}); aborting")
-                            break
-                    elif status == "skip_large":
-                        stats["files_skipped"] += 1
-                    elif status == "skip_unchanged":
-                        pass  # Already counted
-                    elif num_chunks > 0:
-                        stats["files_processed"] += 1
-                        stats["chunks_created"] += num_chunks
-                        stats["chunks_filtered"] += dropped
-                        self.logger.info(f"Indexed: {path.name} ({num_chunks} chunks, dropped {dropped})")
-                    else:
-                        stats["files_skipped"] += 1
-        else:
-            self.logger.info("Indexing sequentially (single-threaded)")
-            for path in paths:
-                status, path, num_chunks, dropped, err = process_path(path)
+        stats_lock = threading.Lock()
+        pipeline = Pipeline(queue_size=self.settings.pipeline_queue_size)
+
+        def record(status: str, path: Path, num_chunks: int = 0, dropped: int = 0, err=None):
+            with stats_lock:
                 if status == "error":
                     error_detail = {"path": str(path), "error": str(err), "timestamp": datetime.now().isoformat()}
                     stats["error_details"].append(error_detail)
                     self.logger.error(f"Error indexing {path.name}: {err}")
                     stats["errors"] += 1
-                    if self.max_errors and stats["errors"] >= self.max_errors:
+                    if self.max_errors and stats["errors"] >= self.max_errors and not pipeline.stop.is_set():
                         self.logger.warning(f"Max errors reached ({self.max_errors}); aborting")
-                        break
+                        pipeline.stop.set()
                 elif status == "skip_large":
                     stats["files_skipped"] += 1
                 elif status == "skip_unchanged":
-                    pass  # Already counted
+                    stats["skipped_unchanged"] += 1
                 elif num_chunks > 0:
                     stats["files_processed"] += 1
                     stats["chunks_created"] += num_chunks
@@ -467,12 +941,121 @@ class DocumentIndexer:
                 else:
                     stats["files_skipped"] += 1
 
-        # Save state and BM25 index
-        save_state(self.paths['state_path'], self.state)
+        def extract(path: Path, emit):
+            if pipeline.stop.is_set():
+                return 0, 0
+            # Check file size before processing
+            try:
+                st = path.stat()
+                file_size_mb = st.st_size / (1024 * 1024)
+                if file_size_mb > self.settings.max_file_size_mb:
+                    self.logger.warning(f"Skipping large file: {path} ({file_size_mb:.1f}MB > {self.settings.max_file_size_mb}MB)")
+                    with stats_lock:
+                        stats["skipped_large"].append({"path": str(path), "size_mb": round(file_size_mb, 1)})
+                    record("skip_large", path)
+                    return 1, 0
+            except (OSError, FileNotFoundError) as e:
+                self.logger.error(f"Cannot access file {path}: {e}")
+                record("error", path, err=e)
+                return 1, 0
+
+            if not self.should_index_file(path, st):
+                record("skip", path)
+                return 1, 0
+
+            fingerprint = None
+            if not force:
+                changed, fingerprint = self.check_file(path, st, verify=verify_hashes)
+                if not changed:
+                    record("skip_unchanged", path)
+                    return 1, 0
+
+            text = self.extract_text(path, pool=extractor_pool, st=st)
+            if text:
+                emit((path, text, fingerprint))
+            else:
+                record("skip", path)
+            return 1, 0
+
+        def chunk(item, emit):
+            path, text, fingerprint = item
+            prepared, dropped = self.prepare_file(path, text, force=force, fingerprint=fingerprint)
+            if prepared is None:
+                record("skip", path, 0, dropped)
+                return 1, 0
+            emit(prepared)
+            return 1, len(prepared.ids)
+
+        def embed(files: List[PreparedFile], emit):
+            embedded = self.embed_prepared(files)
+            emit(files)
+            return len(files), embedded
+
+        checkpoint_files = self.settings.index_checkpoint_files
+        since_checkpoint = [0]
+
+        def write(batches: List[List[PreparedFile]], emit):
+            files = [f for batch in batches for f in batch]
+            written = self.write_prepared(files)
+            for f in files:
+                record("ok", f.path, len(f.ids), f.dropped)
+            since_checkpoint[0] += len(files)
+            if checkpoint_files > 0 and since_checkpoint[0] >= checkpoint_files:
+                self.checkpoint()
+                since_checkpoint[0] = 0
+            return len(files), written
+
+        def failed(paths_failed: List[Path], err: Exception):
+            for path in paths_failed:
+                self.logger.error(f"Failed to index {path}: {err}", exc_info=err)
+                record("error", path, err=err)
+
+        # Extract (parallel) -> chunk/filter/diff -> embed (cross-file batches) -> write (batched)
+        batch_chunks = max(1, self.settings.pipeline_batch_chunks)
+        extractor_pool = open_extractor_pool(self.settings)
+        if extractor_pool is not None:
+            # One thread per worker process keeps every worker busy; texts stream back as they finish
+            workers = extractor_pool.workers
+        else:
+            workers = max(1, self.parallel_workers or 1)
+        path_q, text_q, prepared_q, embedded_q = (pipeline.queue() for _ in range(4))
+        pipeline.stage("extract", extract, path_q, text_q, workers=workers,
+                       on_error=lambda path, e: failed([path], e))
+        pipeline.stage("chunk", chunk, text_q, prepared_q,
+                       on_error=lambda item, e: failed([item[0]], e))
+        pipeline.batch_stage("embed", embed, prepared_q, embedded_q, batch_size=batch_chunks,
+                             size=lambda f: len(f.to_embed),
+                             on_error=lambda files, e: failed([f.path for f in files], e))
+        pipeline.batch_stage("write", write, embedded_q, batch_size=batch_chunks,
+                             size=lambda files: sum(len(f.write) + len(f.refresh) for f in files),
+                             on_error=lambda batches, e: failed([f.path for b in batches for f in b], e))
+
+        mode = "processes" if extractor_pool is not None else "threads"
+        self.logger.info(f"Indexing with {workers} extraction {mode}, embedding batches of up to {batch_chunks} chunks")
+        try:
+            for path in paths:
+                if pipeline.stop.is_set():
+                    break
+                path_q.put(path)
+            path_q.put(CLOSED)
+            pipeline.join()
+        finally:
+            if extractor_pool is not None:
+                extractor_pool.close()
+        stats["pipeline"] = pipeline.stats_dict()
+
+        # Chunk-level diff results for the files that changed
+        for key in ("embedded", "reused", "unchanged"):
+            stats[f"chunks_{key}"] = self.chunk_counts[key] - counts_before[key]
+        if cache is not None:
+            stats["embedding_cache_hits"] = cache.hits - cache_before[0]
+            stats["embedding_cache_misses"] = cache.misses - cache_before[1]
+
+        self.commit()
+        run["finished_at"] = datetime.now().isoformat()
+        run["aborted"] = pipeline.stop.is_set()
+        self.state.set_meta("last_run", run)
 
-        if self.bm25_index:
-            self.bm25_index.save(str(self.paths['bm25_path']))
-        
         
         # Log comprehensive summary
         self.logger.info(f"Indexing complete: {stats['files_processed']} processed, "
@@ -498,9 +1081,19 @@ class DocumentIndexer:
         self.logger.info("\nIndexing complete:")
         self.logger.info(f"  Files processed: {stats['files_processed']}")
         self.logger.info(f"  Chunks created: {stats['chunks_created']}")
+        self.logger.info(f"  Chunks embedded: {stats['chunks_embedded']} "
+                         f"(re-keyed: {stats['chunks_reused']}, unchanged: {stats['chunks_unchanged']})")
+        if "embedding_cache_hits" in stats:
+            self.logger.info(f"  Embedding cache: {stats['embedding_cache_hits']} hits, "
+                             f"{stats['embedding_cache_misses']} misses")
         self.logger.info(f"  Files skipped (unchanged): {stats['skipped_unchanged']}")
+        if stats.get("files_removed") or stats.get("files_moved"):
+            self.logger.info(f"  Files removed: {stats['files_removed']}, moved: {stats['files_moved']}")
         self.logger.info(f"  Files skipped (too large): {len(stats['skipped_large'])}")
         self.logger.info(f"  Errors: {stats['errors']}")
+        for name, stage in stats["pipeline"].items():
+            self.logger.info(f"  Stage {name}: {stage['items']} items, {stage['chunks']} chunks, "
+                             f"busy {stage['busy_s']}s, blocked {stage['blocked_s']}s")
 
         if self.settings.log_to_file:
             log_path = self.settings.paths["log_dir"] / "indexing.log"
@@ -508,6 +1101,56 @@ class DocumentIndexer:
 
         return stats
 
+    def checkpoint(self):
+        """
+        Flush buffered vector writes, persist the BM25 index and the embedding
+        cache, and then commit the ingest state.
+
+        The state goes last so it never records a file whose chunks or keyword
+        index were not written; files written after the last checkpoint are
+        simply indexed again by the next run.
+        """
+        with self._write_lock:
+            if self._repository is not None:
+                self._repository.flush()
+            if self.bm25_index:
+                self.bm25_index.save()
+            if self._embedding_cache is not None:
+                self._embedding_cache.flush()
+            self.state.commit()
+
+    def commit(self) -> int:
+        """
+        Checkpoint, then bump the index generation.
+
+        Searchers compare the generation against their cached results, so
+        every write that should become visible to queries ends here.
+
+        Returns:
+            The new index generation
+        """
+        self.checkpoint()
+        with self._write_lock:
+            return bump_generation(self.paths['generation_path'])
+
+    def close(self):
+        """Release the writer lock so another indexer, gc or watch daemon can run."""
+        self.writer_lock.release()
+
+    def compact_bm25(self) -> int:
+        """
+        Merge all BM25 segments into one, reclaiming every tombstoned slot.
+
+        Returns:
+            Number of slots reclaimed
+        """
+        if not self.bm25_index:
+            return 0
+        reclaimed = self.bm25_index.compact()
+        self.commit()
+        self.logger.info(f"BM25 compaction reclaimed {reclaimed} slots")
+        return reclaimed
+
     def get_stats(self) -> dict:
         """Get indexing statistics."""
         return {
@@ -518,7 +1161,11 @@ class DocumentIndexer:
             "total_documents": self.repository.count(),
             "indexed_files": len(self.state),
             "bm25_enabled": self.build_bm25 and self.bm25_index is not None,
-            "bm25_documents": self.bm25_index.doc_count if self.bm25_index else 0
+            "bm25_documents": self.bm25_index.doc_count if self.bm25_index else 0,
+            "bm25_tombstones": self.bm25_index.tombstone_count if self.bm25_index else 0,
+            "bm25_segments": len(self.bm25_index.segments) if self.bm25_index else 0,
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "vector_writes": dict(self.repository.writer.stats) if self.repository.writer else None,
         }
 
 
@@ -546,7 +1193,10 @@ def index_directory(
         max_errors=max_errors,
         **kwargs
     )
-    stats = indexer.index_directory(source_dir)
+    try:
+        stats = indexer.index_directory(source_dir)
+    finally:
+        indexer.close()
 
     print("\nIndexing complete:")
     print(f"  Files processed: {stats['files_processed']}")
@@ -554,6 +1204,9 @@ def index_directory(
     print(f"  Chunks created:  {stats['chunks_created']}")
     if stats.get("chunks_filtered"):
         print(f"  Chunks dropped:  {stats['chunks_filtered']}")
+    if stats.get("files_removed") or stats.get("files_moved"):
+        print(f"  Files removed:   {stats['files_removed']}")
+        print(f"  Files moved:     {stats['files_moved']}")
     if stats['errors']:
         print(f"  Errors:          {stats['errors']}")
 
@@ -570,10 +1223,11 @@ Examples:
   %(prog)s ~/Documents --user-data-dir ~/rag-data --strategy sentence
   %(prog)s ~/Documents --user-data-dir ~/rag-data --store qdrant
   %(prog)s ~/Documents --user-data-dir ~/rag-data --force
+  %(prog)s --compact --user-data-dir ~/rag-data
         """
     )
 
-    parser.add_argument("source_dir", help="Directory to index")
+    parser.add_argument("source_dir", nargs="?", help="Directory to index")
     parser.add_argument(
         "--user-data-dir",
         default=str(DEFAULT_SETTINGS.user_data_dir),
@@ -625,6 +1279,13 @@ Examples:
         default=DEFAULT_SETTINGS.parallel_workers,
         help="Worker count for indexing (defaults to %(default)s)"
     )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=DEFAULT_SETTINGS.extract_workers,
+        help="Extract documents in this many worker processes instead of threads "
+             "(0 = threads, defaults to %(default)s)"
+    )
     parser.add_argument(
         "--include",
         nargs="*",
@@ -648,40 +1309,64 @@ Examples:
         action="store_true",
         help="Force re-indexing of all files"
     )
+    parser.add_argument(
+        "--verify-hashes",
+        action="store_true",
+        help="Hash every file to detect changes, even when size and mtime are unchanged"
+    )
     parser.add_argument(
         "--stats",
         action="store_true",
         help="Show index statistics and exit"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Compact the BM25 index (drop removed documents) and exit"
+    )
 
     args = parser.parse_args()
 
-    source = Path(args.source_dir).resolve()
-    if not source.exists() and not args.stats:
+    maintenance_only = args.stats or args.compact
+    if args.source_dir is None and not maintenance_only:
+        parser.error("source_dir is required")
+
+    source = Path(args.source_dir or ".").resolve()
+    if not source.exists() and not maintenance_only:
         print(f"Error: Source directory not found: {source}")
         sys.exit(1)
 
-    indexer = DocumentIndexer(
-        user_data_dir=args.user_data_dir,
-        ocr_enabled=not args.no_ocr,
-        chunk_size=args.chunk_size,
-        chunk_overlap=args.chunk_overlap,
-        chunking_strategy=args.strategy,
-        vector_store_type=args.store,
-        embed_batch_size=args.embed_batch_size,
-        build_bm25=not args.no_bm25,
-        include_globs=args.include,
-        exclude_globs=args.exclude,
-        parallel_workers=args.parallel,
-        max_errors=args.max_errors,
-    )
+    try:
+        indexer = DocumentIndexer(
+            user_data_dir=args.user_data_dir,
+            ocr_enabled=not args.no_ocr,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            chunking_strategy=args.strategy,
+            vector_store_type=args.store,
+            embed_batch_size=args.embed_batch_size,
+            build_bm25=not args.no_bm25,
+            include_globs=args.include,
+            exclude_globs=args.exclude,
+            parallel_workers=args.parallel,
+            max_errors=args.max_errors,
+            extract_workers=args.extract_workers,
+        )
+    except IndexLockedError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
     if args.stats:
         stats = indexer.get_stats()
         print(json.dumps(stats, indent=2))
         return
 
-    stats = indexer.index_directory(source, force=args.force)
+    if args.compact:
+        reclaimed = indexer.compact_bm25()
+        print(f"BM25 compaction reclaimed {reclaimed} slots")
+        return
+
+    stats = indexer.index_directory(source, force=args.force, verify_hashes=args.verify_hashes)
 
     print("\nIndexing complete:")
     print(f"  Files processed: {stats['files_processed']}")
@@ -689,6 +1374,9 @@ Examples:
     print(f"  Chunks created:  {stats['chunks_created']}")
     if stats.get("chunks_filtered"):
         print(f"  Chunks dropped:  {stats['chunks_filtered']}")
+    if stats.get("files_removed") or stats.get("files_moved"):
+        print(f"  Files removed:   {stats['files_removed']}")
+        print(f"  Files moved:     {stats['files_moved']}")
     if stats['errors']:
         print(f"  Errors:          {stats['errors']}")
 
@@ -7,13 +7,14 @@ Searches the index for relevant documents using hybrid search
 """
 
 import argparse
+import copy
 import json
 import sys
 from typing import List, Optional
 
 from rapidfuzz import fuzz
-from sentence_transformers import SentenceTransformer
 
+from ..adapters.embeddings import ModelBackend
 from ..adapters.vectorstore import get_vector_store
 from ..search.hybrid import (
     FusionMethod,
@@ -22,6 +23,14 @@ from ..search.hybrid import (
     SearchMethod,
     SearchResult,
 )
+from ..search.bm25_segments import load_bm25_index
+from ..search.cache import (
+    LRUCache,
+    QueryEmbeddingCache,
+    get_query_embedding_cache,
+    normalize_query,
+    read_generation,
+)
 from ..settings import LocalRagSettings, get_settings
 from ..storage import VectorStoreRepository, create_repository
 
@@ -72,19 +81,46 @@ class DocumentSearcher:
         self.use_reranker = self.settings.use_reranker
 
         self.paths = self.settings.paths
+        self.model_backend = ModelBackend.from_settings(self.settings)
 
         self._embed_model = None
         self._vector_store = None
         self._hybrid_searcher = None
         self._repository: Optional[VectorStoreRepository] = None
 
+        # Formatted results of recent queries, valid for one index generation
+        self._result_cache = LRUCache(self.settings.query_cache_size)
+        self._generation: Optional[int] = None
+        self._embedding_cache: Optional[QueryEmbeddingCache] = None
+        self._rerank_cache = LRUCache(self.settings.rerank_cache_size)
+
     @property
     def embed_model(self):
         """Lazy load embedding model."""
         if self._embed_model is None:
-            self._embed_model = SentenceTransformer(self.embed_model_name)
+            self._embed_model = self.model_backend.load_sentence_transformer(self.embed_model_name)
         return self._embed_model
 
+    @property
+    def embedding_cache(self) -> Optional[QueryEmbeddingCache]:
+        """Query-embedding cache shared with the hybrid searcher (None if disabled)."""
+        if self._embedding_cache is None and self.settings.query_embedding_cache_size > 0:
+            persist_path = None
+            if self.settings.query_embedding_cache_persist:
+                persist_path = self.paths['query_embeddings_path']
+            self._embedding_cache = get_query_embedding_cache(
+                self.settings.query_embedding_cache_size, persist_path
+            )
+        return self._embedding_cache
+
+    def embed_queries(self, queries: List[str]) -> list:
+        """Embed queries in one batch through the shared embedding cache."""
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode_many(
+                self.embed_model, self.model_backend.cache_key(self.embed_model_name), queries
+            )
+        return list(self.embed_model.encode(list(queries), normalize_embeddings=True))
+
     @property
     def vector_store(self):
         """Lazy initialize vector store."""
@@ -121,25 +157,54 @@ class DocumentSearcher:
                 fusion=FusionMethod.RRF,
                 vector_weight=self.vector_weight,
                 bm25_weight=self.bm25_weight,
-                use_reranker=self.use_reranker
+                use_reranker=self.use_reranker,
+                parallel_retrieval=self.settings.parallel_retrieval,
+                branch_timeout=self.settings.search_branch_timeout,
+                rerank_batch_size=self.settings.rerank_batch_size,
+                rerank_skip_margin=self.settings.rerank_skip_margin,
+                bm25_prune_max_k=self.settings.bm25_prune_max_k
             )
 
             self._hybrid_searcher = HybridSearcher(
                 config=config,
-                embed_model=self.embed_model
+                embed_model=self.embed_model,
+                embed_model_name=self.embed_model_name,
+                model_backend=self.model_backend,
+                embedding_cache=self.embedding_cache,
+                rerank_cache=self._rerank_cache
             )
 
-            # Load BM25 index if it exists and hybrid search is enabled
-            if method in (SearchMethod.BM25, SearchMethod.HYBRID):
-                bm25_path = self.paths['bm25_path']
-                if bm25_path.exists():
-                    try:
-                        self._hybrid_searcher.load_bm25_index(str(bm25_path))
-                    except Exception as e:
-                        print(f"Warning: Could not load BM25 index: {e}", file=sys.stderr)
+            self._hybrid_searcher.index_generation = self._generation or 0
+            self._load_bm25_index()
 
         return self._hybrid_searcher
 
+    def _load_bm25_index(self):
+        """(Re)load the BM25 index if it exists and hybrid search is enabled."""
+        if self._hybrid_searcher.config.method not in (SearchMethod.BM25, SearchMethod.HYBRID):
+            return
+        try:
+            self._hybrid_searcher.bm25_index = load_bm25_index(
+                self.paths['bm25_dir'], self.paths['bm25_path']
+            )
+        except Exception as e:
+            print(f"Warning: Could not load BM25 index: {e}", file=sys.stderr)
+
+    def _check_generation(self) -> int:
+        """
+        Invalidate cached results and reload BM25 if the index was committed
+        since the last query (possibly by another process).
+        """
+        generation = read_generation(self.paths['generation_path'])
+        if self._generation is not None and generation != self._generation:
+            self._result_cache.clear()
+            if self._hybrid_searcher is not None:
+                self._load_bm25_index()
+        self._generation = generation
+        if self._hybrid_searcher is not None:
+            self._hybrid_searcher.index_generation = generation
+        return generation
+
     def search(
         self,
         query: str,
@@ -159,14 +224,75 @@ class DocumentSearcher:
         Returns:
             List of search results
         """
-        # Use hybrid searcher if BM25 is available
-        if self.hybrid_searcher.bm25_index and self.hybrid_searcher.bm25_index.doc_count > 0:
-            results = self._hybrid_search(query, k, metadata_filter)
-        else:
-            # Fallback to vector-only search
-            results = self._vector_search(query, k, metadata_filter)
+        return self.search_many([query], k, metadata_filter, include_scores)[0]
 
-        # Format results
+    def search_many(
+        self,
+        queries: List[str],
+        k: int = 5,
+        metadata_filter: dict = None,
+        include_scores: bool = True
+    ) -> List[List[dict]]:
+        """
+        Search for several queries at once.
+
+        Queries missing from the result cache are embedded in one batch and
+        sent to the vector store in one call; BM25 runs over the same batch.
+
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            metadata_filter: Optional metadata filter applied to every query
+            include_scores: Whether to include detailed scores
+
+        Returns:
+            One list of search results per query, in input order
+        """
+        generation = self._check_generation()
+        filter_key = json.dumps(metadata_filter, sort_keys=True, default=str) if metadata_filter else None
+
+        outputs: List[Optional[List[dict]]] = [None] * len(queries)
+        pending = {}  # cache key -> positions in queries
+        for i, query in enumerate(queries):
+            cache_key = (
+                normalize_query(query),
+                k,
+                self.search_method,
+                filter_key,
+                self.use_reranker,
+                include_scores,
+            )
+            cached = self._result_cache.get(cache_key)
+            if cached is not None and cached[0] == generation:
+                outputs[i] = copy.deepcopy(cached[1])
+            else:
+                pending.setdefault(cache_key, []).append(i)
+
+        if pending:
+            batch = [queries[positions[0]] for positions in pending.values()]
+
+            # Use hybrid searcher if BM25 is available
+            degraded = False
+            if self.hybrid_searcher.bm25_index and self.hybrid_searcher.bm25_index.doc_count > 0:
+                self.hybrid_searcher.last_search_stats = {}
+                batch_results = self._hybrid_search_many(batch, k, metadata_filter)
+                degraded = bool(self.hybrid_searcher.last_search_stats.get("timed_out"))
+            else:
+                # Fallback to vector-only search
+                batch_results = self._vector_search_many(batch, k, metadata_filter)
+
+            for (cache_key, positions), results in zip(pending.items(), batch_results):
+                items = self._format_results(results, include_scores)
+                # Results missing a timed-out source are served once but not remembered
+                if not degraded:
+                    self._result_cache.put(cache_key, (generation, copy.deepcopy(items)))
+                for n, i in enumerate(positions):
+                    outputs[i] = items if n == 0 else copy.deepcopy(items)
+
+        return outputs
+
+    def _format_results(self, results: List[SearchResult], include_scores: bool) -> List[dict]:
+        """Convert SearchResults into the result dicts returned to callers."""
         items = []
         for result in results:
             item = {
@@ -193,21 +319,31 @@ class DocumentSearcher:
         metadata_filter: dict = None
     ) -> List[SearchResult]:
         """Perform hybrid search using HybridSearcher."""
+        return self._hybrid_search_many([query], k, metadata_filter)[0]
+
+    def _hybrid_search_many(
+        self,
+        queries: List[str],
+        k: int,
+        metadata_filter: dict = None
+    ) -> List[List[SearchResult]]:
+        """Perform a batched hybrid search using HybridSearcher."""
         # Get raw ChromaDB collection for hybrid searcher
         # Note: This requires access to the underlying collection
         from ..adapters.vectorstore import ChromaVectorStore
 
         if isinstance(self.vector_store, ChromaVectorStore):
             collection = self.vector_store.collection
-            return self.hybrid_searcher.search(
-                query=query,
+            return self.hybrid_searcher.search_many(
+                queries=queries,
                 collection=collection,
                 k=k,
-                metadata_filter=metadata_filter
+                metadata_filter=metadata_filter,
+                store=self.vector_store
             )
         else:
             # For other stores, use vector-only search
-            return self._vector_search(query, k, metadata_filter)
+            return self._vector_search_many(queries, k, metadata_filter)
 
     def _vector_search(
         self,
@@ -216,40 +352,52 @@ class DocumentSearcher:
         metadata_filter: dict = None
     ) -> List[SearchResult]:
         """Perform vector-only search."""
-        query_embedding = self.embed_model.encode([query], normalize_embeddings=True)[0]
+        return self._vector_search_many([query], k, metadata_filter)[0]
 
-        vs_results = self.vector_store.search(
-            query_embedding=query_embedding,
+    def _vector_search_many(
+        self,
+        queries: List[str],
+        k: int,
+        metadata_filter: dict = None
+    ) -> List[List[SearchResult]]:
+        """Perform vector-only search for a batch of queries."""
+        query_embeddings = self.embed_queries(queries)
+
+        vs_batches = self.vector_store.search_many(
+            query_embeddings=query_embeddings,
             k=k * 2,  # Fetch more for fuzzy boosting
             where=metadata_filter
         )
 
-        # Add fuzzy matching boost
-        results = []
-        for vs_result in vs_results:
-            fuzzy_score = fuzz.partial_ratio(
-                query.lower(),
-                vs_result.text[:1000].lower()
-            ) / 100
-
-            # Combine scores
-            final_score = (0.7 * vs_result.score) + (0.3 * fuzzy_score)
-
-            results.append(SearchResult(
-                doc_id=vs_result.id,
-                text=vs_result.text,
-                score=final_score,
-                metadata=vs_result.metadata,
-                source_scores={
-                    'vector': vs_result.score,
-                    'fuzzy': fuzzy_score
-                }
-            ))
-
-        # Sort by combined score
-        results.sort(key=lambda x: x.score, reverse=True)
-
-        return results[:k]
+        batch = []
+        for query, vs_results in zip(queries, vs_batches):
+            # Add fuzzy matching boost
+            results = []
+            for vs_result in vs_results:
+                fuzzy_score = fuzz.partial_ratio(
+                    query.lower(),
+                    vs_result.text[:1000].lower()
+                ) / 100
+
+                # Combine scores
+                final_score = (0.7 * vs_result.score) + (0.3 * fuzzy_score)
+
+                results.append(SearchResult(
+                    doc_id=vs_result.id,
+                    text=vs_result.text,
+                    score=final_score,
+                    metadata=vs_result.metadata,
+                    source_scores={
+                        'vector': vs_result.score,
+                        'fuzzy': fuzzy_score
+                    }
+                ))
+
+            # Sort by combined score
+            results.sort(key=lambda x: x.score, reverse=True)
+            batch.append(results[:k])
+
+        return batch
 
     def get_document(self, doc_id: str) -> Optional[dict]:
         """Get a specific document by ID."""
@@ -276,7 +424,13 @@ class DocumentSearcher:
             "bm25_weight": self.bm25_weight,
             "use_reranker": self.use_reranker,
             "total_documents": self.vector_store.count(),
-            "bm25_documents": bm25_count
+            "bm25_documents": bm25_count,
+            "index_generation": read_generation(self.paths['generation_path']),
+            "query_cache": self._result_cache.stats(),
+            "query_embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "rerank_cache": self._rerank_cache.stats(),
+            # Branch and rerank timings of the most recent hybrid search
+            "last_search": self.hybrid_searcher.recent_search_stats,
         }
 
 
@@ -299,6 +453,68 @@ def search(query: str, user_data_dir: Optional[str] = None, k: int = 5, **kwargs
     return results
 
 
+def read_queries_file(path: str) -> List[dict]:
+    """Parse a JSONL queries file; bare JSON strings are accepted as queries."""
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        entries = []
+        for line_no, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON: {e}") from e
+            if isinstance(entry, str):
+                entry = {"query": entry}
+            if not isinstance(entry, dict) or not isinstance(entry.get("query"), str):
+                raise ValueError(f"{path}:{line_no}: expected an object with a \"query\" string")
+            entries.append(entry)
+        return entries
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def run_queries_file(
+    searcher: DocumentSearcher,
+    path: str,
+    k: int,
+    metadata_filter: Optional[dict],
+    method: str
+):
+    """
+    Run every query of a JSONL file and print one JSON line per query.
+
+    Lines sharing the same k and filter are searched as one batch.
+    """
+    entries = read_queries_file(path)
+
+    groups = {}
+    for i, entry in enumerate(entries):
+        entry_k = entry.get("k", k)
+        entry_filter = entry.get("filter", metadata_filter)
+        key = (entry_k, json.dumps(entry_filter, sort_keys=True))
+        groups.setdefault(key, (entry_k, entry_filter, []))[2].append(i)
+
+    outputs = [None] * len(entries)
+    for entry_k, entry_filter, positions in groups.values():
+        batch = searcher.search_many(
+            [entries[i]["query"] for i in positions],
+            k=entry_k,
+            metadata_filter=entry_filter
+        )
+        for i, results in zip(positions, batch):
+            output = {"query": entries[i]["query"], "method": method, "results": results}
+            if "id" in entries[i]:
+                output = {"id": entries[i]["id"], **output}
+            outputs[i] = output
+
+    for output in outputs:
+        print(json.dumps(output))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Query Local RAG index",
@@ -309,10 +525,15 @@ Examples:
   %(prog)s "neural networks" --user-data-dir ~/rag-data -k 10
   %(prog)s "python functions" --user-data-dir ~/rag-data --method hybrid
   %(prog)s "error handling" --user-data-dir ~/rag-data --rerank
+  %(prog)s --queries-file eval.jsonl --user-data-dir ~/rag-data -k 10
+
+A queries file has one JSON object per line: {"query": "...", "id": ...}.
+Optional "k" and "filter" keys override -k/--filter for that line.
+Results are written as JSON lines in the same order.
         """
     )
 
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument(
         "--user-data-dir",
         default=str(DEFAULT_SETTINGS.user_data_dir),
@@ -358,8 +579,14 @@ Examples:
         type=str,
         help="Metadata filter as JSON (e.g., '{\"filename\": \"doc.pdf\"}')"
     )
+    parser.add_argument(
+        "--queries-file",
+        help="JSONL file of queries to run as one batch ('-' reads stdin)"
+    )
 
     args = parser.parse_args()
+    if not args.query and not args.queries_file and not args.stats:
+        parser.error("a query or --queries-file is required")
 
     try:
         searcher = DocumentSearcher(
@@ -385,6 +612,10 @@ Examples:
                 print(f"Error: Invalid JSON filter: {e}", file=sys.stderr)
                 sys.exit(1)
 
+        if args.queries_file:
+            run_queries_file(searcher, args.queries_file, args.k, metadata_filter, args.method)
+            return
+
         results = searcher.search(
             query=args.query,
             k=args.k,
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Watch daemon for Local RAG.
+
+Keeps an index current without periodic full rescans: filesystem events
+(``ingestion/watch.py``) are coalesced per path and, once the tree has been
+quiet for ``WATCH_DEBOUNCE_SECONDS``, only the affected files are indexed
+with ``DocumentIndexer.index_file`` or removed with
+``DocumentIndexer.remove_orphans``, which re-keys renamed files. The BM25 index, embedding cache and ingest
+state are committed every ``WATCH_COMMIT_SECONDS`` rather than per event.
+
+A burst larger than ``WATCH_MAX_PENDING`` paths (a ``git checkout``, an
+unpacked archive) or a kernel queue overflow drops the per-path queue and
+runs one ``index_directory`` rescan instead, which skips unchanged files by
+size and mtime and reconciles deleted and moved ones.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from ..ingestion.discover import TreeWalker
+from ..ingestion.watch import (
+    CHANGED,
+    DELETED,
+    DIR_CHANGED,
+    DIR_DELETED,
+    OVERFLOW,
+    WATCH_BACKENDS,
+    FsEvent,
+    PollingWatcher,
+    open_watcher,
+)
+from ..settings import get_settings
+from ..storage.writer_lock import IndexLockedError
+from ..utils.logger import get_logger
+from .index_service import ALLOWED_EXTS, EXCLUDE_DIRS, DocumentIndexer
+
+DEFAULT_SETTINGS = get_settings()
+
+
+class WatchService:
+    """
+    Debounced incremental indexing of one directory tree.
+
+    ``run`` drives the loop; ``add_events``, ``flush`` and ``maybe_commit``
+    are its steps and can be called directly.
+    """
+
+    def __init__(
+        self,
+        indexer: DocumentIndexer,
+        source_dir: Path,
+        watcher=None,
+        debounce: Optional[float] = None,
+        commit_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        settings = indexer.settings
+        self.indexer = indexer
+        self.source_dir = Path(source_dir)
+        self.debounce = settings.watch_debounce_seconds if debounce is None else debounce
+        self.commit_interval = settings.watch_commit_seconds if commit_interval is None else commit_interval
+        self.max_pending = settings.watch_max_pending if max_pending is None else max_pending
+        self.logger = get_logger(__name__)
+
+        self.walker = TreeWalker(
+            self.source_dir, ALLOWED_EXTS, EXCLUDE_DIRS, indexer.include_globs, indexer.exclude_globs
+        )
+        # Opened before any scan so changes made during the scan are not missed
+        self.watcher = watcher or open_watcher(
+            self.walker, settings.watch_backend, settings.watch_poll_seconds
+        )
+
+        # Coalesced events: the last event for a path wins
+        self.pending: Dict[str, str] = {}
+        self.rescan_needed = False
+        self.stats = Counter()
+        self._first_event: Optional[float] = None
+        self._last_event: Optional[float] = None
+        self._dirty = False
+        self._last_commit = time.monotonic()
+
+    def add_events(self, events: Iterable[FsEvent], now: Optional[float] = None):
+        """Queue events; a burst over ``max_pending`` paths turns into one rescan."""
+        now = time.monotonic() if now is None else now
+        seen = False
+        for event in events:
+            seen = True
+            if self.rescan_needed:
+                continue
+            if event.kind == OVERFLOW:
+                self.logger.warning("Filesystem event queue overflowed; rescanning")
+                self._request_rescan()
+            elif event.kind == DIR_CHANGED:
+                for path in self.walker.files_under(event.path):
+                    self.pending[str(path)] = CHANGED
+                    if len(self.pending) > self.max_pending:
+                        break
+            elif event.kind == DIR_DELETED:
+                for path in self.indexer.indexed_paths(under=Path(event.path)):
+                    self.pending[path] = DELETED
+            else:
+                self.pending[event.path] = event.kind
+
+            if len(self.pending) > self.max_pending:
+                self.logger.info(f"More than {self.max_pending} changed paths; switching to a rescan")
+                self._request_rescan()
+        if seen:
+            self._last_event = now
+            if self._first_event is None:
+                self._first_event = now
+
+    def _request_rescan(self):
+        self.rescan_needed = True
+        self.pending.clear()
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """
+        Whether queued work should run: the tree has been quiet for ``debounce``
+        seconds, or work has waited ``commit_interval`` under a steady stream.
+        """
+        if self._first_event is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self._last_event >= self.debounce or now - self._first_event >= self.commit_interval
+
+    def flush(self):
+        """Index or remove every queued path (or rescan), without committing."""
+        pending, rescan = self.pending, self.rescan_needed
+        self.pending, self.rescan_needed = {}, False
+        self._first_event = self._last_event = None
+        if rescan:
+            self.rescan()
+            return
+
+        deleted = {p for p, kind in pending.items() if kind == DELETED or not os.path.exists(p)}
+        changed = sorted(p for p in pending if p not in deleted)
+        if deleted:
+            # A rename arrives as a deletion plus a new file: re-key instead of re-embedding
+            try:
+                result = self.indexer.remove_orphans(sorted(deleted), candidates=changed)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Failed to remove deleted files: {e}", exc_info=True)
+            else:
+                self.stats["removed"] += result["files_removed"]
+                self.stats["moved"] += result["files_moved"]
+                self._dirty = self._dirty or bool(result["files_removed"] or result["files_moved"])
+        for path in changed:
+            try:
+                self._index(Path(path))
+            except FileNotFoundError:
+                pass  # deleted again since it was queued; the next event removes it
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.error(f"Failed to update {path}: {e}", exc_info=True)
+
+    def _index(self, path: Path):
+        st = path.stat()
+        if st.st_size > self.indexer.settings.max_file_size_mb * (1 << 20):
+            self.stats["skipped"] += 1
+            return
+        if not self.indexer.should_index_file(path, st):
+            self.stats["skipped"] += 1
+            return
+        changed, fingerprint = self.indexer.check_file(path, st)
+        if not changed:
+            self.stats["unchanged"] += 1
+            return
+        num_chunks, _ = self.indexer.index_file(path, fingerprint=fingerprint)
+        self.stats["indexed"] += 1
+        self._dirty = True
+        self.logger.info(f"Indexed: {path.name} ({num_chunks} chunks)")
+
+    def rescan(self) -> dict:
+        """Index the whole tree: unchanged files are skipped, vanished ones removed, moved ones re-keyed."""
+        stats = self.indexer.index_directory(self.source_dir)
+        self.stats["rescans"] += 1
+        self.stats["removed"] += stats.get("files_removed", 0)
+        self.stats["moved"] += stats.get("files_moved", 0)
+        # index_directory committed everything written so far
+        self._dirty = False
+        self._last_commit = time.monotonic()
+        return stats
+
+    def maybe_commit(self, now: Optional[float] = None, force: bool = False) -> bool:
+        """Commit indexed changes once ``commit_interval`` has passed since the last commit."""
+        now = time.monotonic() if now is None else now
+        if not self._dirty or (not force and now - self._last_commit < self.commit_interval):
+            return False
+        self.indexer.commit()
+        self._dirty = False
+        self._last_commit = now
+        self.stats["commits"] += 1
+        return True
+
+    def _fall_back_to_polling(self):
+        """Replace an event source that ran out of inotify watches with polling."""
+        interval = self.indexer.settings.watch_poll_seconds
+        self.logger.warning(f"Switching to polling every {interval}s")
+        self.watcher.close()
+        # The watcher reported OVERFLOW along with the limit, so a rescan is
+        # queued; it runs after this snapshot, so nothing falls in between
+        self.watcher = PollingWatcher(self.walker, interval)
+
+    def run(self, stop: Optional[threading.Event] = None, initial_scan: bool = True):
+        """
+        Watch until ``stop`` is set, then index what is queued and commit.
+
+        ``initial_scan`` first catches up with changes made while no daemon
+        was running.
+        """
+        stop = stop or threading.Event()
+        tick = max(0.05, min(self.debounce, 1.0))
+        try:
+            if initial_scan:
+                self.rescan()
+            self.logger.info(f"Watching {self.source_dir} ({type(self.watcher).__name__})")
+            while not stop.is_set():
+                self.add_events(self.watcher.read(tick))
+                if getattr(self.watcher, "exhausted", False):
+                    self._fall_back_to_polling()
+                if self.due():
+                    self.flush()
+                self.maybe_commit()
+        finally:
+            try:
+                if self.pending or self.rescan_needed:
+                    self.flush()
+                self.maybe_commit(force=True)
+            finally:
+                self.watcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch a folder and keep its Local RAG index up to date",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s ~/Documents --user-data-dir ~/rag-data
+  %(prog)s ~/Documents --user-data-dir ~/rag-data --debounce 5 --backend poll
+        """
+    )
+    parser.add_argument("source_dir", help="Directory to watch")
+    parser.add_argument(
+        "--user-data-dir",
+        default=str(DEFAULT_SETTINGS.user_data_dir),
+        help="Path to user data directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--include",
+        nargs="*",
+        default=DEFAULT_SETTINGS.include_globs or None,
+        help="Glob patterns to include (relative to source dir)"
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="*",
+        default=DEFAULT_SETTINGS.exclude_globs or None,
+        help="Glob patterns to exclude (relative to source dir)"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_SETTINGS.watch_debounce_seconds,
+        help="Seconds without events before changed files are indexed (defaults to %(default)s)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=WATCH_BACKENDS,
+        default=DEFAULT_SETTINGS.watch_backend,
+        help="Event source (defaults to %(default)s)"
+    )
+    parser.add_argument(
+        "--no-initial-scan",
+        action="store_true",
+        help="Skip the catch-up scan at startup"
+    )
+
+    args = parser.parse_args()
+
+    source = Path(args.source_dir).resolve()
+    if not source.is_dir():
+        print(f"Error: Source directory not found: {source}")
+        sys.exit(1)
+
+    settings = get_settings(
+        user_data_dir=args.user_data_dir,
+        include_globs=list(args.include or []),
+        exclude_globs=list(args.exclude or []),
+        watch_debounce_seconds=args.debounce,
+        watch_backend=args.backend,
+    )
+    try:
+        indexer = DocumentIndexer(settings=settings)
+    except IndexLockedError as e:
+        # A one-off index or gc run finishes; take over once it does
+        print(f"{e}\nWaiting for it to finish...")
+        indexer = DocumentIndexer(settings=settings, lock_timeout=None)
+    service = WatchService(indexer, source)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print(f"Watching {source} (Ctrl-C to stop)")
+    try:
+        service.run(stop, initial_scan=not args.no_initial_scan)
+    except KeyboardInterrupt:
+        pass
+    print(f"Stopped: {dict(service.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,14 @@ class LocalRagSettings(BaseSettings):
     # Embeddings / chunking
     embed_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", env="EMBED_MODEL")
     embed_batch_size: int = Field(default=32, env="EMBED_BATCH_SIZE")
+    # torch | onnx | onnx-int8 (ONNX exports are cached under <user_data_dir>/models)
+    embed_backend: str = Field(default="torch", env="EMBED_BACKEND")
+    onnx_quantization: str = Field(default="avx512_vnni", env="ONNX_QUANTIZATION")
+    # Chunk embeddings kept on disk per model, keyed by normalized chunk text (0 disables)
+    embedding_cache_size: int = Field(default=200_000, env="EMBEDDING_CACHE_SIZE")
+    # Indexing pipeline: chunks per cross-file embedding/write batch, items per stage queue
+    pipeline_batch_chunks: int = Field(default=256, env="PIPELINE_BATCH_CHUNKS")
+    pipeline_queue_size: int = Field(default=64, env="PIPELINE_QUEUE_SIZE")
     chunk_size: int = Field(default=3000, env="CHUNK_SIZE")
     chunk_overlap: int = Field(default=400, env="CHUNK_OVERLAP")
     chunking_strategy: str = Field(default="template", env="CHUNKING_STRATEGY")
@@ -52,6 +60,24 @@ class LocalRagSettings(BaseSettings):
     vector_weight: float = Field(default=0.7, env="VECTOR_WEIGHT")
     bm25_weight: float = Field(default=0.3, env="BM25_WEIGHT")
     use_reranker: bool = Field(default=False, env="USE_RERANKER")
+    # Cross-encoder tuning: pairs per predict() call, skip margin (relative fused top-1 lead,
+    # 0 = always rerank) and cached pair scores (0 disables; entries are per index generation)
+    rerank_batch_size: int = Field(default=16, env="RERANK_BATCH_SIZE")
+    rerank_skip_margin: float = Field(default=0.0, env="RERANK_SKIP_MARGIN")
+    rerank_cache_size: int = Field(default=4096, env="RERANK_CACHE_SIZE")
+    # Keep chunk text in the BM25 index too (results are otherwise hydrated from the vector store)
+    bm25_store_text: bool = Field(default=False, env="BM25_STORE_TEXT")
+    # BM25 fetches of at most this many hits use MaxScore pruning (0 = never; same results)
+    bm25_prune_max_k: int = Field(default=30, env="BM25_PRUNE_MAX_K")
+    # Hybrid search runs the vector and BM25 branches concurrently; a branch slower than
+    # the timeout (seconds, 0 = wait) is dropped and the other source answers alone
+    parallel_retrieval: bool = Field(default=True, env="PARALLEL_RETRIEVAL")
+    search_branch_timeout: float = Field(default=10.0, env="SEARCH_BRANCH_TIMEOUT")
+    # Recent query results kept per searcher (0 disables); invalidated on every index commit
+    query_cache_size: int = Field(default=256, env="QUERY_CACHE_SIZE")
+    # Query embeddings keyed by (model, normalized query); optionally kept on disk between runs
+    query_embedding_cache_size: int = Field(default=1024, env="QUERY_EMBEDDING_CACHE_SIZE")
+    query_embedding_cache_persist: bool = Field(default=False, env="QUERY_EMBEDDING_CACHE_PERSIST")
 
     # OCR
     ocr_enabled: bool = Field(default=True, env="OCR_ENABLED")
@@ -65,6 +91,30 @@ class LocalRagSettings(BaseSettings):
     tokenizers_parallelism: bool = Field(default=False, env="TOKENIZERS_PARALLELISM")
     parallel_workers: Optional[int] = Field(default=6, env="LOCAL_RAG_PARALLEL")
     max_errors: Optional[int] = Field(default=20, env="LOCAL_RAG_MAX_ERRORS")
+    # Extract documents in worker processes instead of threads (0 = threads); each worker
+    # is replaced after that many files to release memory leaked by PDF libraries (0 = never)
+    extract_workers: int = Field(default=0, env="EXTRACT_WORKERS")
+    extract_max_files_per_worker: int = Field(default=200, env="EXTRACT_MAX_FILES_PER_WORKER")
+    # Files written between checkpoints (BM25 + embedding cache + ingest state); 0 = only at the end
+    index_checkpoint_files: int = Field(default=200, env="INDEX_CHECKPOINT_FILES")
+    # Purge files that disappeared from the indexed folder (and re-key moved ones) on every index run
+    index_reconcile: bool = Field(default=True, env="INDEX_RECONCILE")
+    # Vector store group commit: upserts buffered before one grouped flush (0 = write through),
+    # and the age after which the next write flushes; the buffer is always flushed at checkpoints
+    vector_write_batch: int = Field(default=2048, env="VECTOR_WRITE_BATCH")
+    vector_write_max_seconds: float = Field(default=5.0, env="VECTOR_WRITE_MAX_SECONDS")
+    # Content hash for change detection: sha1 | blake2b | xxh3 (only read when size/mtime differ)
+    file_hash: str = Field(default="blake2b", env="FILE_HASH")
+    # Threads walking top-level subdirectories during file discovery
+    discover_workers: int = Field(default=4, env="DISCOVER_WORKERS")
+    # `local-rag watch`: quiet period before indexing changed files, how often the BM25
+    # index and state are committed, and how many pending paths switch to a full rescan
+    watch_debounce_seconds: float = Field(default=2.0, env="WATCH_DEBOUNCE_SECONDS")
+    watch_commit_seconds: float = Field(default=30.0, env="WATCH_COMMIT_SECONDS")
+    watch_max_pending: int = Field(default=2000, env="WATCH_MAX_PENDING")
+    # Event source: auto (inotify on Linux, else polling) | inotify | poll
+    watch_backend: str = Field(default="auto", env="WATCH_BACKEND")
+    watch_poll_seconds: float = Field(default=10.0, env="WATCH_POLL_SECONDS")
     include_globs: List[str] = Field(default_factory=list, env="LOCAL_RAG_INCLUDE")
     exclude_globs: List[str] = Field(default_factory=list, env="LOCAL_RAG_EXCLUDE")
 
@@ -102,9 +152,16 @@ class LocalRagSettings(BaseSettings):
         return {
             "base": base,
             "persist_dir": base / "vectordb",
-            "state_path": base / "state" / "ingest_state.json",
-            "bm25_path": base / "state" / "bm25_index.json",
+            "state_path": base / "state" / "ingest_state.json",  # legacy JSON, migrated on load
+            "state_db_path": base / "state" / "ingest_state.db",
+            "bm25_path": base / "state" / "bm25_index.json",  # legacy JSON, migrated by the indexer
+            "bm25_dir": base / "state" / "bm25",
+            "generation_path": base / "state" / "index_generation",
+            "query_embeddings_path": base / "state" / "query_embeddings.npz",
+            "embedding_cache_dir": base / "state" / "embedding_cache",
             "log_dir": base / "logs",
+            "model_cache_dir": base / "models",
+            "writer_lock_path": base / ".writer.lock",
         }
 
 
@@ -0,0 +1,238 @@
+"""
+Persistent, content-addressed cache of chunk embeddings.
+
+Identical chunk text (copied files, vendored docs, boilerplate, re-indexes
+with the same chunking) is embedded once per model. A cache directory holds
+one model's vectors::
+
+    meta.json    format/version, dim, capacity and the key -> row index,
+                 ordered least recently used first
+    vectors.f32  float32[capacity, dim], memory-mapped
+
+Keys are hashes of the whitespace-normalized chunk text. The cache is
+bounded to ``max_entries`` rows with LRU eviction. Rows freed by eviction
+are only reused after the next ``flush()``, so a crash between writing a
+vector and writing ``meta.json`` can never map a key to another text's
+vector.
+
+Recency is tracked in memory. Hits alone never rewrite ``meta.json``: a
+run that only reads the cache leaves it untouched, and the order saved
+with the next added or evicted entry includes those hits.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+FORMAT_NAME = "local-rag-embedding-cache"
+FORMAT_VERSION = 1
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+
+
+def text_key(text: str) -> str:
+    """Cache key for a chunk: hash of its whitespace-normalized text."""
+    normalized = " ".join(text.split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """Size-bounded LRU of embeddings backed by a memory-mapped array file."""
+
+    def __init__(self, directory: Path, max_entries: int = 200_000):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.dim: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._pending_free: List[int] = []
+        self._capacity = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_model(cls, root: Path, model_key: str, max_entries: int = 200_000) -> "EmbeddingCache":
+        """Cache directory for one model under ``root``."""
+        return cls(Path(root) / re.sub(r"[^A-Za-z0-9_.-]+", "--", model_key), max_entries)
+
+    def _load(self):
+        meta_path = self.directory / META_FILE
+        vectors_path = self.directory / VECTORS_FILE
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return
+        if meta.get("format") != FORMAT_NAME or meta.get("version", 0) > FORMAT_VERSION:
+            return
+
+        dim, capacity = int(meta["dim"]), int(meta["capacity"])
+        if not vectors_path.exists() or vectors_path.stat().st_size < capacity * dim * 4:
+            return
+
+        self.dim = dim
+        self._capacity = capacity
+        self._entries = OrderedDict((key, int(row)) for key, row in meta["entries"].items())
+        self._map_vectors()
+        used = set(self._entries.values())
+        self._free = [row for row in range(capacity - 1, -1, -1) if row not in used]
+        while len(self._entries) > max(self.max_entries, 0):
+            _, row = self._entries.popitem(last=False)
+            self._pending_free.append(row)
+            self._dirty = True
+
+    def _map_vectors(self):
+        if self._capacity == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(
+            self.directory / VECTORS_FILE, dtype=np.float32, mode="r+", shape=(self._capacity, self.dim)
+        )
+
+    def _grow(self):
+        """Double the vectors file, up to ``max_entries`` rows."""
+        capacity = min(max(self._capacity * 2, 1024), self.max_entries)
+        if capacity <= self._capacity:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / VECTORS_FILE, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._free.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
+        self._map_vectors()
+
+    def _reset(self, dim: int):
+        """Drop everything (the model's dimension changed)."""
+        self._vectors = None
+        self._entries.clear()
+        self._free.clear()
+        self._pending_free.clear()
+        self._capacity = 0
+        self.dim = dim
+        vectors_path = self.directory / VECTORS_FILE
+        if vectors_path.exists():
+            vectors_path.unlink()
+        self._dirty = True
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors for ``texts`` (None for misses), marking hits as recently used."""
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            positions, rows = [], []
+            for pos, key in enumerate(keys):
+                row = self._entries.get(key)
+                if row is not None:
+                    self._entries.move_to_end(key)
+                    positions.append(pos)
+                    rows.append(row)
+            self.hits += len(rows)
+            self.misses += len(keys) - len(rows)
+
+            found: List[Optional[np.ndarray]] = [None] * len(keys)
+            if rows:
+                for pos, vector in zip(positions, np.asarray(self._vectors[rows])):
+                    found[pos] = vector
+            return found
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Any]):
+        """Store vectors for ``texts``, evicting least recently used rows past the bound."""
+        if self.max_entries <= 0 or not len(texts):
+            return
+        array = np.asarray(vectors, dtype=np.float32)
+        if array.ndim != 2:
+            return
+
+        with self._lock:
+            if self.dim != array.shape[1]:
+                self._reset(array.shape[1])
+
+            for text, vector in zip(texts, array):
+                key = text_key(text)
+                row = self._entries.get(key)
+                if row is None:
+                    row = self._allocate_row()
+                    if row is None:
+                        break
+                    self._entries[key] = row
+                    self._dirty = True
+                else:
+                    # Same text, same model: the stored vector is already right
+                    self._entries.move_to_end(key)
+                    continue
+                self._vectors[row] = vector
+
+    def _allocate_row(self) -> Optional[int]:
+        if not self._free and self._capacity < self.max_entries:
+            self._grow()
+        if not self._free:
+            self._evict(max(1, self.max_entries // 20))
+        return self._free.pop() if self._free else None
+
+    def _evict(self, count: int):
+        """Evict the ``count`` least recently used entries and persist so their rows can be reused."""
+        for _ in range(min(count, len(self._entries))):
+            _, row = self._entries.popitem(last=False)
+            self._pending_free.append(row)
+            self.evictions += 1
+        self._dirty = True
+        self._flush_locked()
+
+    def flush(self):
+        """Persist vectors and the index; evicted rows become reusable afterwards."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._dirty:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "dim": self.dim,
+            "capacity": self._capacity,
+            "entries": self._entries,
+        }
+        tmp_path = self.directory / f"{META_FILE}.tmp"
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.directory / META_FILE)
+
+        self._free.extend(self._pending_free)
+        self._pending_free.clear()
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,60 +1,223 @@
 """
 Vector store repository abstraction.
 
-This wraps concrete vector store implementations to provide idempotent upserts
-and a minimal lifecycle API (count/close). Keeps the rest of the codebase
-agnostic to Chroma vs Qdrant.
+This wraps concrete vector store implementations to provide idempotent upserts,
+optional group-committed writes (``BatchedWriter``) and a minimal lifecycle API
+(count/flush/close). Keeps the rest of the codebase agnostic to Chroma vs Qdrant.
 """
 
 from __future__ import annotations
 
-from typing import Callable, Dict, List, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ..adapters.vectorstore import BaseVectorStore, VectorStoreType, get_vector_store
+from ..adapters.vectorstore import (
+    BaseVectorStore,
+    Document,
+    Embeddings,
+    VectorStoreType,
+    as_embedding_matrix,
+    get_vector_store,
+)
 from ..settings import LocalRagSettings
 
 
+class BatchedWriter:
+    """
+    Group-commit buffer for vector store writes.
+
+    Deletes and upserts from many files are coalesced in memory and applied
+    as a few large operations: every ``where={"path": ...}`` delete in one
+    ``delete_by_field`` call, id deletes and upserts in chunks of
+    ``max_docs``. A flush happens when ``max_docs`` upserts are buffered, when
+    a write finds the oldest buffered change older than ``max_seconds``, and
+    whenever the owner calls :meth:`flush`. Buffered embeddings are kept as
+    the rows handed in and stacked into one float32 matrix per store call.
+
+    Within a flush deletes run before upserts. Staging keeps that equivalent
+    to the original order: a delete drops buffered upserts it covers, and an
+    upsert cancels a buffered delete of the same id.
+    """
+
+    def __init__(self, store: BaseVectorStore, max_docs: int = 2048, max_seconds: float = 5.0):
+        self.store = store
+        self.max_docs = max(1, max_docs)
+        self.max_seconds = max_seconds
+        self._lock = threading.RLock()
+        self._delete_paths: Dict[str, None] = {}
+        self._delete_ids: Dict[str, None] = {}
+        self._upserts: Dict[str, Tuple[str, Any, Dict]] = {}
+        self._oldest: Optional[float] = None
+        self.stats = {"flushes": 0, "upserted": 0, "deleted_ids": 0, "deleted_paths": 0}
+
+    @property
+    def pending(self) -> int:
+        """Buffered operations (upserted docs, deleted ids and paths)."""
+        return len(self._upserts) + len(self._delete_ids) + len(self._delete_paths)
+
+    def _touch(self):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    def upsert(self, ids: List[str], texts: List[str], embeddings: Embeddings, metadatas: Optional[List[Dict]] = None):
+        with self._lock:
+            metadatas = metadatas or [{} for _ in ids]
+            for doc_id, text, embedding, metadata in zip(ids, texts, embeddings, metadatas):
+                self._delete_ids.pop(doc_id, None)
+                self._upserts[doc_id] = (text, embedding, metadata)
+            self._touch()
+            self._maybe_flush()
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None):
+        with self._lock:
+            if ids:
+                for doc_id in ids:
+                    self._upserts.pop(doc_id, None)
+                    self._delete_ids[doc_id] = None
+            elif where:
+                if set(where) != {"path"}:
+                    # Only path filters can be reordered safely; anything else is a barrier
+                    self.flush()
+                    self.store.delete_documents(where=where)
+                    return
+                path = where["path"]
+                for doc_id in [i for i, (_, _, meta) in self._upserts.items() if meta.get("path") == path]:
+                    del self._upserts[doc_id]
+                self._delete_paths[path] = None
+            else:
+                return
+            self._touch()
+            self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._upserts) >= self.max_docs or (
+            self._oldest is not None and time.monotonic() - self._oldest >= self.max_seconds
+        ):
+            self.flush()
+
+    def get_documents(self, ids: List[str]) -> List[Document]:
+        """Documents as they will be after the next flush (buffered upserts first)."""
+        with self._lock:
+            found = {}
+            missing = []
+            for doc_id in ids:
+                if doc_id in self._upserts:
+                    text, embedding, metadata = self._upserts[doc_id]
+                    found[doc_id] = Document(id=doc_id, text=text, embedding=embedding, metadata=metadata)
+                elif doc_id not in self._delete_ids:
+                    missing.append(doc_id)
+            if missing:
+                for doc in self.store.get_documents(missing):
+                    if doc.metadata.get("path") not in self._delete_paths:
+                        found[doc.id] = doc
+            return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    def flush(self) -> int:
+        """
+        Apply everything buffered.
+
+        Returns:
+            Number of documents upserted
+        """
+        with self._lock:
+            if not self.pending:
+                return 0
+            paths, delete_ids, upserts = list(self._delete_paths), list(self._delete_ids), self._upserts
+            self._delete_paths, self._delete_ids, self._upserts = {}, {}, {}
+            self._oldest = None
+
+            if paths:
+                self.store.delete_by_field("path", paths)
+            for start in range(0, len(delete_ids), self.max_docs):
+                self.store.delete_documents(ids=delete_ids[start:start + self.max_docs])
+            ids = list(upserts)
+            for start in range(0, len(ids), self.max_docs):
+                batch = ids[start:start + self.max_docs]
+                _upsert(
+                    self.store,
+                    ids=batch,
+                    texts=[upserts[i][0] for i in batch],
+                    embeddings=as_embedding_matrix([upserts[i][1] for i in batch]),
+                    metadatas=[upserts[i][2] for i in batch],
+                )
+
+            self.stats["flushes"] += 1
+            self.stats["upserted"] += len(ids)
+            self.stats["deleted_ids"] += len(delete_ids)
+            self.stats["deleted_paths"] += len(paths)
+            return len(ids)
+
+
+def _upsert(store: BaseVectorStore, ids, texts, embeddings, metadatas):
+    """Idempotent add/update where supported, fallback to delete+add."""
+    if hasattr(store, "upsert_documents"):
+        return getattr(store, "upsert_documents")(
+            ids=ids,
+            texts=texts,
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+
+    # Fallback path
+    store.delete_documents(ids=ids)
+    return store.add_documents(
+        ids=ids,
+        texts=texts,
+        embeddings=embeddings,
+        metadatas=metadatas,
+    )
+
+
 class VectorStoreRepository:
-    """Thin repository wrapper around a vector store."""
+    """
+    Thin repository wrapper around a vector store.
 
-    def __init__(self, store: BaseVectorStore):
+    With ``write_batch`` > 0 writes go through a :class:`BatchedWriter` and
+    reach the store on :meth:`flush` (or when a size/time threshold trips);
+    reads through the repository see buffered writes.
+    """
+
+    def __init__(self, store: BaseVectorStore, write_batch: int = 0, write_max_seconds: float = 5.0):
         self.store = store
+        self.writer = BatchedWriter(store, write_batch, write_max_seconds) if write_batch > 0 else None
 
     def upsert_documents(
         self,
         ids: List[str],
         texts: List[str],
-        embeddings: List[List[float]],
+        embeddings: Embeddings,
         metadatas: Optional[List[Dict]] = None,
     ):
         """Idempotent add/update where supported, fallback to delete+add."""
-        if hasattr(self.store, "upsert_documents"):
-            return getattr(self.store, "upsert_documents")(
-                ids=ids,
-                texts=texts,
-                embeddings=embeddings,
-                metadatas=metadatas,
-            )
-
-        # Fallback path
-        self.store.delete_documents(ids=ids)
-        return self.store.add_documents(
-            ids=ids,
-            texts=texts,
-            embeddings=embeddings,
-            metadatas=metadatas,
-        )
+        if self.writer is not None:
+            return self.writer.upsert(ids, texts, embeddings, metadatas)
+        return _upsert(self.store, ids=ids, texts=texts, embeddings=embeddings, metadatas=metadatas)
 
     def delete_documents(self, ids: List[str] = None, where: Dict = None):
         """Delete documents by id or filter."""
+        if self.writer is not None:
+            return self.writer.delete(ids=ids, where=where)
         return self.store.delete_documents(ids=ids, where=where)
 
+    def get_documents(self, ids: List[str]) -> List[Document]:
+        """Documents by id, including writes not flushed yet."""
+        if self.writer is not None:
+            return self.writer.get_documents(ids)
+        return self.store.get_documents(ids)
+
+    def flush(self) -> int:
+        """Write buffered changes to the store; returns documents upserted."""
+        return self.writer.flush() if self.writer is not None else 0
+
     def count(self) -> int:
         """Return total document count."""
+        self.flush()
         return self.store.count()
 
     def close(self):
-        """Close underlying resources if supported."""
+        """Flush, then close underlying resources if supported."""
+        self.flush()
         client = getattr(self.store, "client", None)
         if client and hasattr(client, "close"):
             client.close()
@@ -76,4 +239,4 @@ def create_repository(
         collection_name=settings.collection_name,
         persist_dir=str(settings.paths["persist_dir"]),
     )
-    return VectorStoreRepository(store)
+    return VectorStoreRepository(store, settings.vector_write_batch, settings.vector_write_max_seconds)
@@ -0,0 +1,213 @@
+"""
+SQLite-backed ingest state.
+
+One row per indexed file: the full state entry as JSON plus the columns
+status queries need (``mtime``, ``chunks``, ``indexed_at``), so health
+checks answer with one aggregate query instead of loading every entry.
+
+:class:`IngestStateStore` behaves like the dict the indexer used to keep:
+entries are loaded on first access and cached, and changes are buffered
+until :meth:`IngestStateStore.commit` writes them in one transaction. The
+indexer commits after each checkpoint, so an interrupted run keeps the
+files it already finished. The database runs in WAL mode so readers
+(health checks, ``--stats``) never block the indexer.
+
+A legacy ``ingest_state.json`` is imported once when the database is
+created and renamed to ``ingest_state.json.migrated``.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    entry TEXT NOT NULL,
+    mtime INTEGER,
+    chunks INTEGER,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _connect(db_path: Path, read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class IngestStateStore(MutableMapping):
+    """Dict-like per-file ingest state persisted in SQLite."""
+
+    def __init__(self, db_path: Path, legacy_json_path: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        created = not self.db_path.exists()
+        self._conn = _connect(self.db_path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+        self._cache: Dict[str, dict] = {}
+        self._in_db: Set[str] = set()  # cached paths that have a row
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._indexed_at: Dict[str, float] = {}
+        self._all_loaded = False
+
+        if created and legacy_json_path is not None and Path(legacy_json_path).exists():
+            self._import_json(Path(legacy_json_path))
+
+    def _import_json(self, json_path: Path):
+        legacy = json.loads(json_path.read_text())
+        for path, entry in legacy.items():
+            self[path] = entry
+        self.commit()
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+
+    def _load(self, path: str) -> Optional[dict]:
+        row = self._conn.execute("SELECT entry FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        entry = json.loads(row[0])
+        self._cache[path] = entry
+        self._in_db.add(path)
+        return entry
+
+    def __getitem__(self, path: str) -> dict:
+        with self._lock:
+            if path in self._deleted:
+                raise KeyError(path)
+            entry = self._cache.get(path)
+            if entry is None and not self._all_loaded:
+                entry = self._load(path)
+            if entry is None:
+                raise KeyError(path)
+            return entry
+
+    def __setitem__(self, path: str, entry: dict):
+        with self._lock:
+            if path not in self._cache and not self._all_loaded:
+                self._load(path)
+            self._cache[path] = entry
+            self._deleted.discard(path)
+            self._dirty.add(path)
+            self._indexed_at[path] = time.time()
+
+    def __delitem__(self, path: str):
+        with self._lock:
+            self[path]  # raises KeyError for unknown paths
+            del self._cache[path]
+            self._dirty.discard(path)
+            if path in self._in_db:
+                self._deleted.add(path)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            if not self._all_loaded:
+                for path, entry in self._conn.execute("SELECT path, entry FROM files"):
+                    if path not in self._cache and path not in self._deleted:
+                        self._cache[path] = json.loads(entry)
+                    self._in_db.add(path)
+                self._all_loaded = True
+            return iter(list(self._cache))
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._all_loaded:
+                return len(self._cache)
+            stored = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            return stored + len(self._dirty - self._in_db) - len(self._deleted)
+
+    def mark_dirty(self, path: str):
+        """Persist an entry that was modified in place on the next commit."""
+        with self._lock:
+            if path in self._cache:
+                self._dirty.add(path)
+
+    def commit(self) -> int:
+        """
+        Write buffered changes in one transaction.
+
+        Returns:
+            Number of rows written or deleted
+        """
+        with self._lock:
+            rows = []
+            for path in self._dirty:
+                entry = self._cache[path]
+                indexed_at = self._indexed_at.get(path)
+                rows.append((path, json.dumps(entry), entry.get("mtime"), entry.get("chunks"), indexed_at))
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO files (path, entry, mtime, chunks, indexed_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET entry = excluded.entry, mtime = excluded.mtime, "
+                    "chunks = excluded.chunks, indexed_at = COALESCE(excluded.indexed_at, files.indexed_at)",
+                    rows,
+                )
+                self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in self._deleted])
+            changed = len(rows) + len(self._deleted)
+            self._in_db |= self._dirty
+            self._in_db -= self._deleted
+            self._dirty.clear()
+            self._deleted.clear()
+            self._indexed_at.clear()
+            return changed
+
+    def get_meta(self, key: str) -> Any:
+        """Value stored under ``key`` in the meta table, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, key: str, value: Any):
+        """Store ``value`` under ``key`` and commit immediately."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value)),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def read_state_summary(db_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    File count, chunk count and last index times, without loading entries.
+
+    Returns None when there is no state database yet.
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return None
+    conn = _connect(db_path, read_only=True)
+    try:
+        files, chunks, last_mtime, last_indexed = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(chunks), 0), MAX(mtime), MAX(indexed_at) FROM files"
+        ).fetchone()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'last_run'").fetchone()
+    finally:
+        conn.close()
+    return {
+        "indexed_files": files,
+        "indexed_chunks": chunks,
+        "last_index_mtime": last_mtime,
+        "last_indexed_at": last_indexed,
+        "last_run": json.loads(row[0]) if row else None,
+    }
@@ -0,0 +1,100 @@
+"""
+Exclusive writer lock for one user data directory.
+
+The indexer, ``local-rag gc``, the MCP ``local_rag_index`` tool and the
+watch daemon all write the same vector store, BM25 segments, embedding
+cache and ingest state. None of those files tolerate two writers: the
+embedding cache hands out rows from an in-memory free list, the BM25
+manifest is rewritten with the segments one process knows about, and the
+ingest state caches rows. :class:`WriterLock` holds ``fcntl.flock`` on
+``<user_data_dir>/.writer.lock`` for as long as a writer is open, so a
+second writer is refused (or waits) instead of corrupting the index.
+Searchers never take it.
+
+The lock is released when the holder closes it or its process exits. On
+platforms without ``fcntl`` it is a no-op.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class IndexLockedError(RuntimeError):
+    """Another process is writing to the same user data directory."""
+
+
+class WriterLock:
+    """Advisory exclusive lock on a user data directory's ``.writer.lock``."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, timeout: float = 0.0, poll: float = 0.5) -> "WriterLock":
+        """
+        Take the lock, waiting up to ``timeout`` seconds (None waits forever).
+
+        Raises:
+            IndexLockedError: another process still holds it after ``timeout``
+        """
+        if self._fd is not None or fcntl is None:
+            return self
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    holder = self._read_holder(fd)
+                    os.close(fd)
+                    raise IndexLockedError(
+                        f"Another local-rag writer{holder} is using {self.path.parent} "
+                        "(indexer, gc, MCP index or watch daemon); stop it or wait for it to finish"
+                    ) from None
+                time.sleep(poll)
+
+        # Record the holder for the error message of the next writer
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return self
+
+    @staticmethod
+    def _read_holder(fd: int) -> str:
+        try:
+            pid = os.pread(fd, 32, 0).decode().strip()
+        except OSError:
+            return ""
+        return f" (pid {pid})" if pid.isdigit() else ""
+
+    def release(self):
+        """Drop the lock; safe to call more than once."""
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def __enter__(self) -> "WriterLock":
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __del__(self):
+        self.release()